@@ -61,6 +61,10 @@ def demonstrate_http_server():
     print("python -m http.server 8080                    # Puerto específico")
     print("python -m http.server --bind 127.0.0.1        # Bind a IP específica")
     print("python -m http.server --directory /path/to/dir # Directorio específico")
+    
+    print("\nLimitaciones: un thread por petición, copia por buffers de Python, sin Range")
+    print("Para servir artefactos a muchos clientes ver examples/11_static_file_server.py")
+    print("(os.sendfile zero-copy, keep-alive, Range, cache de stat/ETag)")
 
 def demonstrate_timeit():
     """Demostrar python -m timeit"""
@@ -148,6 +148,8 @@ def demonstrate_datetime_formatting():
     print(f"Hora: {now:%H:%M:%S}")
     print(f"Fecha completa: {now:%A, %B %d, %Y}")
     print(f"Formato ISO: {now:%Y-%m-%dT%H:%M:%S}")
+    # Cada {now:%...} llama a strftime; para logs de alto volumen ver
+    # TimestampFormatter en examples/14_timestamp_formatting.py
     
     # Diferentes formatos
     print(f"\nCumpleaños: {birthday}")
@@ -190,6 +192,8 @@ def demonstrate_nested_formatting():
     template = "Nombre: {name:<10} | Edad: {age:>3} | Ciudad: {city}"
     formatted = template.format(**person)
     print(formatted)
+    # .format() re-parsea la plantilla en cada llamada;
+    # examples/12_compiled_templates.py la compila una sola vez
     
     # Con f-strings
     print(f"Nombre: {person['name']:<10} | Edad: {person['age']:>3} | Ciudad: {person['city']}")
@@ -213,14 +217,19 @@ def demonstrate_performance_comparison():
         ("Concatenación", "'Lenguaje: ' + name + ', Versión: ' + str(version)"),
     ]
     
-    print("Tiempo de ejecución (por 1M iteraciones):")
+    print("Tiempo de ejecución (mejor de 5 x 1M iteraciones):")
+    timings = {}
     for method_name, code in methods:
         # Preparar el código con las variables
         setup = "name = 'Python'; version = 3.9"
-        time_taken = timeit.timeit(code, setup=setup, number=1000000)
+        time_taken = min(timeit.repeat(code, setup=setup, number=1000000, repeat=5))
+        timings[method_name] = time_taken
         print(f"{method_name:>15}: {time_taken:.4f} segundos")
     
-    print("\n¡Los f-strings son generalmente los más rápidos!")
+    fastest = min(timings, key=timings.get)
+    print(f"\nMás rápido en esta corrida: {fastest}")
+    print("El resultado depende de los tipos, los specs y la versión de Python:")
+    print("examples/15_formatting_benchmarks.py mide muchos casos y guarda el historial")
     print()
 
 def demonstrate_advanced_tricks():
@@ -243,6 +252,7 @@ def demonstrate_advanced_tricks():
     # Formateo de estructuras de datos
     matrix = [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
     print("\nMatriz:")
+    # Para millones de filas ver TableRenderer en examples/13_table_rendering.py
     for row in matrix:
         print(f"  {' '.join(f'{num:>3}' for num in row)}")
     
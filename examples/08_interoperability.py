@@ -48,6 +48,8 @@ def demonstrate_ctypes():
             angle = 0.0  # 0 radianes
             cos_result = libm.cos(angle)
             print(f"cos(0) desde C: {cos_result}")
+            # Una llamada por double está dominada por el coste del FFI:
+            # examples/16_ctypes_batched_math.py procesa buffers completos
         
         # Ejemplo 3: Trabajar con memoria
         print("\n3. Trabajando con memoria:")
@@ -68,6 +70,8 @@ def demonstrate_ctypes():
             _fields_ = [("x", ctypes.c_double),
                        ("y", ctypes.c_double)]
         
+        # Millones de Points entre procesos sin pickle:
+        # ver examples/17_shared_structured_arrays.py
         point = Point(3.0, 4.0)
         print(f"Punto: ({point.x}, {point.y})")
         
@@ -122,6 +126,8 @@ def demonstrate_subprocess():
                                  stdout=subprocess.PIPE, text=True)
             p2.stdout.close()
             
+            # communicate() acumula toda la salida; para datos grandes itera en
+            # streaming con Pipeline en examples/20_streaming_pipelines.py
             output, _ = p3.communicate()
             print(f"Resultado del pipeline:\n{output}")
         else:
@@ -150,6 +156,8 @@ for i in range(3):
 
 def cpu_intensive_task(n):
     """Tarea que usa mucho CPU para demostrar multiprocessing"""
+    # Es una suma de cuadrados con forma cerrada; variantes verificadas
+    # (algebraica, numpy, C) en examples/24_compute_kernels.py
     total = 0
     for i in range(n * 1000000):
         total += i ** 2
@@ -180,6 +188,8 @@ def demonstrate_multiprocessing():
     
     # Ejecución paralela
     start_time = time.time()
+    # Con duraciones muy desiguales el chunking estático deja cores ociosos:
+    # ver AdaptiveScheduler en examples/18_adaptive_scheduler.py
     with multiprocessing.Pool() as pool:
         parallel_results = pool.map(cpu_intensive_task, tasks)
     parallel_time = time.time() - start_time
@@ -187,13 +197,19 @@ def demonstrate_multiprocessing():
     print(f"Tiempo secuencial: {sequential_time:.2f}s")
     print(f"Tiempo paralelo: {parallel_time:.2f}s")
     print(f"Speedup: {sequential_time/parallel_time:.2f}x")
+    # Threads sin GIL o subintérpretes, si el intérprete los ofrece:
+    # ver parallel_map en examples/23_parallel_backends.py
     
     # Ejemplo 2: ProcessPoolExecutor
     print("\n2. ProcessPoolExecutor:")
     
+    # Cada pool nuevo arranca workers en frío; para reutilizarlos con el estado
+    # preparado en el padre y gc.freeze(): examples/22_warm_process_pools.py
     with ProcessPoolExecutor(max_workers=cpu_count) as executor:
         start_time = time.time()
         futures = [executor.submit(cpu_intensive_task, task) for task in tasks]
+        # Cada resultado vuelve serializado; para arrays grandes los workers pueden
+        # escribir en memoria compartida: examples/25_shared_memory_reduce.py
         results = [future.result() for future in futures]
         executor_time = time.time() - start_time
     
@@ -221,6 +237,7 @@ def demonstrate_multiprocessing():
     print(f"Threading para I/O: {thread_time:.2f}s")
     print(f"Multiprocessing para I/O: {process_time:.2f}s")
     print("→ Threading es mejor para I/O, multiprocessing para CPU")
+    print("  (examples/19_auto_executor.py mide CPU, wall y GIL y elige solo)")
     
     print()
 
@@ -259,6 +276,7 @@ def demonstrate_system_integration():
     if hasattr(os, 'getloadavg'):
         load = os.getloadavg()
         print(f"Load average: {load}")
+        # Muestreo continuo durante un benchmark: examples/21_resource_sampler.py
     
     print(f"Memoria disponible para Python: {sys.maxsize} bytes")
     
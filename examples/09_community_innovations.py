@@ -16,6 +16,7 @@ def demonstrate_fastapi_style():
     print("=== FastAPI Style - APIs Modernas ===")
     
     # Simulamos decoradores y modelos tipo FastAPI
+    # (con un matcher compilado por método: examples/26_compiled_router.py)
     class APIRouter:
         def __init__(self):
             self.routes = []
@@ -67,6 +68,7 @@ def demonstrate_fastapi_style():
             created_at="2024-01-01T00:00:00"
         )
     
+    # Servidas de verdad por HTTP/1.1: python examples/26_compiled_router.py serve
     print("Rutas definidas:")
     for method, path, func in app.routes:
         print(f"  {method:4} {path:15} -> {func.__name__}")
@@ -88,31 +90,37 @@ def demonstrate_pydantic_style():
         pass
     
     class BaseModel:
+        # Campos, defaults y conversión se calculan una vez por clase, no por
+        # instancia; versión con __init__ generado y modo __slots__ en
+        # 27_compiled_models.py
+        def __init_subclass__(cls, **kwargs):
+            super().__init_subclass__(**kwargs)
+            converters = {int: int, str: str}
+            cls._fields = [(name, getattr(cls, name, None), converters.get(field_type), field_type)
+                           for name, field_type in cls.__annotations__.items()]
+        
         def __init__(self, **kwargs):
-            self._data = {}
-            for field_name, field_type in self.__annotations__.items():
+            for field_name, default, convert, field_type in self._fields:
                 value = kwargs.get(field_name)
-                if value is None and hasattr(self, field_name):
-                    value = getattr(self, field_name)
+                if value is None:
+                    value = default
                 
                 # Validación básica de tipos
-                if value is not None:
-                    if field_type == int and not isinstance(value, int):
-                        try:
-                            value = int(value)
-                        except ValueError:
-                            raise ValidationError(f"{field_name} debe ser int")
-                    elif field_type == str and not isinstance(value, str):
-                        value = str(value)
+                elif convert is not None and not isinstance(value, field_type):
+                    try:
+                        value = convert(value)
+                    except ValueError:
+                        raise ValidationError(f"{field_name} debe ser {field_type.__name__}")
                 
-                self._data[field_name] = value
-                setattr(self, field_name, value)
+                # Un solo almacenamiento: el __dict__ de la instancia
+                self.__dict__[field_name] = value
         
         def dict(self):
-            return self._data.copy()
+            return {name: self.__dict__[name] for name, *_ in self._fields}
         
         def json(self):
-            return json.dumps(self._data, default=str)
+            # Modelos anidados acaban en str(); encoder por clase en 27_compiled_models.py
+            return json.dumps(self.dict(), default=str)
     
     # Modelos de ejemplo
     class Address(BaseModel):
@@ -126,7 +134,8 @@ def demonstrate_pydantic_style():
         email: Optional[str] = None
         addresses: List[Address] = None
     
-    # Uso de los modelos
+    # Uso de los modelos (de a uno; para lotes de registros, validate_many
+    # y validate_columns en 27_compiled_models.py)
     print("Creando persona con validación:")
     try:
         person = Person(
@@ -172,6 +181,7 @@ def demonstrate_rich_style():
                 print(f"  {title}")
             print(f"{'='*50}")
     
+    # Guarda todas las filas y usa ancho fijo 15; en streaming en 28_terminal_rendering.py
     class Table:
         def __init__(self, title=None):
             self.title = title
@@ -206,6 +216,7 @@ def demonstrate_rich_style():
                     formatted_row.append(f'{str(cell):^15}')
                 print(f"│ {' │ '.join(formatted_row)} │")
     
+    # Redibuja en cada elemento; versión con refresco limitado en 28_terminal_rendering.py
     class Progress:
         def track(self, iterable, description="Processing"):
             total = len(iterable) if hasattr(iterable, '__len__') else 100
@@ -271,6 +282,8 @@ def demonstrate_typer_style():
             return decorator
         
         def run(self, func):
+            # inspect.signature en cada arranque y comandos ya importados; versión
+            # perezosa con índice en disco en 29_lazy_cli.py
             # Simular ejecución de comando
             import inspect
             sig = inspect.signature(func)
@@ -373,6 +386,8 @@ async def demonstrate_asyncio_patterns():
     
     async def async_pipeline(items):
         """Pipeline de procesamiento asíncrono"""
+        # Secuencial: cada await espera al anterior. Ver 30_async_pipeline.py
+        # para etapas con concurrencia acotada, colas limitadas y reintentos
         tasks = []
         for item in items:
             # Fetch -> Process pipeline
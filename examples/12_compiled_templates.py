@@ -0,0 +1,341 @@
+"""
+Plantillas str.format compiladas
+Parsear una vez, renderizar millones de veces (con f-strings generados en runtime)
+"""
+
+import functools
+import keyword
+import re
+import string
+import timeit
+
+try:
+    from _string import formatter_field_name_split  # Privado de CPython
+except ImportError:
+    formatter_field_name_split = None  # PyPy y otros: se usa _split_field_name
+
+TEMPLATE_CACHE_SIZE = 256
+
+# Especificadores que se pueden escribir literalmente dentro de f"{x:...}"
+_SAFE_SPEC = re.compile(r"[\w<>=^+\- #,.%]*\Z")
+_SAFE_KEY = re.compile(r"[^'\"\\{}\n\r]*\Z")
+
+def _split_field_name(field_name):
+    """
+    Versión en Python de _string.formatter_field_name_split:
+    "a.b[0]" -> ("a", [(True, "b"), (False, 0)]), con los mismos errores.
+    """
+    def key(text):
+        return int(text) if text.isdecimal() else text
+    
+    end = len(field_name)
+    for i, char in enumerate(field_name):
+        if char in ".[":
+            end = i
+            break
+    first, rest, i = key(field_name[:end]), [], end
+    while i < len(field_name):
+        if field_name[i] == ".":
+            stop = i + 1
+            while stop < len(field_name) and field_name[stop] not in ".[":
+                stop += 1
+            name = field_name[i + 1:stop]
+            if not name:
+                raise ValueError("Empty attribute in format string")
+            rest.append((True, name))
+            i = stop
+        else:
+            stop = field_name.find("]", i + 1)
+            if stop == -1:
+                raise ValueError("Missing ']' in format string")
+            name = field_name[i + 1:stop]
+            if not name:
+                raise ValueError("Empty attribute in format string")
+            rest.append((False, key(name)))
+            i = stop + 1
+            if i < len(field_name) and field_name[i] not in ".[":
+                raise ValueError("Only '.' or '[' may follow ']' in format field specifier")
+    return first, rest
+
+class CompiledTemplate:
+    """
+    Una plantilla str.format parseada una sola vez.
+    
+    La plantilla se descompone en partes literales y accesores de campo
+    (clave, atributos, índices, conversión y format spec). Con codegen=True
+    se genera con compile() una función f-string especializada; si no,
+    se usa un intérprete sencillo sobre la lista de partes.
+    """
+    
+    def __init__(self, template, codegen=True):
+        self.template = template
+        self.parts = self._parse(template)
+        self.positional = any(isinstance(p[0], int) for p in self.parts if not isinstance(p, str))
+        self.named = any(isinstance(p[0], str) for p in self.parts if not isinstance(p, str))
+        self.codegen = codegen
+        self.source = None
+        if codegen:
+            self._render, self._render_many = self._generate()
+        else:
+            self._render = self._interpret
+            self._render_many = None
+    
+    @classmethod
+    def _parse(cls, template, auto=None):
+        """Lista de literales (str) y campos (clave, ruta, conversión, spec)"""
+        if auto is None:
+            auto = {"next": 0, "mode": None}
+        parts = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+            if literal:
+                parts.append(literal)
+            if field_name is None:
+                continue
+            
+            split = formatter_field_name_split or _split_field_name
+            first, rest = split(field_name)
+            if first == "":
+                if auto["mode"] == "manual":
+                    raise ValueError("cannot switch from manual field specification to automatic field numbering")
+                auto["mode"] = "auto"
+                first = auto["next"]
+                auto["next"] += 1
+            elif isinstance(first, int):
+                if auto["mode"] == "auto":
+                    raise ValueError("cannot switch from automatic field numbering to manual field specification")
+                auto["mode"] = "manual"
+            
+            if conversion not in (None, "r", "s", "a"):
+                raise ValueError(f"Unknown conversion specifier {conversion}")
+            
+            # rest: [(es_atributo, nombre_o_índice), ...]
+            path = tuple(rest)
+            # Un spec con {} anidados (p.ej. "<{width}") es a su vez una plantilla
+            spec = cls._parse(format_spec, auto) if "{" in format_spec else format_spec
+            parts.append((first, path, conversion, spec))
+        return parts
+    
+    # --- Modo interpretado ---
+    
+    @staticmethod
+    def _lookup(args, kwargs, first, path):
+        value = args[first] if isinstance(first, int) else kwargs[first]
+        for is_attr, key in path:
+            value = getattr(value, key) if is_attr else value[key]
+        return value
+    
+    def _interpret(self, args, kwargs, parts=None):
+        out = []
+        for part in self.parts if parts is None else parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            first, path, conversion, spec = part
+            value = self._lookup(args, kwargs, first, path)
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            if not isinstance(spec, str):
+                spec = self._interpret(args, kwargs, spec)
+            out.append(format(value, spec))
+        return "".join(out)
+    
+    # --- Modo codegen ---
+    
+    def _expression(self, parts, constants):
+        """Expresión Python que construye el string (literales adyacentes + f-strings)"""
+        pieces = []
+        literal_only = True  # Solo literales y f-strings: se concatenan al compilar
+        for part in parts:
+            if isinstance(part, str):
+                pieces.append(repr(part))
+                continue
+            first, path, conversion, spec = part
+            
+            if isinstance(first, int):
+                value = f"args[{first}]"
+            elif _SAFE_KEY.match(first):
+                value = f"kwargs[{first!r}]"
+            else:
+                value = f"kwargs[{self._constant(constants, first)}]"
+            for is_attr, key in path:
+                # Palabras clave (".if") y nombres que Python normaliza (NFKC) van por getattr
+                if is_attr and key.isidentifier() and key.isascii() and not keyword.iskeyword(key):
+                    value += f".{key}"
+                elif is_attr:
+                    value = f"getattr({value}, {self._constant(constants, key)})"
+                elif isinstance(key, int) or _SAFE_KEY.match(key):
+                    value += f"[{key!r}]"
+                else:
+                    value += f"[{self._constant(constants, key)}]"
+            
+            conv = f"!{conversion}" if conversion else ""
+            if isinstance(spec, str) and _SAFE_SPEC.match(spec):
+                pieces.append(f'f"{{{value}{conv}{":" + spec if spec else ""}}}"')
+            else:
+                if isinstance(spec, str):
+                    spec_expr = self._constant(constants, spec)
+                else:
+                    spec_expr = self._expression(spec, constants)
+                converter = {"r": "repr", "s": "str", "a": "ascii"}.get(conversion)
+                if converter:
+                    value = f"{converter}({value})"
+                pieces.append(f"format({value}, {spec_expr})")
+                literal_only = False
+        
+        if not pieces:
+            return "''"
+        if literal_only:
+            return "(" + " ".join(pieces) + ")"
+        return "''.join((" + ", ".join(pieces) + ",))"
+    
+    @staticmethod
+    def _constant(constants, value):
+        name = f"_c{len(constants)}"
+        constants[name] = value
+        return name
+    
+    def _generate(self):
+        constants = {}
+        expression = self._expression(self.parts, constants)
+        # Las constantes van como argumentos por defecto: LOAD_FAST, no LOAD_GLOBAL
+        defaults = "".join(f", {name}={name}" for name in constants)
+        record = "args" if self.positional and not self.named else "kwargs"
+        self.source = (
+            f"def _render(args, kwargs{defaults}):\n"
+            f"    return {expression}\n"
+            f"def _render_many(records, args=(), kwargs=None{defaults}):\n"
+            f"    return [{expression} for {record} in records]\n"
+        )
+        namespace = dict(constants)
+        exec(compile(self.source, f"<template {self.template[:40]!r}>", "exec"), namespace)
+        return namespace["_render"], namespace["_render_many"]
+    
+    # --- API pública ---
+    
+    def render(self, *args, **kwargs):
+        """Equivalente a template.format(*args, **kwargs)"""
+        return self._render(args, kwargs)
+    
+    def render_map(self, mapping):
+        """Equivalente a template.format_map(mapping)"""
+        return self._render((), mapping)
+    
+    def render_many(self, records):
+        """
+        Renderizar un lote: mappings para campos con nombre, secuencias
+        para campos posicionales. Devuelve una lista.
+        """
+        if self.positional and self.named:
+            raise ValueError("render_many no soporta plantillas con campos posicionales y con nombre")
+        if self._render_many is not None:
+            return self._render_many(records)
+        return list(self.iter_render(records))
+    
+    def iter_render(self, records):
+        """Versión perezosa de render_many, para lotes que no caben en memoria"""
+        render = self._render
+        if self.positional:
+            return map(lambda record: render(record, None), records)
+        return map(lambda record: render((), record), records)
+    
+    def __repr__(self):
+        return f"CompiledTemplate({self.template!r}, codegen={self.codegen})"
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template, codegen=True):
+    """CompiledTemplate con LRU acotado: las plantillas calientes se compilan una vez"""
+    return CompiledTemplate(template, codegen)
+
+def format_cached(template, *args, **kwargs):
+    """Sustituto directo de template.format(...) usando el cache de compilación"""
+    return compile_template(template).render(*args, **kwargs)
+
+def demonstrate_compiled_template():
+    """Mostrar las partes parseadas y el código generado"""
+    print("=== Plantilla Compilada ===")
+    
+    person = {'name': 'Bob', 'age': 25, 'city': 'Barcelona'}
+    template = "Nombre: {name:<10} | Edad: {age:>3} | Ciudad: {city}"
+    compiled = compile_template(template)
+    
+    print(f"Plantilla: {template!r}")
+    print("Partes parseadas:")
+    for part in compiled.parts:
+        print(f"  {part!r}")
+    print("\nCódigo generado:")
+    print(compiled.source)
+    
+    print(f"str.format:        {template.format(**person)}")
+    print(f"CompiledTemplate:  {compiled.render(**person)}")
+    
+    # Casos menos comunes: posicionales, atributos, índices, conversiones y specs anidados
+    examples = [
+        ("{} + {} = {}", (1, 2, 3), {}),
+        ("{0.real:.2f} / {0.imag:.2f}", (3 + 4j,), {}),
+        ("{data[items][0]!r:>8}", (), {"data": {"items": ["x", "y"]}}),
+        ("{value:<{width}}|", (), {"value": "Alice", "width": 10}),
+        ("{{literal}} {x:*^9}", (), {"x": "py"}),
+    ]
+    print("\nComparación con str.format:")
+    for tmpl, args, kwargs in examples:
+        expected = tmpl.format(*args, **kwargs)
+        got = compile_template(tmpl).render(*args, **kwargs)
+        interpreted = CompiledTemplate(tmpl, codegen=False).render(*args, **kwargs)
+        status = "✅" if expected == got == interpreted else "❌"
+        print(f"  {status} {tmpl!r:32} -> {got!r}")
+    
+    print(f"\nCache: {compile_template.cache_info()}")
+    print()
+
+def demonstrate_benchmark():
+    """Benchmark: str.format vs plantilla compilada, por registro y por lote"""
+    print("=== Benchmark ===")
+    
+    template = "Nombre: {name:<10} | Edad: {age:>3} | Ciudad: {city}"
+    person = {'name': 'Bob', 'age': 25, 'city': 'Barcelona'}
+    records = [{'name': f'user{i}', 'age': i % 100, 'city': 'Madrid'} for i in range(100_000)]
+    compiled = compile_template(template)
+    interpreted = CompiledTemplate(template, codegen=False)
+    
+    assert compiled.render_many(records) == [template.format_map(r) for r in records]
+    
+    number = 200_000
+    single = [
+        ("template.format(**person)", lambda: template.format(**person)),
+        ("interpretado.render_map", lambda: interpreted.render_map(person)),
+        ("compilado.render(**person)", lambda: compiled.render(**person)),
+        ("compilado.render_map", lambda: compiled.render_map(person)),
+    ]
+    print(f"Un registro ({number:,} llamadas):")
+    for name, func in single:
+        best = min(timeit.repeat(func, number=number, repeat=3))
+        print(f"  {name:>28}: {best / number * 1e9:7.1f} ns/registro")
+    
+    batch = [
+        ("[format_map(r) for r]", lambda: [template.format_map(r) for r in records]),
+        ("list(iter_render)", lambda: list(compiled.iter_render(records))),
+        ("render_many", lambda: compiled.render_many(records)),
+    ]
+    print(f"\nLote de {len(records):,} registros:")
+    for name, func in batch:
+        best = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"  {name:>28}: {best / len(records) * 1e9:7.1f} ns/registro")
+    print()
+
+if __name__ == "__main__":
+    print("=== Plantillas Compiladas ===")
+    print("template.format() vuelve a parsear la plantilla en cada llamada\n")
+    
+    demonstrate_compiled_template()
+    demonstrate_benchmark()
+    
+    print("=== Consejos ===")
+    print("1. string.Formatter().parse expone el parser de str.format")
+    print("2. compile() + exec generan funciones especializadas en runtime")
+    print("3. Un f-string compila a BUILD_STRING: sin parseo en cada llamada")
+    print("4. Renderizar en lote evita una llamada a función por registro")
+    print("5. functools.lru_cache acota cuántas plantillas se mantienen compiladas")
@@ -0,0 +1,312 @@
+"""
+Tablas alineadas por columnas para millones de filas
+Un format spec por columna, una llamada a format por fila y un join por bloque
+"""
+
+import functools
+import io
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+Column = namedtuple("Column", "header align spec min_width max_width overflow",
+                    defaults=("<", "", 1, None, None))
+Column.__doc__ = """
+Cabecera, alineación ("<", ">", "^") y format spec de una columna; opcionalmente
+ancho mínimo y máximo, y qué hacer con el texto que no cabe: None (la fila se
+desalinea), "ellipsis" (…), "crop" o "fold" (la fila ocupa varias líneas).
+"""
+
+OVERFLOWS = (None, "ellipsis", "crop", "fold")
+
+def truncate(text, width, overflow):
+    """Recortar `text` a `width` caracteres según la política"""
+    if overflow is None or len(text) <= width:
+        return text
+    if overflow == "ellipsis":
+        return text[:width - 1] + "…"
+    return text[:width]
+
+def _fold(template, cells, policies):
+    """Una fila cuyas celdas "fold" no caben: varias líneas, una por trozo"""
+    pieces = []
+    for cell, (width, overflow) in zip(cells, policies):
+        if overflow == "fold":
+            pieces.append([cell[i:i + width] for i in range(0, len(cell), width)] or [""])
+        else:
+            pieces.append([truncate(cell, width, overflow)])
+    height = max(map(len, pieces))
+    return [template.format(*[piece[line] if line < len(piece) else "" for piece in pieces])
+            for line in range(height)]
+
+def _literal(text):
+    """Texto fijo dentro de una plantilla de format"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+class TableRenderer:
+    """
+    Renderizador de tablas en texto plano.
+    
+    Los anchos se calculan en una pasada (sobre todas las filas o sobre una
+    muestra), y con ellos se arma una única plantilla de fila, p. ej.
+    "{0:>8,} {1:<12} {2:>10.2f}", que se reutiliza para todas las filas.
+    Las filas se renderizan por bloques con un solo "\\n".join.
+    
+    Si alguna columna tiene `overflow`, la plantilla no alcanza (hay que
+    recortar): se genera en su lugar una función format_row con exec.
+    `prefix`/`suffix` rodean cada línea (p. ej. bordes "│ " y " │").
+    """
+    
+    def __init__(self, columns, separator=" ", chunk_size=10_000, prefix="", suffix=""):
+        self.columns = [c if isinstance(c, Column) else Column(*c) for c in columns]
+        for column in self.columns:
+            if column.overflow not in OVERFLOWS:
+                raise ValueError(f"overflow debe ser uno de {OVERFLOWS}")
+        self.separator = separator
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.suffix = suffix
+        self.reset_widths()
+    
+    def reset_widths(self):
+        """Anchos iniciales: cabecera (o min_width), acotados por max_width"""
+        self.widths = [max(len(c.header), c.min_width) for c in self.columns]
+        self._cap_widths()
+        return self
+    
+    def _cap_widths(self):
+        for i, column in enumerate(self.columns):
+            if column.max_width is not None and self.widths[i] > column.max_width:
+                self.widths[i] = max(column.max_width, column.min_width)
+        self._row_format = None
+        self._format_row = None
+    
+    def measure(self, rows):
+        """Actualizar los anchos con una pasada sobre rows (formatea cada celda una vez)"""
+        specs = [c.spec for c in self.columns]
+        widths = self.widths
+        for row in rows:
+            for i, value in enumerate(row):
+                width = len(format(value, specs[i]))
+                if width > widths[i]:
+                    widths[i] = width
+        self._cap_widths()
+        return self
+    
+    def measure_sample(self, rows, sample_size=1000):
+        """
+        Calcular anchos con las primeras sample_size filas y devolver un
+        iterador equivalente a rows (la muestra no se pierde).
+        Las celdas posteriores más anchas desalinean su fila (o se recortan,
+        según el `overflow` de la columna).
+        """
+        rows = iter(rows)
+        sample = list(itertools.islice(rows, sample_size))
+        self.measure(sample)
+        return itertools.chain(sample, rows)
+    
+    def fit(self, budget):
+        """Encoger las columnas más anchas hasta que cada línea entre en `budget` caracteres"""
+        widths = self.widths
+        overhead = len(self.prefix) + len(self.suffix) + len(self.separator) * (len(widths) - 1)
+        while sum(widths) + overhead > budget:
+            shrinkable = [i for i, c in enumerate(self.columns) if widths[i] > c.min_width]
+            if not shrinkable:
+                break
+            widths[max(shrinkable, key=widths.__getitem__)] -= 1
+        self._row_format = None
+        self._format_row = None
+        return self
+    
+    @property
+    def row_format(self):
+        """Plantilla de fila cacheada: se reconstruye solo si cambian los anchos"""
+        if self._row_format is None:
+            # Sin spec, !s: como compile_row, acepta None y objetos sin ancho en __format__
+            cells = [
+                f"{{{i}{'' if c.spec else '!s'}:{c.align}{width}{c.spec}}}"
+                for i, (c, width) in enumerate(zip(self.columns, self.widths))
+            ]
+            self._row_format = (_literal(self.prefix) + _literal(self.separator).join(cells)
+                                + _literal(self.suffix))
+        return self._row_format
+    
+    @property
+    def format_row(self):
+        """format_row(row) -> str para los anchos actuales (generada y cacheada)"""
+        if self._format_row is None:
+            self._format_row = self.compile_row()
+        return self._format_row
+    
+    def compile_row(self):
+        """
+        Conversión, recorte y una f-string con la alineación de cada columna.
+        "crop" lo resuelve la precisión del formato ({c:<20.20}); "ellipsis"
+        y "fold" solo cuestan un len() por celda cuando el texto cabe.
+        """
+        namespace = {"_str": str, "_format": format, "_fold": _fold}
+        lines = ["def format_row(row):"]
+        fields = []
+        folded = []
+        for i, (column, width) in enumerate(zip(self.columns, self.widths)):
+            if column.spec:
+                lines.append(f"    c{i} = _format(row[{i}], {column.spec!r})")
+            else:
+                lines.append(f"    c{i} = row[{i}]")
+                lines.append(f"    if c{i}.__class__ is not _str:")
+                lines.append(f"        c{i} = _str(c{i})")
+            if column.overflow == "crop":
+                fields.append(f"{{c{i}:{column.align}{width}.{width}}}")
+                continue
+            if column.overflow == "ellipsis":
+                lines.append(f"    if len(c{i}) > {width}:")
+                lines.append(f"        c{i} = c{i}[:{width - 1}] + '…'")
+            elif column.overflow == "fold":
+                folded.append(f"len(c{i}) > {width}")
+            fields.append(f"{{c{i}:{column.align}{width}}}")
+        cells = ", ".join(f"c{i}" for i in range(len(self.columns)))
+        if folded:
+            namespace["_template"] = (_literal(self.prefix) + _literal(self.separator).join(
+                f"{{:{c.align}{w}}}" for c, w in zip(self.columns, self.widths)) + _literal(self.suffix))
+            namespace["_policies"] = [(w, c.overflow) for c, w in zip(self.columns, self.widths)]
+            lines.append(f"    if {' or '.join(folded)}:")
+            lines.append(f"        return '\\n'.join(_fold(_template, [{cells}], _policies))")
+        line = _literal(self.prefix) + _literal(self.separator).join(fields) + _literal(self.suffix)
+        lines.append(f"    return f{line!r}")
+        source = "\n".join(lines) + "\n"
+        exec(compile(source, "<TableRenderer.format_row>", "exec"), namespace)
+        namespace["format_row"].source = source
+        return namespace["format_row"]
+    
+    def header(self):
+        titles = self.separator.join(
+            f"{truncate(c.header, width, 'crop'):{c.align}{width}}" for c, width in zip(self.columns, self.widths))
+        rule = self.separator.join("-" * width for width in self.widths)
+        return f"{self.prefix}{titles}{self.suffix}\n{self.prefix}{rule}{self.suffix}\n"
+    
+    def _chunks(self, rows):
+        """(filas, texto) por bloque de chunk_size filas"""
+        if any(c.overflow for c in self.columns):
+            render = functools.partial(map, self.format_row)
+        else:
+            render = functools.partial(itertools.starmap, self.row_format.format)
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield len(chunk), "\n".join(render(chunk)) + "\n"
+    
+    def render_chunks(self, rows):
+        """Generador de bloques de texto de chunk_size filas cada uno"""
+        for _, text in self._chunks(rows):
+            yield text
+    
+    def write(self, rows, writer, header=True):
+        """
+        Escribir la tabla en un objeto con .write(); memoria acotada por chunk_size.
+        Devuelve cuántas filas escribió.
+        """
+        if header:
+            writer.write(self.header())
+        count = 0
+        for size, chunk in self._chunks(rows):
+            writer.write(chunk)
+            count += size
+        return count
+    
+    def render(self, rows):
+        """Tabla completa como string (solo para tablas pequeñas)"""
+        rows = list(rows)
+        self.measure(rows)
+        buffer = io.StringIO()
+        self.write(rows, buffer)
+        return buffer.getvalue()
+
+def nested_fstring_table(rows, writer):
+    """Enfoque original: una f-string por celda dentro de bucles anidados"""
+    for row in rows:
+        writer.write(f"{' '.join(f'{value:>12}' for value in row)}\n")
+
+def generate_rows(count):
+    """Filas sintéticas: id, nombre, cantidad y precio"""
+    for i in range(count):
+        yield (i, f"item-{i % 997}", i * 7 % 10_000, (i % 1000) * 1.25)
+
+def demonstrate_table():
+    """Tabla pequeña con anchos calculados automáticamente"""
+    print("=== Tabla Alineada ===")
+    
+    table = TableRenderer([
+        Column("Lenguaje"),
+        Column("Año", ">"),
+        Column("Usuarios", ">", ","),
+        Column("Crecimiento", ">", ".1%"),
+    ])
+    rows = [
+        ("Python", 1991, 15_700_000, 0.22),
+        ("JavaScript", 1995, 17_400_000, 0.08),
+        ("Go", 2009, 2_100_000, 0.19),
+        ("Rust", 2010, 3_700_000, 0.35),
+        ("Otros", None, 9_000_000, 0.05),  # Celdas None: se muestran con str()
+    ]
+    print(table.render(rows))
+    print(f"Plantilla de fila generada: {table.row_format!r}")
+    
+    # La matriz de demonstrate_advanced_tricks() en una sola plantilla
+    matrix = [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    matrix_table = TableRenderer([Column("", ">")] * 3).measure(matrix)
+    for chunk in matrix_table.render_chunks(matrix):
+        print(chunk, end="")
+    print()
+
+def benchmark(rows_count, devnull):
+    """Comparar celdas con f-strings anidadas contra el renderizador por bloques"""
+    print(f"=== Benchmark: {rows_count:,} filas ===")
+    
+    def run_nested():
+        nested_fstring_table(generate_rows(rows_count), devnull)
+    
+    def run_renderer():
+        table = TableRenderer([
+            Column("id", ">", ","), Column("nombre"),
+            Column("cantidad", ">", ","), Column("precio", ">", ",.2f"),
+        ])
+        # Muestra para los anchos, el resto en streaming
+        rows = table.measure_sample(generate_rows(rows_count), sample_size=10_000)
+        table.write(rows, devnull)
+    
+    for name, func in [("f-strings anidadas", run_nested), ("TableRenderer", run_renderer)]:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        
+        # Segunda corrida para la memoria: tracemalloc distorsiona los tiempos
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>20}: {elapsed:6.2f}s  {rows_count / elapsed:>12,.0f} filas/s  "
+              f"pico de memoria {peak / 1024**2:6.2f} MB")
+    print()
+
+if __name__ == "__main__":
+    print("=== Renderizado de Tablas ===")
+    print("Formatear celda por celda con f'{num:>3}' no escala a millones de filas\n")
+    
+    demonstrate_table()
+    
+    # python examples/13_table_rendering.py 10000000 para el caso de 10M filas
+    rows_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with open(os.devnull, "w", buffering=1024 * 1024) as devnull:
+        benchmark(rows_count, devnull)
+    
+    print("=== Consejos ===")
+    print("1. Calcula los anchos una vez; una muestra basta para datos homogéneos")
+    print("2. Una plantilla por fila: una llamada a format en lugar de una por celda")
+    print("3. '\\n'.join por bloque reduce las llamadas a write()")
+    print("4. Los generadores + bloques mantienen la memoria constante")
+    print("5. tracemalloc mide el pico de memoria de cualquier enfoque")
@@ -0,0 +1,308 @@
+"""
+Formateo de timestamps con cache por día y por segundo
+strftime una vez por día, aritmética una vez por segundo y solo la fracción por evento
+"""
+
+import datetime
+import math
+import re
+import sys
+import time
+from array import array
+
+ISO_8601 = "%Y-%m-%dT%H:%M:%S"
+ISO_8601_MS = "%Y-%m-%dT%H:%M:%S.%3fZ"
+ISO_8601_US = "%Y-%m-%dT%H:%M:%S.%fZ"
+LOGGING = "%Y-%m-%d %H:%M:%S,%3f"  # Mismo layout que el módulo logging
+EUROPEAN = "%d/%m/%Y %H:%M:%S"
+US = "%m/%d/%Y %H:%M:%S"
+DATE = "%Y-%m-%d"
+
+_TOKEN = re.compile(r"%(3f|6f|.)|[^%]+", re.DOTALL)
+# Códigos que cambian dentro del día y que sabemos calcular con aritmética
+_TIME_CODES = {"H", "M", "S"}
+_EXPANSIONS = {"T": "%H:%M:%S", "R": "%H:%M"}
+# Códigos que cambian dentro del día y que delegamos a strftime cada segundo
+_SLOW_CODES = {"I", "p", "X", "c", "r", "s"}
+_TWO_DIGITS = [f"{i:02d}" for i in range(60)]
+_THREE_DIGITS = [f"{i:03d}" for i in range(1000)]
+
+def _tokenize(layout):
+    """Lista de (tipo, valor): 'lit', 'date', 'time', 'slow' o 'frac' (dígitos)"""
+    tokens = []
+    for match in _TOKEN.finditer(layout):
+        code = match.group(1)
+        if code is None:
+            tokens.append(("lit", match.group(0)))
+        elif code == "%":
+            tokens.append(("lit", "%"))
+        elif code in _EXPANSIONS:
+            # Se expande como directiva: un "%%T" del usuario sigue siendo literal
+            tokens.extend(_tokenize(_EXPANSIONS[code]))
+        elif code in ("f", "6f"):
+            tokens.append(("frac", 6))
+        elif code == "3f":
+            tokens.append(("frac", 3))
+        elif code in _TIME_CODES:
+            tokens.append(("time", code))
+        elif code in _SLOW_CODES:
+            tokens.append(("slow", "%" + code))
+        else:
+            tokens.append(("date", "%" + code))
+    return tokens
+
+class TimestampFormatter:
+    """
+    Formateador de epochs (float en segundos o int en nanosegundos).
+    
+    - Por día: los códigos de fecha (%Y, %m, %d, %A, %B, %z...) se
+      formatean con strftime y se congelan en literales.
+    - Por segundo: %H, %M y %S salen de divmod y una tabla "00".."59";
+      el texto antes y después de la fracción queda cacheado.
+    - Por evento: solo se formatea la fracción (%f o %3f).
+    
+    Con zonas horarias que no son de offset fijo (DST) o con códigos como
+    %p, el cache por segundo usa strftime directamente.
+    
+    Se puede compartir entre threads: cada cache es una tupla inmutable que
+    se reemplaza de una vez, así que una llamada nunca mezcla el día o el
+    segundo de otra. Solo los contadores de actualizaciones son aproximados.
+    """
+    
+    def __init__(self, layout=ISO_8601_MS, tz=datetime.timezone.utc):
+        self.layout = layout
+        self.tz = tz
+        tokens = _tokenize(layout)
+        fracs = [i for i, (kind, _) in enumerate(tokens) if kind == "frac"]
+        if len(fracs) > 1:
+            raise ValueError("el layout solo puede tener una fracción de segundo")
+        
+        if fracs:
+            self._head_tokens = tokens[:fracs[0]]
+            self._tail_tokens = tokens[fracs[0] + 1:]
+            self.frac_digits = tokens[fracs[0]][1]
+        else:
+            self._head_tokens, self._tail_tokens, self.frac_digits = tokens, [], 0
+        self._frac_divisor = 10 ** (6 - self.frac_digits)
+        
+        self.fast = isinstance(tz, datetime.timezone) and not any(
+            kind == "slow" for kind, _ in tokens)
+        self._offset = int(tz.utcoffset(None).total_seconds()) if self.fast else 0
+        
+        self._day = None  # (inicio, fin, items de cabeza, items de cola)
+        self._cached = (None, "", "")  # (segundo, cabeza, cola)
+        self.day_updates = 0
+        self.second_updates = 0
+    
+    # --- Caches ---
+    
+    def _render_day(self, tokens, day):
+        """Congelar los códigos de fecha: queda una lista de literales y códigos de hora"""
+        items = []
+        for kind, value in tokens:
+            text = day.strftime(value) if kind == "date" else value
+            if kind != "time" and items and not isinstance(items[-1], tuple):
+                items[-1] += text
+            elif kind == "time":
+                items.append((value,))
+            else:
+                items.append(text)
+        return items
+    
+    def _update_day(self, second):
+        self.day_updates += 1
+        local_day = (second + self._offset) // 86400
+        start = local_day * 86400 - self._offset
+        day = datetime.datetime.fromtimestamp(start, self.tz)
+        self._day = (start, start + 86400, self._render_day(self._head_tokens, day),
+                     self._render_day(self._tail_tokens, day))
+        return self._day
+    
+    @staticmethod
+    def _render_second(items, hms):
+        return "".join(item if isinstance(item, str) else hms[item[0]] for item in items)
+    
+    def _update_second(self, second):
+        """Devuelve (cabeza, cola) de este segundo y lo deja cacheado"""
+        self.second_updates += 1
+        if not self.fast:
+            moment = datetime.datetime.fromtimestamp(second, self.tz)
+            head = moment.strftime(self._strftime_layout(self._head_tokens))
+            tail = moment.strftime(self._strftime_layout(self._tail_tokens))
+        else:
+            day = self._day
+            if day is None or not day[0] <= second < day[1]:
+                day = self._update_day(second)
+            start, _, day_head, day_tail = day
+            hours, rest = divmod(second - start, 3600)
+            minutes, seconds = divmod(rest, 60)
+            hms = {"H": _TWO_DIGITS[hours],
+                   "M": _TWO_DIGITS[minutes], "S": _TWO_DIGITS[seconds]}
+            head = self._render_second(day_head, hms)
+            tail = self._render_second(day_tail, hms)
+        self._cached = (second, head, tail)
+        return head, tail
+    
+    @staticmethod
+    def _strftime_layout(tokens):
+        parts = []
+        for kind, value in tokens:
+            if kind == "lit":
+                parts.append(value.replace("%", "%%"))
+            elif kind == "time":
+                parts.append("%" + value)
+            else:
+                parts.append(value)
+        return "".join(parts)
+    
+    # --- API pública ---
+    
+    def format(self, timestamp):
+        """Formatear un epoch en segundos (float), redondeando a microsegundos como datetime"""
+        frac, whole = math.modf(timestamp)
+        second = int(whole)
+        micros = round(frac * 1e6)
+        if micros < 0:
+            second -= 1
+            micros += 1_000_000
+        if micros >= 1_000_000:
+            second += 1
+            micros -= 1_000_000
+        cached_second, head, tail = self._cached
+        if second != cached_second:
+            head, tail = self._update_second(second)
+        if self.frac_digits == 3:
+            return head + _THREE_DIGITS[micros // 1000] + tail
+        if not self.frac_digits:
+            return head
+        return f"{head}{micros:06d}{tail}"
+    
+    def format_ns(self, timestamp_ns):
+        """Formatear un epoch en nanosegundos (int): exacto, sin errores de float"""
+        second, nanos = divmod(timestamp_ns, 1_000_000_000)
+        cached_second, head, tail = self._cached
+        if second != cached_second:
+            head, tail = self._update_second(second)
+        if not self.frac_digits:
+            return head
+        return f"{head}{nanos // (self._frac_divisor * 1000):0{self.frac_digits}d}{tail}"
+    
+    def format_datetime(self, moment):
+        """Formatear un datetime aware (los naive se interpretan como hora local)"""
+        return self.format(moment.timestamp())
+    
+    def format_many(self, timestamps):
+        """
+        Formatear un lote de epochs en segundos: list, array('d') o memoryview.
+        Con timestamps casi ordenados el cache por segundo acierta casi siempre.
+        """
+        out = []
+        append = out.append
+        modf = math.modf
+        digits = self.frac_digits
+        # Milisegundos desde una tabla de 1000 strings; µs con un spec constante
+        millis = _THREE_DIGITS if digits == 3 else None
+        last, head, tail = self._cached
+        for timestamp in timestamps:
+            frac, whole = modf(timestamp)
+            second = int(whole)
+            micros = round(frac * 1e6)
+            if micros < 0 or micros >= 1_000_000:
+                second, micros = divmod(second * 1_000_000 + micros, 1_000_000)
+            if second != last:
+                head, tail = self._update_second(second)
+                last = second
+            if millis is not None:
+                append(head + millis[micros // 1000] + tail)
+            elif digits:
+                append(f"{head}{micros:06d}{tail}")
+            else:
+                append(head)
+        return out
+    
+    def format_many_ns(self, timestamps_ns):
+        """Lote de epochs en nanosegundos, p. ej. array('q')"""
+        format_ns = self.format_ns
+        return [format_ns(timestamp) for timestamp in timestamps_ns]
+
+def demonstrate_layouts():
+    """Los layouts del demo de f-strings, comparados con strftime"""
+    print("=== Layouts Comunes ===")
+    
+    now = time.time()
+    moment = datetime.datetime.fromtimestamp(now, datetime.timezone.utc)
+    madrid = datetime.timezone(datetime.timedelta(hours=1), "CET")
+    layouts = [
+        ("ISO 8601", ISO_8601, datetime.timezone.utc),
+        ("ISO 8601 + µs", ISO_8601_US, datetime.timezone.utc),
+        ("Europeo", EUROPEAN, madrid),
+        ("US", US, datetime.timezone.utc),
+        ("Solo fecha", DATE, datetime.timezone.utc),
+        ("Fecha completa", "%A, %B %d, %Y %H:%M", madrid),
+        ("Con AM/PM (lento)", "%d/%m/%Y %I:%M:%S %p", datetime.timezone.utc),
+    ]
+    for name, layout, tz in layouts:
+        formatter = TimestampFormatter(layout, tz)
+        expected = datetime.datetime.fromtimestamp(now, tz).strftime(layout)
+        got = formatter.format(now)
+        status = "✅" if got == expected else "❌"
+        mode = "rápido" if formatter.fast else "strftime"
+        print(f"  {status} {name:>18} [{mode:>8}]: {got}")
+    
+    formatter = TimestampFormatter(ISO_8601_MS)
+    print(f"\nISO 8601 con milisegundos: {formatter.format(now)}")
+    print(f"Desde nanosegundos:        {formatter.format_ns(time.time_ns())}")
+    print(f"Desde datetime:            {formatter.format_datetime(moment)}")
+    print()
+
+def demonstrate_benchmark(count):
+    """Benchmark sobre un lote de epochs crecientes, como en un log"""
+    print(f"=== Benchmark: {count:,} timestamps ===")
+    
+    start_epoch = 1_700_000_000.0
+    # Eventos cada ~137µs: muchos por segundo, cruzando varios segundos
+    epochs = array("d", (start_epoch + i * 0.000137 for i in range(count)))
+    tz = datetime.timezone.utc
+    layout = LOGGING
+    formatter = TimestampFormatter(layout, tz)
+    
+    sample = epochs[:: max(1, count // 1000)]
+    # strftime no tiene %3f: se compara contra %f truncado a milisegundos
+    expected = [datetime.datetime.fromtimestamp(t, tz).strftime("%Y-%m-%d %H:%M:%S,%f")[:-3]
+                for t in sample]
+    assert formatter.format_many(sample) == expected, "difiere de strftime"
+    
+    fromtimestamp = datetime.datetime.fromtimestamp
+    
+    def logging_format(t):
+        # Lo que hace logging.Formatter.formatTime + el sufijo ,msecs
+        return "%s,%03d" % (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(t)), (t - int(t)) * 1000)
+    approaches = [
+        ("f'{dt:%Y-%m-%d...}'[:-3]", lambda: [f"{fromtimestamp(t, tz):%Y-%m-%d %H:%M:%S,%f}"[:-3] for t in epochs]),
+        ("logging.Formatter", lambda: [logging_format(t) for t in epochs]),
+        ("formatter.format", lambda: [formatter.format(t) for t in epochs]),
+        ("formatter.format_many", lambda: formatter.format_many(epochs)),
+    ]
+    for name, func in approaches:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>26}: {elapsed:6.3f}s  {count / elapsed:>12,.0f} timestamps/s")
+    
+    print(f"\nActualizaciones de cache: {formatter.day_updates} por día, "
+          f"{formatter.second_updates} por segundo")
+    print()
+
+if __name__ == "__main__":
+    print("=== Formateo de Timestamps ===")
+    print("f\"{now:%Y-%m-%d}\" llama a strftime en cada evento\n")
+    
+    demonstrate_layouts()
+    demonstrate_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
+    
+    print("=== Consejos ===")
+    print("1. La fecha cambia una vez al día: formatéala una vez al día")
+    print("2. Horas, minutos y segundos salen de divmod, sin strftime")
+    print("3. Usa time.time_ns() para fracciones exactas sin errores de float")
+    print("4. Con DST la hora local no es aritmética: se delega en strftime")
+    print("5. Formatear en lote reutiliza el cache entre eventos consecutivos")
@@ -0,0 +1,215 @@
+"""
+Benchmarks reproducibles de formateo de strings
+Warm-up, repeticiones, estadísticas, metadatos de la máquina e historial entre versiones de Python
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from pathlib import Path
+
+METHODS = ["%", ".format()", "f-string", "concatenación"]
+
+# Valores de ejemplo por tipo: (setup, cómo se convierten para concatenar)
+TYPES = {
+    "str": ("'Python'", "{name}"),
+    "int": ("1234567", "str({name})"),
+    "float": ("3.14159", "str({name})"),
+}
+
+# Specs por tipo: (%-format, format spec)
+SPECS = {
+    "sin spec": {"str": ("%s", ""), "int": ("%d", ""), "float": ("%s", "")},
+    "ancho": {"str": ("%-12s", "<12"), "int": ("%12d", ">12"), "float": ("%12s", ">12")},
+    "precisión": {"str": ("%.3s", ".3"), "int": ("%08d", "08d"), "float": ("%.2f", ".2f")},
+}
+
+ARG_COUNTS = [1, 3, 6]
+
+def build_case(arg_count, type_name, spec_name):
+    """Generar setup y una sentencia por método para un caso del benchmark"""
+    value, to_str = TYPES[type_name]
+    percent_spec, format_spec = SPECS[spec_name][type_name]
+    names = [f"v{i}" for i in range(arg_count)]
+    setup = "; ".join(f"{name} = {value}" for name in names)
+    
+    percent = "'" + ", ".join(f"k{i}={percent_spec}" for i in range(arg_count)) + "'"
+    percent += f" % ({', '.join(names)},)"
+    spec = f":{format_spec}" if format_spec else ""
+    dot_format = "'" + ", ".join(f"k{i}={{{spec}}}" for i in range(arg_count)) + "'"
+    dot_format += f".format({', '.join(names)})"
+    fstring = "f'" + ", ".join(f"k{i}={{{name}{spec}}}" for i, name in enumerate(names)) + "'"
+    
+    statements = {"%": percent, ".format()": dot_format, "f-string": fstring}
+    if not format_spec:
+        # La concatenación solo es comparable sin format spec
+        concat = " + ', ' + ".join(f"'k{i}=' + " + to_str.format(name=name)
+                                   for i, name in enumerate(names))
+        statements["concatenación"] = concat
+    return setup, statements
+
+def all_cases(quick=False):
+    arg_counts = [1, 3] if quick else ARG_COUNTS
+    for arg_count in arg_counts:
+        for type_name in TYPES:
+            for spec_name in SPECS:
+                yield f"{arg_count} args / {type_name} / {spec_name}", build_case(
+                    arg_count, type_name, spec_name)
+
+def machine_metadata():
+    """Versión de Python, build y CPU: sin esto los números no son comparables"""
+    cpu_model = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu_model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    
+    governor = None
+    try:
+        governor = Path("/sys/devices/system/cpu/cpu0/cpufreq/scaling_governor").read_text().strip()
+    except OSError:
+        pass
+    
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python_version": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "build": " ".join(platform.python_build()),
+        "compiler": platform.python_compiler(),
+        "executable": sys.executable,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_model": cpu_model,
+        "cpu_count": os.cpu_count(),
+        "cpu_governor": governor,
+    }
+
+def measure(statement, setup, repeat=7, min_time=0.05):
+    """
+    Medir una sentencia: warm-up con autorange (que además elige number),
+    luego `repeat` muestras. Devuelve estadísticas en ns por ejecución.
+    """
+    timer = timeit.Timer(statement, setup=setup)
+    number, _ = timer.autorange()  # Warm-up y calibración
+    number = max(1, int(number * min_time / 0.2))
+    samples = [t / number * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+    mean = statistics.fmean(samples) if hasattr(statistics, "fmean") else statistics.mean(samples)
+    return {
+        "number": number,
+        "min_ns": min(samples),
+        "median_ns": statistics.median(samples),
+        "mean_ns": mean,
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples_ns": samples,
+    }
+
+def run_suite(quick=False, repeat=7, min_time=0.05):
+    results = {}
+    for case_name, (setup, statements) in all_cases(quick):
+        results[case_name] = {}
+        for method, statement in statements.items():
+            results[case_name][method] = dict(
+                measure(statement, setup, repeat, min_time), statement=statement)
+    return results
+
+def print_results(results):
+    print(f"{'Caso':>34} | " + " | ".join(f"{m:>13}" for m in METHODS) + " | más rápido")
+    for case_name, methods in results.items():
+        cells = []
+        for method in METHODS:
+            stats = methods.get(method)
+            if stats is None:
+                cells.append(f"{'-':>13}")
+            else:
+                # Mediana ± desviación relativa
+                rel = stats["stdev_ns"] / stats["mean_ns"] * 100 if stats["mean_ns"] else 0
+                cells.append(f"{stats['median_ns']:>7.1f}ns±{rel:>2.0f}%")
+        fastest = min(methods, key=lambda m: methods[m]["median_ns"])
+        print(f"{case_name:>34} | " + " | ".join(cells) + f" | {fastest}")
+    
+    wins = {}
+    for methods in results.values():
+        fastest = min(methods, key=lambda m: methods[m]["median_ns"])
+        wins[fastest] = wins.get(fastest, 0) + 1
+    print(f"\nVictorias por método: {wins}")
+
+def load_history(path):
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def append_history(path, metadata, results):
+    """Una línea JSON por corrida: fácil de versionar y de procesar"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps({"metadata": metadata, "results": results}) + "\n")
+
+def compare(previous, current, threshold=0.05):
+    """Comparar medianas contra una corrida anterior; marca cambios > threshold"""
+    prev_meta, prev_results = previous["metadata"], previous["results"]
+    print(f"Comparando con {prev_meta['timestamp']} "
+          f"(Python {prev_meta['python_version']}, {prev_meta['cpu_model']})")
+    for case_name, methods in current.items():
+        for method, stats in methods.items():
+            before = prev_results.get(case_name, {}).get(method)
+            if before is None:
+                continue
+            ratio = stats["median_ns"] / before["median_ns"]
+            # Solo se reporta si supera el umbral y el ruido de ambas corridas
+            noise = (stats["stdev_ns"] + before["stdev_ns"]) / before["median_ns"]
+            if abs(ratio - 1) > max(threshold, noise):
+                change = "más lento" if ratio > 1 else "más rápido"
+                print(f"  {case_name:>34} {method:>13}: {before['median_ns']:7.1f} -> "
+                      f"{stats['median_ns']:7.1f} ns ({ratio:.2f}x, {change})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de formateo de strings")
+    parser.add_argument("--history", type=Path,
+                        help="Archivo JSON Lines donde acumular corridas (p. ej. formatting_history.jsonl)")
+    parser.add_argument("--quick", action="store_true", help="Menos casos y repeticiones")
+    parser.add_argument("--repeat", type=int, help="Repeticiones por caso (7; 3 en modo rápido)")
+    args = parser.parse_args(argv)
+    
+    # Sin historial ni --repeat se asume el modo demo: corrida rápida
+    quick = args.quick or (args.history is None and args.repeat is None)
+    repeat = args.repeat if args.repeat is not None else (3 if quick else 7)
+    
+    print("=== Benchmarks de Formateo ===")
+    metadata = machine_metadata()
+    print("Metadatos:")
+    for key in ("python_version", "implementation", "compiler", "platform", "cpu_model", "cpu_count", "cpu_governor"):
+        print(f"  {key}: {metadata[key]}")
+    if metadata["cpu_governor"] not in (None, "performance"):
+        print("  ⚠️  El governor de CPU no es 'performance': espera más ruido")
+    print()
+    
+    results = run_suite(quick=quick, repeat=repeat, min_time=0.02 if quick else 0.1)
+    print_results(results)
+    
+    if args.history is not None:
+        history = load_history(args.history)
+        if history:
+            print()
+            compare(history[-1], results)
+        append_history(args.history, metadata, results)
+        print(f"\nCorrida #{len(history) + 1} guardada en {args.history}")
+    
+    print("\n=== Consejos ===")
+    print("1. Mide la mediana de varias repeticiones, no una sola corrida")
+    print("2. El warm-up evita medir caches fríos y la especialización del intérprete")
+    print("3. Guarda versión de Python y CPU: los resultados cambian entre versiones")
+    print("4. Compara contra el ruido medido antes de declarar una regresión")
+    print("5. Uso: python examples/15_formatting_benchmarks.py --history formatting_history.jsonl")
+
+if __name__ == "__main__":
+    main()
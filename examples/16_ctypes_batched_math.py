@@ -0,0 +1,312 @@
+"""
+ctypes por lotes: libm sobre buffers completos en lugar de un double por llamada
+Zero-copy con array('d') y memoryview, kernel C compilado al vuelo y threads sin GIL
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import math
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+FUNCTIONS = ["cos", "sin", "tan", "exp", "log", "sqrt", "atan", "cbrt"]
+
+KERNEL_TEMPLATE = """
+#include <math.h>
+#include <stddef.h>
+
+void batch_{name}(const double *x, double *y, size_t n) {{
+    for (size_t i = 0; i < n; i++) {{
+        y[i] = {name}(x[i]);
+    }}
+}}
+"""
+
+def load_libm():
+    """Cargar libm según el sistema, igual que demonstrate_ctypes()"""
+    if platform.system() == "Windows":
+        return ctypes.CDLL("msvcrt.dll")
+    name = ctypes.util.find_library("m")
+    if name:
+        return ctypes.CDLL(name)
+    return ctypes.CDLL("libm.dylib" if platform.system() == "Darwin" else "libm.so.6")
+
+def find_compiler():
+    """Compilador de C disponible (o None): $CC, cc, gcc o clang"""
+    if platform.system() == "Windows":
+        return None
+    for candidate in (os.environ.get("CC"), "cc", "gcc", "clang"):
+        if candidate and shutil.which(candidate):
+            return shutil.which(candidate)
+    return None
+
+def cache_directory():
+    """
+    Directorio de caché privado del usuario: $XDG_CACHE_HOME o ~/.cache.
+    Nada de /tmp: ahí cualquier usuario podría plantar el .so que luego
+    cargamos con CDLL.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = Path(base) / "python-secrets" / "ctypes"
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    check_private(path)
+    return path
+
+def check_private(path):
+    """Exigir que `path` no sea un symlink, sea nuestro y nadie más pueda escribirlo"""
+    info = os.lstat(path)
+    if stat.S_ISLNK(info.st_mode):
+        raise PermissionError(f"{path} es un enlace simbólico")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"{path} pertenece a otro usuario")
+    if info.st_mode & 0o022:
+        raise PermissionError(f"{path} es escribible por otros usuarios")
+
+def write_private(path, text):
+    """Escribir un archivo con permisos 0o600, sin depender del umask"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0), 0o600)
+    os.fchmod(fd, 0o600)  # Si ya existía, con otros permisos
+    with open(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def compile_library(compiler, source, name, flags=()):
+    """
+    Compilar `source` una vez y cargarlo con ctypes.
+    El .so se cachea por hash del código y se verifica antes de cargarlo.
+    """
+    digest = hashlib.sha256(source.encode()).hexdigest()[:16]
+    cache_dir = cache_directory()
+    library = cache_dir / f"{name}_{digest}.so"
+    
+    try:
+        check_private(library)
+        cached = True
+    except FileNotFoundError:
+        cached = False
+    except PermissionError:
+        # Compilado con un umask permisivo (o manipulado): se descarta y se recompila
+        library.unlink()
+        cached = False
+    
+    if not cached:
+        c_file = cache_dir / f"{name}_{digest}.c"
+        write_private(c_file, source)
+        # Compilar a un nombre temporal y renombrar: atómico entre procesos
+        partial = library.with_suffix(f".{os.getpid()}.tmp")
+        subprocess.run([compiler, "-O2", "-shared", "-fPIC", "-o", str(partial), str(c_file), *flags],
+                       check=True, capture_output=True)
+        os.chmod(partial, 0o700)  # El compilador respeta el umask: puede quedar g+w
+        os.replace(partial, library)
+    check_private(library)
+    return ctypes.CDLL(str(library))
+
+def build_kernels(compiler, functions=FUNCTIONS):
+    """Compilar (una vez) una biblioteca con un bucle C por función"""
+    source = "".join(KERNEL_TEMPLATE.format(name=name) for name in functions)
+    return compile_library(compiler, source, "batched_math", ["-lm"])
+
+def buffer_address(values, writable=False):
+    """
+    (dirección, longitud, objeto a mantener vivo) de un buffer de doubles.
+    array('d') y memoryviews escribibles no se copian; el resto sí, salvo
+    con writable=True (buffer de salida): una copia perdería el resultado.
+    """
+    if isinstance(values, array) and values.typecode == "d":
+        address, length = values.buffer_info()
+        return address, length, values
+    
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format == "d" and view.c_contiguous and not view.readonly:
+        length = view.nbytes // 8
+        if length == 0:
+            return 0, 0, view
+        return ctypes.addressof(ctypes.c_double.from_buffer(view)), length, view
+    
+    if writable:
+        if view is None or view.format != "d":
+            raise TypeError(f"la salida debe ser un buffer de doubles ('d'), no {type(values).__name__}")
+        if view.readonly:
+            raise TypeError("el buffer de salida es de solo lectura")
+        raise ValueError("el buffer de salida no es contiguo")
+    
+    copy = array("d", values)
+    address, length = copy.buffer_info()
+    return address, length, copy
+
+class BatchedMath:
+    """
+    Funciones de libm aplicadas a buffers completos.
+    
+    - Con compilador: un bucle C por función; una sola llamada FFI por
+      bloque y, como ctypes libera el GIL, los bloques van en paralelo.
+    - Sin compilador: bucle Python que llama al puntero de libm cacheado
+      (con argtypes/restype ya configurados).
+    """
+    
+    def __init__(self, threads=None, chunk_size=1 << 18, use_compiler=True):
+        self.libm = load_libm()
+        self.threads = threads or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.kernels = None
+        compiler = find_compiler() if use_compiler else None
+        if compiler:
+            try:
+                self.kernels = build_kernels(compiler)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"⚠️  No se pudo compilar el kernel ({e}); usando ctypes por elemento")
+        self._scalar = {}
+        self._batched = {}
+        self._pool = None
+    
+    @property
+    def backend(self):
+        return "kernel C por lotes" if self.kernels is not None else "ctypes por elemento"
+    
+    def scalar_function(self, name):
+        """Puntero de libm con tipos configurados, cacheado"""
+        func = self._scalar.get(name)
+        if func is None:
+            func = getattr(self.libm, name)
+            func.argtypes = [ctypes.c_double]
+            func.restype = ctypes.c_double
+            self._scalar[name] = func
+        return func
+    
+    def batched_function(self, name):
+        func = self._batched.get(name)
+        if func is None:
+            func = getattr(self.kernels, f"batch_{name}")
+            func.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+            func.restype = None
+            self._batched[name] = func
+        return func
+    
+    def apply(self, name, values, out=None):
+        """Aplicar la función `name` de libm a todo el buffer; devuelve array('d')"""
+        in_address, length, keep_in = buffer_address(values)
+        if out is None:
+            out = array("d", bytes(8 * length))
+        out_address, out_length, keep_out = buffer_address(out, writable=True)
+        if out_length < length:
+            raise ValueError("el buffer de salida es más corto que la entrada")
+        
+        if self.kernels is None or name not in FUNCTIONS:
+            func = self.scalar_function(name)
+            source = keep_in if isinstance(keep_in, array) else memoryview(keep_in)
+            target = keep_out if isinstance(keep_out, array) else memoryview(keep_out)
+            for i in range(length):
+                target[i] = func(source[i])
+            return out
+        
+        func = self.batched_function(name)
+        if self.threads == 1 or length <= self.chunk_size:
+            func(in_address, out_address, length)
+            return out
+        
+        # Bloques en paralelo: cada llamada FFI suelta el GIL
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads)
+        futures = []
+        for start in range(0, length, self.chunk_size):
+            count = min(self.chunk_size, length - start)
+            futures.append(self._pool.submit(
+                func, in_address + start * 8, out_address + start * 8, count))
+        for future in futures:
+            future.result()
+        return out
+    
+    def cos(self, values, out=None):
+        return self.apply("cos", values, out)
+    
+    def sin(self, values, out=None):
+        return self.apply("sin", values, out)
+    
+    def sqrt(self, values, out=None):
+        return self.apply("sqrt", values, out)
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+def demonstrate_batched():
+    """Uso básico y verificación contra math.cos"""
+    print("=== libm por Lotes ===")
+    
+    batched = BatchedMath()
+    print(f"Backend: {batched.backend}, threads: {batched.threads}")
+    
+    angles = array("d", [0.0, math.pi / 3, math.pi / 2, math.pi])
+    print(f"cos({list(angles)}) = {list(batched.cos(angles))}")
+    
+    # memoryview sobre un bytearray: tampoco se copia
+    raw = bytearray(array("d", [1.0, 4.0, 9.0]).tobytes())
+    view = memoryview(raw).cast("d")
+    result = batched.sqrt(view, out=view)
+    print(f"sqrt in-place sobre memoryview: {list(result)}")
+    
+    fallback = BatchedMath(use_compiler=False)
+    print(f"Sin compilador ({fallback.backend}): {list(fallback.cos(angles))}")
+    batched.close()
+    print()
+
+def demonstrate_benchmark(count):
+    """Throughput contra math.cos en una list comprehension"""
+    print(f"=== Benchmark: {count:,} doubles ===")
+    
+    values_list = [i * 0.001 for i in range(count)]
+    values = array("d", values_list)
+    single = BatchedMath(threads=1)
+    threaded = BatchedMath()
+    scalar = BatchedMath(use_compiler=False)
+    libm_cos = scalar.scalar_function("cos")
+    
+    reference = array("d", [math.cos(x) for x in values_list])
+    assert single.cos(values) == reference, "el kernel C difiere de math.cos"
+    
+    approaches = [
+        ("[math.cos(x) for x]", lambda: [math.cos(x) for x in values_list]),
+        ("[libm.cos(x) for x]", lambda: [libm_cos(x) for x in values_list]),
+        ("ctypes por elemento", lambda: scalar.cos(values)),
+    ]
+    if single.kernels is not None:
+        out = array("d", bytes(8 * count))
+        approaches += [
+            ("kernel C, 1 thread", lambda: single.cos(values, out)),
+            (f"kernel C, {threaded.threads} threads", lambda: threaded.cos(values, out)),
+        ]
+    
+    for name, func in approaches:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{name:>24}: {elapsed * 1000:8.1f} ms  {count / elapsed / 1e6:8.1f} M elementos/s")
+    
+    threaded.close()
+    print()
+
+if __name__ == "__main__":
+    print("=== ctypes por Lotes ===")
+    print("Llamar a libm un double a la vez está dominado por el coste del FFI\n")
+    
+    demonstrate_batched()
+    demonstrate_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
+    
+    print("=== Consejos ===")
+    print("1. Cada llamada ctypes cuesta cientos de ns: pasa buffers, no escalares")
+    print("2. array('d').buffer_info() da la dirección sin copiar")
+    print("3. ctypes.CDLL suelta el GIL: los bloques grandes escalan con threads")
+    print("4. Configura argtypes/restype una vez y cachea el puntero")
+    print("5. Sin compilador, el bucle por elemento sigue funcionando")
@@ -0,0 +1,253 @@
+"""
+Arrays de ctypes.Structure en memoria compartida
+Millones de registros entre procesos sin pickle: solo viaja el nombre del segmento
+"""
+
+import ctypes
+import math
+import os
+import pickle
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class Point(ctypes.Structure):
+    """El mismo Point de demonstrate_ctypes()"""
+    _fields_ = [("x", ctypes.c_double),
+                ("y", ctypes.c_double)]
+
+# Formato de memoryview para cada tipo ctypes escalar
+_FORMATS = {ctypes.c_double: "d", ctypes.c_float: "f", ctypes.c_int32: "i",
+            ctypes.c_int64: "q", ctypes.c_uint8: "B"}
+_NUMPY_TYPES = {ctypes.c_double: "f8", ctypes.c_float: "f4", ctypes.c_int32: "i4",
+                ctypes.c_int64: "i8", ctypes.c_uint8: "u1"}
+
+def attach_shared_memory(name):
+    """
+    Abrir un segmento existente sin volver a registrarlo en el resource tracker.
+    Los workers de un Pool comparten el tracker del padre, y el registro es
+    idempotente, así que antes de Python 3.13 basta con no llamar a unregister
+    (lo haría el padre dos veces al hacer unlink).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+class SharedStructArray:
+    """
+    N registros de un ctypes.Structure dentro de un SharedMemory.
+    
+    Las tres vistas comparten los mismos bytes, sin copias:
+    - `records`: array ctypes (struct_type * N), records[i].x
+    - `buffer`: memoryview de bytes de todo el bloque
+    - `field(name)`: memoryview con stride sobre un campo, p. ej. todas las x
+    """
+    
+    def __init__(self, struct_type, length, name=None):
+        self.struct_type = struct_type
+        self.length = length
+        self.itemsize = ctypes.sizeof(struct_type)
+        nbytes = max(1, self.itemsize * length)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            self.shm = attach_shared_memory(name)
+            self.owner = False
+        self.buffer = self.shm.buf[:self.itemsize * length]
+        self.records = (struct_type * length).from_buffer(self.shm.buf)
+        self._fields = {}
+    
+    @classmethod
+    def attach(cls, struct_type, length, name):
+        """Abrir desde otro proceso; (struct_type, length, name) es todo lo que viaja"""
+        return cls(struct_type, length, name)
+    
+    @property
+    def name(self):
+        return self.shm.name
+    
+    def handle(self):
+        """Lo que se envía a los workers: unos pocos bytes en lugar de N registros"""
+        return self.struct_type, self.length, self.name
+    
+    def field(self, field_name):
+        """Vista strided de un campo escalar: se lee y escribe como una secuencia"""
+        view = self._fields.get(field_name)
+        if view is None:
+            ctype = dict(self.struct_type._fields_)[field_name]
+            offset = getattr(self.struct_type, field_name).offset
+            size = ctypes.sizeof(ctype)
+            if self.itemsize % size or offset % size:
+                raise TypeError(f"el campo {field_name} no está alineado a su tamaño")
+            flat = self.buffer.cast(_FORMATS[ctype])
+            view = flat[offset // size::self.itemsize // size]
+            self._fields[field_name] = view
+        return view
+    
+    def as_numpy(self):
+        """Array estructurado de numpy sobre el mismo buffer (si numpy está instalado)"""
+        if numpy is None:
+            raise RuntimeError("numpy no está instalado")
+        dtype = numpy.dtype({
+            "names": [name for name, _ in self.struct_type._fields_],
+            "formats": [_NUMPY_TYPES[ctype] for _, ctype in self.struct_type._fields_],
+            "offsets": [getattr(self.struct_type, name).offset for name, _ in self.struct_type._fields_],
+            "itemsize": self.itemsize,
+        })
+        return numpy.frombuffer(self.buffer, dtype=dtype)
+    
+    def __len__(self):
+        return self.length
+    
+    def __getitem__(self, index):
+        return self.records[index]
+    
+    def close(self):
+        """Soltar las vistas (si no, SharedMemory.close lanza BufferError)"""
+        for view in self._fields.values():
+            view.release()
+        self._fields.clear()
+        self.records = None
+        self.buffer.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def distances_to_origin(points, out=None, start=0, stop=None):
+    """
+    Distancia al origen de points[start:stop] de una sola vez.
+    Con numpy: aritmética vectorizada; sin numpy: map(math.hypot) sobre las
+    vistas strided, sin crear un objeto Point por registro.
+    """
+    stop = len(points) if stop is None else stop
+    if out is None:
+        out = array("d", bytes(8 * (stop - start)))
+        out_offset = 0
+    else:
+        out_offset = start
+    
+    if numpy is not None:
+        records = points.as_numpy()[start:stop]
+        target = numpy.frombuffer(out, dtype="f8")[out_offset:out_offset + stop - start]
+        numpy.hypot(records["x"], records["y"], out=target)
+        return out
+    
+    xs = points.field("x")[start:stop]
+    ys = points.field("y")[start:stop]
+    target = memoryview(out).cast("B").cast("d") if not isinstance(out, array) else out
+    target[out_offset:out_offset + stop - start] = array("d", map(math.hypot, xs, ys))
+    return out
+
+def _worker_distances(handle, out_name, start, stop):
+    """Worker: se adjunta a los segmentos por nombre y escribe su rango"""
+    with SharedStructArray.attach(*handle) as points:
+        out = attach_shared_memory(out_name)
+        try:
+            distances_to_origin(points, out.buf, start, stop)
+        finally:
+            out.close()
+    return stop - start
+
+def _worker_pickled(chunk):
+    """Alternativa clásica: los registros llegan (y vuelven) serializados"""
+    return [math.hypot(x, y) for x, y in chunk]
+
+def parallel_distances(points, workers):
+    """Distancias calculadas por varios procesos directamente en memoria compartida"""
+    out = shared_memory.SharedMemory(create=True, size=max(8, 8 * len(points)))
+    try:
+        step = -(-len(points) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_worker_distances, points.handle(), out.name,
+                                start, min(start + step, len(points)))
+                for start in range(0, len(points), step)
+            ]
+            for future in futures:
+                future.result()
+        result = array("d")
+        result.frombytes(out.buf[:8 * len(points)])
+        return result
+    finally:
+        out.close()
+        out.unlink()
+
+def demonstrate_structured_array():
+    """Vistas ctypes, memoryview y por campo sobre el mismo bloque"""
+    print("=== Array Estructurado Compartido ===")
+    
+    with SharedStructArray(Point, 4) as points:
+        points.field("x")[:] = array("d", [3.0, 6.0, 5.0, 8.0])
+        points.field("y")[:] = array("d", [4.0, 8.0, 12.0, 15.0])
+        
+        print(f"Segmento: {points.name}, {len(points)} x {points.itemsize} bytes")
+        print(f"points[0] (ctypes, sin copia): ({points[0].x}, {points[0].y})")
+        points[0].x = 0.0
+        points[0].y = 1.0
+        print(f"Modificado vía ctypes, visto en field('x'): {list(points.field('x'))}")
+        print(f"Distancias: {list(distances_to_origin(points))}")
+        print(f"Backend vectorizado: {'numpy' if numpy is not None else 'map(math.hypot) sobre memoryview'}")
+    print()
+
+def demonstrate_benchmark(count, workers):
+    """Memoria compartida contra pickle de registros con ProcessPoolExecutor"""
+    print(f"=== Benchmark: {count:,} puntos, {workers} procesos ===")
+    
+    with SharedStructArray(Point, count) as points:
+        xs = array("d", (float(i % 1000) for i in range(count)))
+        ys = array("d", (float(i % 777) for i in range(count)))
+        points.field("x")[:] = xs
+        points.field("y")[:] = ys
+        
+        start = time.perf_counter()
+        shared_result = parallel_distances(points, workers)
+        shared_time = time.perf_counter() - start
+        
+        tuples = list(zip(xs, ys))
+        payload = len(pickle.dumps(tuples[:10_000])) * count / 10_000
+        start = time.perf_counter()
+        step = -(-count // workers)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = [tuples[i:i + step] for i in range(0, count, step)]
+            pickled_result = [d for part in executor.map(_worker_pickled, chunks) for d in part]
+        pickled_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        local_result = distances_to_origin(points)
+        local_time = time.perf_counter() - start
+        
+        assert list(shared_result) == pickled_result == list(local_result)
+        print(f"{'pickle de tuplas':>24}: {pickled_time:6.3f}s  (~{payload / 1024**2:.1f} MB serializados)")
+        print(f"{'memoria compartida':>24}: {shared_time:6.3f}s  (solo nombre + rango por tarea)")
+        print(f"{'vectorizado en proceso':>24}: {local_time:6.3f}s")
+    print()
+
+if __name__ == "__main__":
+    print("=== Structures de ctypes en Memoria Compartida ===")
+    print("Mover registros pequeños entre procesos con pickle es el cuello de botella\n")
+    
+    demonstrate_structured_array()
+    demonstrate_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+                          min(4, os.cpu_count() or 1))
+    
+    print("=== Consejos ===")
+    print("1. (Struct * N).from_buffer(shm.buf) crea N registros sin copiar")
+    print("2. memoryview.cast + slicing con paso da vistas por campo")
+    print("3. A los workers solo se envía el nombre del segmento y un rango")
+    print("4. Libera las vistas antes de SharedMemory.close()")
+    print("5. Solo el proceso dueño llama a unlink()")
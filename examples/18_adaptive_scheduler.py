@@ -0,0 +1,266 @@
+"""
+Scheduler adaptativo para Pool de procesos
+Chunksize que se ajusta midiendo el coste por tarea, robo de trabajo y reporte de utilización
+"""
+
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+@dataclass
+class WorkerStats:
+    worker: int
+    tasks: int = 0
+    chunks: int = 0
+    steals: int = 0
+    busy: float = 0.0
+    finished_at: float = 0.0
+    chunk_sizes: List[int] = field(default_factory=list)
+
+@dataclass
+class SchedulerReport:
+    wall: float
+    workers: List[WorkerStats]
+    
+    @property
+    def utilization(self):
+        """Fracción del tiempo total de los workers dedicada a tareas"""
+        return sum(w.busy for w in self.workers) / (self.wall * len(self.workers))
+    
+    @property
+    def imbalance_loss(self):
+        """Segundos-worker ociosos al final: unos terminaron mientras otros seguían"""
+        last = max(w.finished_at for w in self.workers)
+        return sum(last - w.finished_at for w in self.workers)
+    
+    def show(self, title):
+        print(f"{title}: {self.wall:.2f}s, utilización {self.utilization:.0%}, "
+              f"perdido por desbalance {self.imbalance_loss:.2f} s-worker")
+        for w in self.workers:
+            sizes = f", chunks {min(w.chunk_sizes)}..{max(w.chunk_sizes)}" if w.chunk_sizes else ""
+            steals = f", robos {w.steals}" if w.steals else ""
+            print(f"    worker {w.worker}: {w.tasks:4} tareas, ocupado {w.busy:5.2f}s "
+                  f"({w.busy / self.wall:4.0%}){sizes}{steals}")
+
+def _claim(bounds, worker, workers):
+    """
+    Reclamar el rango propio; si está vacío, robar la mitad superior del
+    rango pendiente más grande. Se llama con el lock tomado.
+    """
+    start, end = bounds[2 * worker], bounds[2 * worker + 1]
+    if start < end:
+        return start, end, False
+    
+    victim = max(range(workers), key=lambda w: bounds[2 * w + 1] - bounds[2 * w])
+    victim_start, victim_end = bounds[2 * victim], bounds[2 * victim + 1]
+    remaining = victim_end - victim_start
+    if remaining <= 0:
+        return None, None, False
+    middle = victim_start + remaining // 2
+    bounds[2 * victim + 1] = middle
+    bounds[2 * worker], bounds[2 * worker + 1] = middle, victim_end
+    return middle, victim_end, True
+
+def _worker_main(worker, workers, func, tasks, bounds, lock, results, target, max_chunk):
+    stats = WorkerStats(worker)
+    try:
+        _run_chunks(worker, workers, func, tasks, bounds, lock, results, target, max_chunk, stats)
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(f"{type(e).__name__}: {e}")
+        results.put(("error", worker, e))
+    finally:
+        # Siempre avisar al padre, aunque la tarea haya fallado
+        stats.finished_at = time.monotonic()
+        results.put(("done", stats))
+
+def _run_chunks(worker, workers, func, tasks, bounds, lock, results, target, max_chunk, stats):
+    per_task = None  # EWMA del coste por tarea, medido en este worker
+    while True:
+        with lock:
+            start, end, stolen = _claim(bounds, worker, workers)
+            if start is None:
+                return
+            if per_task is None:
+                size = 1  # Primera tarea: sonda para estimar el coste
+            else:
+                size = max(1, min(max_chunk, int(target / max(per_task, 1e-9))))
+            # Dejar siempre la mitad del rango para que otros puedan robarla
+            size = min(size, max(1, (end - start) // 2))
+            stop = start + size
+            bounds[2 * worker] = stop
+        stats.steals += stolen
+        
+        began = time.perf_counter()
+        chunk_results = [func(tasks[i]) for i in range(start, stop)]
+        elapsed = time.perf_counter() - began
+        
+        cost = elapsed / size
+        per_task = cost if per_task is None else 0.7 * per_task + 0.3 * cost
+        stats.tasks += size
+        stats.chunks += 1
+        stats.busy += elapsed
+        stats.chunk_sizes.append(size)
+        results.put(("chunk", start, chunk_results))
+
+class AdaptiveScheduler:
+    """
+    map() paralelo para tareas de duración muy variable.
+    
+    Cada worker empieza con un bloque contiguo de índices. Reclama trozos
+    de su bloque con un chunksize = target_chunk_time / coste medido por
+    tarea, y al vaciarse roba la mitad del mayor bloque pendiente.
+    Los límites viven en un multiprocessing.Array compartido: las tareas
+    no viajan por una cola, solo los índices y los resultados.
+    """
+    
+    def __init__(self, workers=None, target_chunk_time=0.02, max_chunk=1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.target_chunk_time = target_chunk_time
+        self.max_chunk = max_chunk
+        self.last_report = None
+    
+    def map(self, func, tasks):
+        tasks = list(tasks)
+        workers = min(self.workers, max(1, len(tasks)))
+        bounds = multiprocessing.Array("q", 2 * workers, lock=False)
+        step = -(-len(tasks) // workers)
+        for w in range(workers):
+            bounds[2 * w] = min(len(tasks), w * step)
+            bounds[2 * w + 1] = min(len(tasks), (w + 1) * step)
+        lock = multiprocessing.Lock()
+        results = multiprocessing.Queue()
+        
+        started = time.monotonic()
+        processes = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(w, workers, func, tasks, bounds, lock, results,
+                      self.target_chunk_time, self.max_chunk),
+                daemon=True)
+            for w in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        
+        output = [None] * len(tasks)
+        stats = []
+        try:
+            while len(stats) < workers:
+                try:
+                    message = results.get(timeout=0.5)
+                except queue.Empty:
+                    # Un worker que muere (señal, os._exit) nunca envía "done"
+                    dead = [p for p in processes if p.exitcode not in (None, 0)]
+                    if dead:
+                        raise RuntimeError(f"un worker terminó con código {dead[0].exitcode}")
+                    continue
+                if message[0] == "chunk":
+                    _, start, chunk_results = message
+                    output[start:start + len(chunk_results)] = chunk_results
+                elif message[0] == "error":
+                    raise message[2]
+                else:
+                    stats.append(message[1])
+        finally:
+            for process in processes:
+                if len(stats) < workers:
+                    process.terminate()
+                process.join()
+        
+        wall = max(s.finished_at for s in stats) - started
+        self.last_report = SchedulerReport(wall, sorted(stats, key=lambda s: s.worker))
+        return output
+
+# --- Baselines instrumentadas ---
+
+def _timed(args):
+    """Ejecutar la tarea registrando pid e intervalo, para medir baselines"""
+    func, task = args
+    began = time.monotonic()
+    result = func(task)
+    return result, os.getpid(), began, time.monotonic()
+
+def report_from_spans(spans, started):
+    """Reconstruir utilización por worker a partir de (pid, inicio, fin)"""
+    by_pid = {}
+    for pid, began, ended in spans:
+        stats = by_pid.setdefault(pid, WorkerStats(len(by_pid)))
+        stats.tasks += 1
+        stats.busy += ended - began
+        stats.finished_at = max(stats.finished_at, ended)
+    wall = max(s.finished_at for s in by_pid.values()) - started
+    return SchedulerReport(wall, list(by_pid.values()))
+
+def run_pool_map(func, tasks, workers, chunksize=None):
+    started = time.monotonic()
+    with multiprocessing.Pool(workers) as pool:
+        out = pool.map(_timed, [(func, t) for t in tasks], chunksize=chunksize)
+    return [r[0] for r in out], report_from_spans([r[1:] for r in out], started)
+
+def run_executor_submit(func, tasks, workers):
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_timed, (func, t)) for t in tasks]
+        out = [future.result() for future in futures]
+    return [r[0] for r in out], report_from_spans([r[1:] for r in out], started)
+
+# --- Tareas de ejemplo ---
+
+def skewed_task(duration):
+    """Tarea de duración dada: sleep para que el benchmark no dependa del número de cores"""
+    time.sleep(duration)
+    return duration
+
+def skewed_durations(count, seed=42, scale=0.002):
+    """Duraciones de cola pesada (Pareto): la mayoría cortas, unas pocas enormes"""
+    rng = random.Random(seed)
+    return [min(scale * rng.paretovariate(1.2), 0.5) for _ in range(count)]
+
+def demonstrate_benchmark(count, workers):
+    """Comparar chunking estático, submit por tarea y el scheduler adaptativo"""
+    print(f"=== Benchmark: {count} tareas de cola pesada, {workers} workers ===")
+    
+    durations = skewed_durations(count)
+    ideal = sum(durations) / workers
+    print(f"Trabajo total {sum(durations):.2f}s, ideal {ideal:.2f}s, "
+          f"tarea más larga {max(durations):.2f}s\n")
+    
+    results, report = run_pool_map(skewed_task, durations, workers)
+    report.show("pool.map (chunksize por defecto)")
+    assert results == durations
+    
+    results, report = run_pool_map(skewed_task, durations, workers, chunksize=1)
+    report.show("\npool.map (chunksize=1)")
+    
+    results, report = run_executor_submit(skewed_task, durations, workers)
+    report.show("\nexecutor.submit por tarea")
+    
+    scheduler = AdaptiveScheduler(workers)
+    results = scheduler.map(skewed_task, durations)
+    assert results == durations
+    scheduler.last_report.show("\nAdaptiveScheduler")
+    print()
+
+if __name__ == "__main__":
+    print("=== Scheduler Adaptativo ===")
+    print("El chunking estático deja cores ociosos al final con tareas de cola pesada\n")
+    
+    demonstrate_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 400,
+                          max(4, os.cpu_count() or 1))
+    
+    print("=== Consejos ===")
+    print("1. Mide el coste por tarea en línea y ajusta el chunksize a un tiempo objetivo")
+    print("2. Bloques grandes al principio, pequeños al final (guided scheduling)")
+    print("3. Robar la mitad del mayor bloque pendiente corrige el desbalance")
+    print("4. Reporta la utilización por worker, no solo el tiempo total")
+    print("5. Comparte índices, no tareas: menos pickle en la cola")
@@ -0,0 +1,359 @@
+"""
+Selección automática de executor: threads, procesos o asyncio
+Perfilar una muestra de llamadas (CPU vs wall vs GIL) y enrutar el resto
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+THREAD, PROCESS, ASYNCIO = "thread", "process", "asyncio"
+
+class GILProbe:
+    """
+    Estimar cuánto tiempo retiene el GIL el código que corre en paralelo.
+    
+    Un thread auxiliar duerme `interval` y mide cuánto tarda realmente en
+    despertar: si otro thread retiene el GIL, el probe espera al switch
+    interval (5 ms por defecto). Retraso acumulado / wall ≈ fracción con GIL.
+    
+    El retraso también incluye la espera por CPU del sistema operativo
+    (con 1 CPU, cualquier carga lo retrasa): calibrate() mide esa parte con
+    una carga que no retiene el GIL, para descontarla.
+    """
+    
+    def __init__(self, interval=0.0005):
+        self.interval = interval
+        self.delay = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self):
+        interval = self.interval
+        while not self._stop.is_set():
+            before = time.perf_counter()
+            time.sleep(interval)
+            late = time.perf_counter() - before - interval
+            if late > interval:
+                self.delay += late
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+    
+    @classmethod
+    def calibrate(cls, duration=0.1):
+        """Fracción de retraso del probe con CPU ocupada sin GIL (hashlib sobre 4 MB)"""
+        data = bytes(4 * 1024 * 1024)
+        stop = threading.Event()
+        
+        def load():
+            while not stop.is_set():
+                hashlib.sha256(data).digest()
+        
+        worker = threading.Thread(target=load, daemon=True)
+        with cls() as probe:
+            worker.start()
+            start = time.perf_counter()
+            time.sleep(duration)
+            wall = time.perf_counter() - start
+            stop.set()
+            worker.join()
+        return min(1.0, probe.delay / wall)
+
+@dataclass
+class Decision:
+    """Perfil acumulado de una función y el backend elegido"""
+    name: str
+    backend: str = THREAD
+    reason: str = "sin muestras todavía"
+    walls: List[float] = field(default_factory=list)
+    cpu_ratios: List[float] = field(default_factory=list)
+    gil_fractions: List[float] = field(default_factory=list)
+    calls: int = 0
+    pending_samples: int = 0
+    decided_at_call: int = 0
+    evaluations: int = 0
+    
+    @property
+    def wall(self):
+        return statistics.median(self.walls) if self.walls else 0.0
+    
+    @property
+    def cpu_ratio(self):
+        return statistics.median(self.cpu_ratios) if self.cpu_ratios else 0.0
+    
+    @property
+    def gil_fraction(self):
+        return statistics.median(self.gil_fractions) if self.gil_fractions else 0.0
+
+class AutoExecutor:
+    """
+    Facade sobre un ThreadPoolExecutor, un ProcessPoolExecutor y un loop asyncio.
+    
+    - Las corutinas van siempre al loop asyncio (en un thread propio).
+    - De cada función se perfilan las primeras `sample_size` llamadas
+      (una a una, con thread_time, perf_counter y GILProbe). El retraso
+      que el probe sufre igual con una carga sin GIL (GILProbe.calibrate)
+      se descuenta: con pocas CPUs no es culpa del GIL.
+    - Con el perfil: poco CPU → threads; mucho CPU con GIL → procesos
+      (si la función se puede picklear); mucho CPU sin GIL (extensiones C
+      que lo sueltan) o tareas demasiado cortas → threads.
+    - Cada `reevaluate_every` llamadas se vuelve a perfilar.
+    """
+    
+    def __init__(self, max_workers=None, sample_size=3, reevaluate_every=500,
+                 cpu_threshold=0.3, gil_threshold=0.5, min_process_task=0.002):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.sample_size = sample_size
+        self.reevaluate_every = reevaluate_every
+        self.cpu_threshold = cpu_threshold
+        self.gil_threshold = gil_threshold
+        self.min_process_task = min_process_task
+        self.decisions = {}
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=max(4, self.max_workers * 4))
+        self._profiler = ThreadPoolExecutor(max_workers=1)  # Muestras de a una
+        self._processes = None
+        self._gil_baseline = None  # Lo calibra el thread de perfilado, una vez
+        self._loop = None
+        self._loop_thread = None
+    
+    # --- Backends perezosos ---
+    
+    def _process_pool(self):
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._processes
+    
+    def _event_loop(self):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._loop_thread.start()
+        return self._loop
+    
+    # --- Perfilado y decisión ---
+    
+    @staticmethod
+    def _key(fn):
+        return f"{getattr(fn, '__module__', '?')}.{getattr(fn, '__qualname__', repr(fn))}"
+    
+    def _gil_fraction(self, delay, wall):
+        """Retraso del probe / wall, descontando el que no se debe al GIL"""
+        if not wall:
+            return 0.0
+        raw = min(1.0, delay / wall)
+        baseline = self._gil_baseline
+        if baseline >= 0.9:
+            return raw  # Máquina saturada: el probe no distingue nada
+        return max(0.0, (raw - baseline) / (1.0 - baseline))
+    
+    def _profiled_call(self, decision, fn, args, kwargs):
+        if self._gil_baseline is None:
+            self._gil_baseline = GILProbe.calibrate()
+        with GILProbe() as probe:
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                cpu = time.thread_time() - cpu_start
+                wall = time.perf_counter() - wall_start
+                with self._lock:
+                    decision.pending_samples -= 1
+                    decision.walls.append(wall)
+                    decision.cpu_ratios.append(cpu / wall if wall else 0.0)
+                    decision.gil_fractions.append(self._gil_fraction(probe.delay, wall))
+                    del decision.walls[:-self.sample_size]
+                    del decision.cpu_ratios[:-self.sample_size]
+                    del decision.gil_fractions[:-self.sample_size]
+                    self._decide(decision, fn)
+    
+    def _decide(self, decision, fn):
+        decision.evaluations += 1
+        decision.decided_at_call = decision.calls
+        if decision.cpu_ratio < self.cpu_threshold:
+            decision.backend, decision.reason = THREAD, "espera más de lo que calcula (I/O)"
+        elif decision.wall < self.min_process_task:
+            decision.backend, decision.reason = THREAD, "demasiado corta para compensar el IPC"
+        elif decision.gil_fraction < self.gil_threshold:
+            decision.backend, decision.reason = THREAD, "usa CPU pero suelta el GIL"
+        elif not self._picklable(fn):
+            decision.backend, decision.reason = THREAD, "CPU con GIL, pero no se puede picklear"
+        else:
+            decision.backend, decision.reason = PROCESS, "CPU con GIL: necesita otro proceso"
+    
+    @staticmethod
+    def _picklable(fn):
+        try:
+            pickle.dumps(fn)
+            return True
+        except Exception:
+            return False
+    
+    # --- API pública ---
+    
+    def submit(self, fn, *args, **kwargs):
+        """Como Executor.submit; devuelve un concurrent.futures.Future"""
+        if inspect.iscoroutinefunction(fn):
+            decision = self._decision(fn)
+            with self._lock:
+                decision.backend, decision.reason = ASYNCIO, "función async"
+                decision.calls += 1
+            return asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self._event_loop())
+        
+        decision = self._decision(fn)
+        with self._lock:
+            decision.calls += 1
+            if decision.calls - decision.decided_at_call > self.reevaluate_every:
+                # Re-evaluación: descartar las muestras viejas
+                decision.walls.clear()
+                decision.cpu_ratios.clear()
+                decision.gil_fractions.clear()
+                decision.decided_at_call = decision.calls
+            # Mientras se perfila, el resto de llamadas usa la decisión vigente
+            sampling = len(decision.walls) + decision.pending_samples < self.sample_size
+            if sampling:
+                decision.pending_samples += 1
+        
+        if sampling:
+            return self._profiler.submit(self._profiled_call, decision, fn, args, kwargs)
+        if decision.backend == PROCESS:
+            return self._process_pool().submit(fn, *args, **kwargs)
+        return self._threads.submit(fn, *args, **kwargs)
+    
+    def map(self, fn, iterable):
+        return [future.result() for future in [self.submit(fn, item) for item in iterable]]
+    
+    def _decision(self, fn):
+        key = self._key(fn)
+        decision = self.decisions.get(key)
+        if decision is None:
+            with self._lock:
+                decision = self.decisions.setdefault(key, Decision(key))
+        return decision
+    
+    def explain(self):
+        """Mostrar la decisión y las mediciones de cada función"""
+        for decision in self.decisions.values():
+            print(f"  {decision.name.split('.')[-1]:>22} -> {decision.backend:8} "
+                  f"wall {decision.wall * 1000:7.2f} ms, CPU/wall {decision.cpu_ratio:4.0%}, "
+                  f"GIL {decision.gil_fraction:4.0%}  ({decision.reason})")
+    
+    def shutdown(self):
+        self._profiler.shutdown()
+        self._threads.shutdown()
+        if self._processes is not None:
+            self._processes.shutdown()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+# --- Tareas de ejemplo (las de 08_interoperability.py y algunas más) ---
+
+def cpu_intensive_task(n):
+    """CPU puro en Python: retiene el GIL"""
+    total = 0
+    for i in range(n * 100000):
+        total += i ** 2
+    return total
+
+def io_intensive_task(delay):
+    """Espera sin CPU"""
+    time.sleep(delay)
+    return f"Tarea completada después de {delay}s"
+
+@functools.lru_cache(maxsize=None)
+def _payload(megabytes):
+    # Construir el buffer retiene el GIL (memset): se hace una vez por proceso
+    return b"x" * (megabytes * 1024 * 1024)
+
+def hash_task(megabytes):
+    """CPU en C: hashlib suelta el GIL con buffers grandes"""
+    return hashlib.sha256(_payload(megabytes)).hexdigest()[:12]
+
+def tiny_task(n):
+    """Demasiado corta para compensar el viaje a otro proceso"""
+    return sum(range(n))
+
+async def async_fetch(delay):
+    await asyncio.sleep(delay)
+    return f"fetch de {delay}s"
+
+def demonstrate_auto_executor():
+    """Ver qué backend elige para cada tipo de tarea"""
+    print("=== Decisiones del AutoExecutor ===")
+    
+    workloads = [
+        (cpu_intensive_task, [3] * 8),
+        (io_intensive_task, [0.05] * 8),
+        (hash_task, [32] * 8),
+        (tiny_task, [100] * 8),
+        (async_fetch, [0.05] * 8),
+    ]
+    with AutoExecutor() as executor:
+        for fn, args in workloads:
+            executor.map(fn, args)
+        executor.explain()
+    print()
+
+def demonstrate_benchmark():
+    """Una carga mixta: todo en threads, todo en procesos o selección automática"""
+    print("=== Benchmark: carga mixta ===")
+    
+    workload = [(cpu_intensive_task, 3)] * 8 + [(io_intensive_task, 0.05)] * 32 + [(tiny_task, 100)] * 500
+    workers = os.cpu_count() or 1
+    
+    def run(executor):
+        start = time.perf_counter()
+        futures = [executor.submit(fn, arg) for fn, arg in workload]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - start
+    
+    with ThreadPoolExecutor(max_workers=max(4, workers * 4)) as executor:
+        print(f"{'solo threads':>16}: {run(executor):.2f}s")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        print(f"{'solo procesos':>16}: {run(executor):.2f}s")
+    with AutoExecutor() as executor:
+        # Calentar el perfil y medir ya con las decisiones tomadas
+        warmup = run(executor)
+        print(f"{'auto (1ª vez)':>16}: {warmup:.2f}s  (incluye el perfilado)")
+        print(f"{'auto':>16}: {run(executor):.2f}s")
+    print(f"(CPUs: {workers}; con 1 CPU los procesos no aceleran el CPU puro)")
+    print()
+
+if __name__ == "__main__":
+    print("=== Selección Automática de Executor ===")
+    print("'Threading para I/O, multiprocessing para CPU': medirlo en lugar de suponerlo\n")
+    
+    demonstrate_auto_executor()
+    demonstrate_benchmark()
+    
+    print("=== Consejos ===")
+    print("1. time.thread_time() / wall distingue espera de cálculo")
+    print("2. Un probe que mide su propio retraso delata quién retiene el GIL (descontando la espera por CPU)")
+    print("3. Extensiones C que sueltan el GIL (hashlib, zlib) van bien en threads")
+    print("4. Tareas muy cortas no compensan el pickle de ida y vuelta")
+    print("5. Re-evalúa periódicamente: el perfil de una función cambia con sus datos")
@@ -0,0 +1,379 @@
+"""
+Pipelines de subprocess en streaming con back-pressure
+Etapas Python entre procesos del sistema, buffers acotados y throughput por etapa
+"""
+
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+PUMP_CHUNK = 1024 * 1024
+_DONE = object()
+
+class PipelineError(Exception):
+    """Alguna etapa terminó con error"""
+
+class StageStats:
+    """Bytes y elementos que salen de una etapa, y cuándo terminó"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.bytes_out = 0
+        self.items_out = 0
+        self.finished = None
+    
+    def throughput(self, started):
+        if self.finished is None or self.finished <= started:
+            return 0.0
+        return self.bytes_out / (self.finished - started)
+
+class Pipeline:
+    """
+    Encadenar comandos del sistema y funciones Python en streaming.
+        
+        Pipeline(source).process(["sort"]).python(upper).process(["uniq", "-c"])
+    
+    - Entre dos procesos el dato fluye por un pipe del sistema; con
+      metered=True pasa por un thread que cuenta bytes (para el throughput
+      por etapa) en bloques de 1 MB, sin acumular.
+    - Una etapa Python recibe un iterador de líneas en bytes (o, con
+      mode="chunks", de bloques de líneas completas) y devuelve otro; corre en su propio thread y entrega por una
+      queue.Queue(maxsize) acotada.
+    - Las escrituras bloqueantes en pipes y colas llenas son el
+      back-pressure: ninguna etapa se adelanta más de un buffer.
+    """
+    
+    def __init__(self, source=None, mode="lines", queue_size=16, metered=True):
+        if mode not in ("lines", "chunks"):
+            raise ValueError("mode debe ser 'lines' o 'chunks'")
+        self.source = source
+        self.mode = mode
+        self.queue_size = queue_size
+        self.metered = metered
+        self.stages = []
+        self.stats = []
+        self._processes = []
+        self._threads = []
+        self._errors = []
+        self._cancel = threading.Event()
+        self._started = None
+    
+    # --- Definición ---
+    
+    def process(self, command, name=None):
+        self.stages.append(("process", command, name or " ".join(command)))
+        return self
+    
+    def python(self, func, name=None):
+        self.stages.append(("python", func, name or getattr(func, "__name__", "python")))
+        return self
+    
+    # --- Ejecución ---
+    
+    def _thread(self, target, *args):
+        def run():
+            try:
+                target(*args)
+            except BrokenPipeError:
+                pass  # El consumidor cerró antes: no es un error del pipeline
+            except Exception as e:
+                self._errors.append(e)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+    
+    def _read_items(self, stream):
+        if self.mode == "lines":
+            return iter(stream.readline, b"")
+        return self._line_chunks(stream)
+    
+    @staticmethod
+    def _line_chunks(stream):
+        """Bloques de ~1 MB que terminan siempre en una línea completa"""
+        tail = b""
+        while True:
+            chunk = stream.read1(PUMP_CHUNK)
+            if not chunk:
+                break
+            cut = chunk.rfind(b"\n") + 1
+            if cut == 0:
+                tail += chunk
+                continue
+            yield tail + chunk[:cut]
+            tail = chunk[cut:]
+        if tail:
+            yield tail
+    
+    def _feed(self, items, stdin, stats=None):
+        """Escribir un iterador en el stdin de un proceso (bloquea si el pipe está lleno)"""
+        try:
+            for item in items:
+                stdin.write(item)
+                if stats is not None:
+                    stats.bytes_out += len(item)
+                    stats.items_out += 1
+        finally:
+            if stats is not None:
+                stats.finished = time.monotonic()
+            stdin.close()
+    
+    def _pump(self, stdout, stdin, stats):
+        """Copiar de un proceso a otro en bloques grandes contando bytes"""
+        read, write = stdout.read1, stdin.write
+        try:
+            while True:
+                chunk = read(PUMP_CHUNK)
+                if not chunk:
+                    break
+                write(chunk)
+                stats.bytes_out += len(chunk)
+                stats.items_out += 1
+        finally:
+            stats.finished = time.monotonic()
+            stdin.close()
+            stdout.close()
+    
+    def _put(self, buffer, item):
+        """put() bloqueante que se rinde si el consumidor abandonó el pipeline"""
+        while not self._cancel.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def _bounded(self, items, stats):
+        """Ejecutar un iterador en otro thread y entregarlo por una cola acotada"""
+        buffer = queue.Queue(maxsize=self.queue_size)
+        
+        def produce():
+            try:
+                for item in items:
+                    stats.bytes_out += len(item)
+                    stats.items_out += 1
+                    if not self._put(buffer, item):  # Bloquea si el consumidor va lento
+                        return
+            except Exception as e:
+                # Registrado antes de _DONE: _finish ya lo ve al terminar la salida
+                self._errors.append(e)
+            finally:
+                stats.finished = time.monotonic()
+                self._put(buffer, _DONE)
+        
+        self._thread(produce)
+        while not self._cancel.is_set():
+            try:
+                item = buffer.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            yield item
+    
+    def _build(self):
+        """Conectar las etapas; devuelve ('stream', file) o ('iter', iterador)"""
+        if self.source is None and self.stages and self.stages[0][0] == "python":
+            raise PipelineError("una etapa python necesita una fuente")
+        # Estado de esta ejecución: iterar de nuevo no duplica estadísticas
+        self.stats = []
+        self._processes, self._threads, self._errors = [], [], []
+        self._cancel = threading.Event()
+        self._started = time.monotonic()
+        if self.source is None:
+            upstream = None
+        elif hasattr(self.source, "read"):
+            upstream = ("stream", self.source)
+        else:
+            upstream = ("iter", iter(self.source))
+        
+        try:
+            for kind, target, name in self.stages:
+                stats = StageStats(name)
+                self.stats.append(stats)
+                if kind == "process":
+                    direct = upstream is not None and upstream[0] == "stream" and not self.metered
+                    stdin = upstream[1] if direct else (subprocess.PIPE if upstream else subprocess.DEVNULL)
+                    proc = subprocess.Popen(target, stdin=stdin, stdout=subprocess.PIPE)
+                    self._processes.append((name, proc))
+                    if direct:
+                        upstream[1].close()  # Solo el hijo debe tener el extremo de lectura
+                    elif upstream is not None and upstream[0] == "stream":
+                        self._thread(self._pump, upstream[1], proc.stdin, self._previous_stats())
+                    elif upstream is not None:
+                        self._thread(self._feed, upstream[1], proc.stdin)
+                    upstream = ("stream", proc.stdout)
+                else:
+                    if upstream[0] == "iter":
+                        items = upstream[1]
+                    else:
+                        items = self._count(self._read_items(upstream[1]), self._previous_stats())
+                    upstream = ("iter", self._bounded(target(items), stats))
+        except BaseException:
+            # Un Popen que falla a mitad: no dejar procesos ni threads sueltos
+            self._finish(early=True)
+            raise
+        return upstream
+    
+    def _previous_stats(self):
+        """Estadísticas de la etapa anterior (o de la fuente, si es un archivo)"""
+        return self.stats[-2] if len(self.stats) > 1 else StageStats("fuente")
+    
+    def _count(self, items, stats):
+        try:
+            for item in items:
+                stats.bytes_out += len(item)
+                stats.items_out += 1
+                yield item
+        finally:
+            stats.finished = time.monotonic()
+    
+    def __iter__(self):
+        """Iterador sobre la salida final (líneas o bloques en bytes)"""
+        kind, upstream = self._build()
+        completed = False
+        try:
+            if kind == "stream":
+                yield from self._count(self._read_items(upstream), self.stats[-1])
+            else:
+                # Ya contada por _bounded
+                yield from upstream
+            completed = True
+        finally:
+            self._finish(early=not completed)
+    
+    def lines(self, encoding="utf-8"):
+        """Iterar la salida como texto"""
+        for item in self:
+            yield item.decode(encoding)
+    
+    def _finish(self, early=False):
+        # Si una etapa falló, las anteriores pueden seguir bloqueadas escribiendo
+        # en un proceso que ya nadie lee: también hay que detenerlas
+        abort = early or bool(self._errors)
+        if abort:
+            # El consumidor dejó de leer o una etapa falló: detener etapas y procesos
+            self._cancel.set()
+            for _, proc in self._processes:
+                proc.kill()
+        for thread in self._threads:
+            thread.join()
+        failures = []
+        for name, proc in self._processes:
+            proc.stdout.close()
+            code = proc.wait()
+            if code != 0 and not abort:
+                failures.append(f"{name!r} salió con código {code}")
+        if self._errors and not early:
+            raise PipelineError(f"error en una etapa Python: {self._errors[0]!r}") from self._errors[0]
+        if failures:
+            raise PipelineError("; ".join(failures))
+    
+    def report(self):
+        """Throughput de cada etapa desde el arranque del pipeline"""
+        for stats in self.stats:
+            finished = (stats.finished or time.monotonic()) - self._started
+            rate = stats.throughput(self._started) / 1024**2
+            print(f"  {stats.name:>28}: {stats.bytes_out / 1024**2:8.1f} MB, "
+                  f"{stats.items_out:>9,} elementos, fin a {finished:5.2f}s, {rate:7.1f} MB/s")
+
+def demonstrate_pipeline():
+    """El pipeline echo | sort | uniq -c del demo, con una etapa Python en medio"""
+    print("=== Pipeline en Streaming ===")
+    
+    fruits = [b"manzana\n", b"banana\n", b"naranja\n", b"manzana\n"]
+    
+    def shout(lines):
+        for line in lines:
+            yield line.upper()
+    
+    pipeline = Pipeline(fruits).process(["sort"]).python(shout).process(["uniq", "-c"])
+    for line in pipeline.lines():
+        print(f"  {line.rstrip()}")
+    
+    def fail_at_ten(lines):
+        for number, line in enumerate(lines):
+            if number == 10:
+                raise RuntimeError("línea 10 inválida")
+            yield line
+    
+    # Una etapa Python que falla entre dos procesos no deja el pipeline colgado
+    numbers = (b"%d\n" % i for i in range(100_000))
+    pipeline = Pipeline(numbers).process(["cat"]).python(fail_at_ten).process(["cat"])
+    try:
+        for _ in pipeline:
+            pass
+    except PipelineError as e:
+        print(f"  Etapa fallida: {e}")
+    print()
+
+def synthetic_lines(megabytes):
+    """Datos de ejemplo generados al vuelo: nunca están completos en memoria"""
+    line = b"".join(b"%06d,usuario-%03d,evento,%s\n" % (i, i % 997, b"x" * 40) for i in range(1000))
+    for _ in range(megabytes * 1024 * 1024 // len(line)):
+        yield line
+
+def only_even(chunks):
+    """Etapa Python de ejemplo: en modo 'chunks' filtra líneas dentro de cada bloque"""
+    for chunk in chunks:
+        yield b"".join(line + b"\n" for line in chunk.split(b"\n")[:-1]
+                       if line[5:6] in b"02468")
+
+def run_streaming(megabytes):
+    pipeline = (Pipeline(synthetic_lines(megabytes), mode="chunks")
+                .process(["tr", "a-z", "A-Z"])
+                .python(only_even)
+                .process(["cut", "-c1-30"]))
+    return sum(len(chunk) for chunk in pipeline), pipeline
+
+def run_communicate(megabytes):
+    """La versión clásica: cada etapa con communicate(), todo en memoria"""
+    upper, _ = subprocess.Popen(["tr", "a-z", "A-Z"], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE).communicate(b"".join(synthetic_lines(megabytes)))
+    filtered = b"".join(only_even([upper]))
+    del upper
+    output, _ = subprocess.Popen(["cut", "-c1-30"], stdin=subprocess.PIPE,
+                                 stdout=subprocess.PIPE).communicate(filtered)
+    return len(output), None
+
+def demonstrate_benchmark(megabytes):
+    """Streaming contra communicate() por etapa: tiempo y pico de memoria"""
+    print(f"=== Benchmark: {megabytes} MB por tr | python | cut ===")
+    
+    for name, run in [("streaming", run_streaming), ("communicate()", run_communicate)]:
+        start = time.perf_counter()
+        total, pipeline = run(megabytes)
+        elapsed = time.perf_counter() - start
+        
+        # Memoria en una segunda pasada: tracemalloc frena el código Python
+        tracemalloc.start()
+        run(megabytes)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>14}: {total / 1024**2:.1f} MB de salida en {elapsed:.2f}s, "
+              f"pico de memoria Python {peak / 1024**2:.1f} MB")
+        if pipeline is not None:
+            pipeline.report()
+    print()
+
+if __name__ == "__main__":
+    print("=== Pipelines en Streaming ===")
+    print("p3.communicate() guarda toda la salida en memoria\n")
+    
+    if shutil.which("sort") is None:
+        print("Este ejemplo necesita herramientas Unix (sort, uniq, tr, cut)")
+        sys.exit(0)
+    
+    demonstrate_pipeline()
+    demonstrate_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
+    
+    print("=== Consejos ===")
+    print("1. Itera la salida en lugar de communicate() para datos grandes")
+    print("2. Un pipe del sistema ya es un buffer acotado: write() bloquea si está lleno")
+    print("3. Entre etapas Python usa queue.Queue(maxsize) para el back-pressure")
+    print("4. Bloques de 1 MB en lugar de líneas reducen el overhead por elemento")
+    print("5. Cierra el stdout del proceso anterior en el padre para propagar SIGPIPE")
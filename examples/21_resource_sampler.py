@@ -0,0 +1,343 @@
+"""
+Muestreo de recursos en segundo plano
+Load average, RSS, CPU, fds y cambios de contexto en un ring buffer preasignado
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from array import array
+from dataclasses import asdict, dataclass
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage; esas columnas quedan en 0
+    resource = None
+
+# Columnas del ring buffer; todas se guardan como double
+FIELDS = ("time", "load1", "rss", "children_rss", "user", "system",
+          "children_user", "children_system", "fds", "voluntary_switches",
+          "involuntary_switches", "children_voluntary_switches",
+          "children_involuntary_switches")
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _fd_directory():
+    for path in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(path):
+            return path
+    return None
+
+class _ProcReader:
+    """Lecturas baratas de /proc: los archivos se abren una vez y se leen con pread"""
+    
+    def __init__(self):
+        self.statm = self._open("/proc/self/statm")
+    
+    @staticmethod
+    def _open(path):
+        try:
+            return os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _listdir(path):
+        try:
+            return os.listdir(path)
+        except OSError:
+            return []
+    
+    def rss(self):
+        if self.statm is None:
+            if resource is None:
+                return 0
+            # Sin /proc: el pico (ru_maxrss, KB en Linux, bytes en macOS)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+        return int(os.pread(self.statm, 64, 0).split()[1]) * PAGE_SIZE
+    
+    def children_rss(self):
+        """RSS de los hijos vivos (Linux con /proc/<pid>/task/<tid>/children)"""
+        total = 0
+        # Cada thread lista los hijos que creó; los threads cambian entre muestras
+        for tid in self._listdir("/proc/self/task"):
+            try:
+                with open(f"/proc/self/task/{tid}/children", "rb") as f:
+                    pids = f.read().split()
+            except OSError:
+                continue
+            for pid in pids:
+                try:
+                    with open(b"/proc/%s/statm" % pid, "rb") as f:
+                        total += int(f.read().split()[1]) * PAGE_SIZE
+                except (OSError, IndexError, ValueError):
+                    pass  # El hijo terminó entre las dos lecturas
+        return total
+    
+    def close(self):
+        if self.statm is not None:
+            os.close(self.statm)
+            self.statm = None
+
+@dataclass
+class ResourceSummary:
+    """Resumen exportable de una ventana de muestreo"""
+    label: str
+    duration: float
+    samples: int
+    dropped: int
+    load1_mean: float
+    load1_max: float
+    rss_min: int
+    rss_max: int
+    rss_mean: float
+    children_rss_max: int
+    cpu_user: float
+    cpu_system: float
+    cpu_utilization: float
+    children_cpu: float
+    fds_max: int
+    voluntary_switches: int
+    involuntary_switches: int
+    children_voluntary_switches: int
+    children_involuntary_switches: int
+    sampler_cpu: float
+    
+    def to_dict(self):
+        return asdict(self)
+    
+    def show(self):
+        mb = 1024 ** 2
+        print(f"  [{self.label}] {self.duration:.2f}s, {self.samples} muestras"
+              + (f" ({self.dropped} sobrescritas)" if self.dropped else ""))
+        print(f"    load1 media {self.load1_mean:.2f}, máx {self.load1_max:.2f}")
+        print(f"    RSS {self.rss_min / mb:.1f}..{self.rss_max / mb:.1f} MB "
+              f"(media {self.rss_mean / mb:.1f}), hijos máx {self.children_rss_max / mb:.1f} MB")
+        print(f"    CPU user {self.cpu_user:.2f}s, sys {self.cpu_system:.2f}s "
+              f"({self.cpu_utilization:.0%} de un core), hijos {self.children_cpu:.2f}s")
+        print(f"    fds máx {self.fds_max}, cambios de contexto "
+              f"{self.voluntary_switches} voluntarios / {self.involuntary_switches} involuntarios, "
+              f"hijos {self.children_voluntary_switches} / {self.children_involuntary_switches}")
+        print(f"    coste del muestreo: {self.sampler_cpu * 1000:.1f} ms de CPU "
+              f"({self.sampler_cpu / self.duration:.3%})")
+
+class ResourceSampler:
+    """
+    Thread que toma una muestra cada `interval` segundos.
+    
+    - Las muestras van a un ring buffer preasignado (un array('d') por
+      columna): sin objetos nuevos por muestra y memoria fija; al llenarse
+      se sobrescriben las más viejas.
+    - Cada muestra son unas pocas syscalls: os.times(), getrusage() propio
+      y de los hijos terminados, pread de /proc/self/statm y,
+      opcionalmente, el RSS de los hijos vivos y los fds.
+    - summary() resume la ventana y export() la guarda como JSON Lines.
+    """
+    
+    def __init__(self, interval=0.1, capacity=4096, children=True, fds=True):
+        self.interval = interval
+        self.capacity = capacity
+        self.children = children
+        self.fds = fds
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in FIELDS}
+        self.count = 0
+        self.sampler_cpu = 0.0
+        self._reader = _ProcReader()
+        self._fd_dir = _fd_directory() if fds else None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def sample(self):
+        """Tomar una muestra y escribirla en la siguiente posición del ring"""
+        i = self.count % self.capacity
+        c = self.columns
+        times = os.times()
+        c["time"][i] = time.monotonic()
+        c["load1"][i] = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+        c["rss"][i] = self._reader.rss()
+        c["children_rss"][i] = self._reader.children_rss() if self.children else 0.0
+        c["user"][i] = times.user
+        c["system"][i] = times.system
+        c["children_user"][i] = times.children_user
+        c["children_system"][i] = times.children_system
+        c["fds"][i] = len(os.listdir(self._fd_dir)) if self._fd_dir else 0.0
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            c["voluntary_switches"][i] = usage.ru_nvcsw
+            c["involuntary_switches"][i] = usage.ru_nivcsw
+            # Como children_user/system: solo los hijos ya terminados y esperados
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            c["children_voluntary_switches"][i] = usage.ru_nvcsw
+            c["children_involuntary_switches"][i] = usage.ru_nivcsw
+        self.count += 1
+    
+    def _run(self):
+        wait, sample, clock = self._stop.wait, self.sample, time.thread_time
+        while True:
+            began = clock()
+            sample()
+            self.sampler_cpu += clock() - began
+            if wait(self.interval):
+                break
+    
+    def start(self):
+        self.count = 0
+        self.sampler_cpu = 0.0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()  # Muestra final: la ventana cubre todo el trabajo
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def close(self):
+        self._reader.close()
+    
+    def column(self, name):
+        """Valores de una columna en orden cronológico"""
+        values = self.columns[name]
+        if self.count <= self.capacity:
+            return values[:self.count]
+        start = self.count % self.capacity
+        return values[start:] + values[:start]
+    
+    def summary(self, label="run"):
+        if self.count < 2:
+            raise RuntimeError("se necesitan al menos dos muestras")
+        col = self.column
+        times, rss, load = col("time"), col("rss"), col("load1")
+        duration = times[-1] - times[0]
+        
+        def delta(name):
+            values = col(name)
+            return values[-1] - values[0]
+        
+        cpu_user, cpu_system = delta("user"), delta("system")
+        return ResourceSummary(
+            label=label,
+            duration=duration,
+            samples=len(times),
+            dropped=max(0, self.count - self.capacity),
+            load1_mean=statistics.fmean(load),
+            load1_max=max(load),
+            rss_min=int(min(rss)),
+            rss_max=int(max(rss)),
+            rss_mean=statistics.fmean(rss),
+            children_rss_max=int(max(col("children_rss"))),
+            cpu_user=cpu_user,
+            cpu_system=cpu_system,
+            cpu_utilization=(cpu_user + cpu_system) / duration if duration else 0.0,
+            children_cpu=delta("children_user") + delta("children_system"),
+            fds_max=int(max(col("fds"))),
+            voluntary_switches=int(delta("voluntary_switches")),
+            involuntary_switches=int(delta("involuntary_switches")),
+            children_voluntary_switches=int(delta("children_voluntary_switches")),
+            children_involuntary_switches=int(delta("children_involuntary_switches")),
+            sampler_cpu=self.sampler_cpu,
+        )
+
+def export(summary, path, **metadata):
+    """Añadir el resumen a un archivo JSON Lines junto a los datos del benchmark"""
+    record = {"timestamp": time.time(), "pid": os.getpid(), **metadata, "resources": summary.to_dict()}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+def profiled(label, func, *args, interval=0.05, history=None, **metadata):
+    """Ejecutar func(*args) con el sampler activo; devuelve (resultado, resumen)"""
+    sampler = ResourceSampler(interval=interval)
+    try:
+        with sampler:
+            result = func(*args)
+        summary = sampler.summary(label)
+    finally:
+        sampler.close()
+    if history:
+        export(summary, history, label=label, **metadata)
+    return result, summary
+
+# --- Cargas de ejemplo ---
+
+def cpu_work(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+def memory_work(megabytes):
+    blocks = [bytearray(1024 * 1024) for _ in range(megabytes)]
+    time.sleep(0.2)
+    return len(blocks)
+
+def children_work(count):
+    """Procesos hijos: su CPU aparece en children_* al terminar"""
+    code = "sum(i * i for i in range(3_000_000))"
+    procs = [subprocess.Popen([sys.executable, "-c", code]) for _ in range(count)]
+    return [p.wait() for p in procs]
+
+def demonstrate_sampler(history):
+    """Perfil de recursos de tres cargas distintas"""
+    print("=== Perfil de Recursos por Carga ===")
+    
+    for label, func, arg in [("cpu", cpu_work, 5_000_000),
+                             ("memoria", memory_work, 200),
+                             ("hijos", children_work, 2)]:
+        _, summary = profiled(label, func, arg, history=history, benchmark="21_resource_sampler")
+        summary.show()
+    if history:
+        print(f"\nResúmenes añadidos a {history}")
+    print()
+
+def demonstrate_overhead(n, intervals, rounds=5):
+    """Coste del muestreo sobre una carga de CPU a distintas frecuencias"""
+    print("=== Overhead del Muestreo ===")
+    
+    def timed():
+        start = time.perf_counter()
+        cpu_work(n)
+        return time.perf_counter() - start
+    
+    for interval in intervals:
+        # Intercalar con y sin sampler: el ruido entre corridas supera al overhead
+        baseline, sampled, sampler_cpu, samples = [], [], 0.0, 0
+        for _ in range(rounds):
+            baseline.append(timed())
+            sampler = ResourceSampler(interval=interval, capacity=256)
+            with sampler:
+                sampled.append(timed())
+            sampler.close()
+            sampler_cpu += sampler.sampler_cpu
+            samples += sampler.count
+        base, with_sampler = min(baseline), min(sampled)
+        print(f"{f'cada {interval * 1000:.0f} ms':>14}: {base:.3f}s -> {with_sampler:.3f}s "
+              f"({(with_sampler - base) / base:+.1%}), CPU del sampler "
+              f"{sampler_cpu / sum(sampled):.2%} del tiempo, {sampler_cpu / samples * 1e6:.0f} µs por muestra")
+    print()
+
+if __name__ == "__main__":
+    print("=== Muestreo de Recursos ===")
+    print("os.getloadavg() una vez no dice nada de lo que pasó durante el benchmark\n")
+    
+    demonstrate_sampler(sys.argv[1] if len(sys.argv) > 1 else None)
+    demonstrate_overhead(5_000_000, [0.1, 0.01, 0.001])
+    
+    print("=== Consejos ===")
+    print("1. Preasigna el buffer: el sampler no debe generar basura mientras mide")
+    print("2. Abre /proc/self/statm una vez y léelo con os.pread")
+    print("3. os.times() incluye la CPU de los hijos ya terminados")
+    print("4. Guarda el perfil de recursos junto al resultado del benchmark")
+    print("5. Mide el coste del propio sampler: debe quedar por debajo del ruido")
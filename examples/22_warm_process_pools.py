@@ -0,0 +1,195 @@
+"""
+Pools de procesos precalentados con gc.freeze()
+Preparar el estado en el padre, congelarlo antes del fork y reutilizar los workers
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+STATE = None  # Estado global: con fork los workers lo heredan sin copiarlo
+_BARRIER = None
+
+# --- Estado y tareas de ejemplo ---
+
+def build_state(size):
+    """Estado caro de construir: muchos contenedores pequeños (los que recorre el GC)"""
+    global STATE
+    STATE = {f"clave-{i}": [i, str(i), (i, i * 2)] for i in range(size)}
+
+def lookup_task(start, count=1000):
+    """Consultar una parte del estado y generar basura, como un worker real"""
+    if STATE is None:
+        raise RuntimeError("el worker no tiene estado")
+    garbage = [[i] for i in range(20_000)]
+    return sum(STATE[f"clave-{i}"][0] for i in range(start, start + count)) + len(garbage)
+
+def _init_worker(barrier, initializer, initargs):
+    global _BARRIER
+    _BARRIER = barrier
+    if initializer is not None:
+        initializer(*initargs)
+
+def _at_barrier(collect):
+    """Ejecutarse exactamente una vez en cada worker (todos esperan a todos)"""
+    if collect:
+        gc.collect()  # En un worker de larga vida la colección completa llega tarde o temprano
+    _BARRIER.wait()  # Con timeout: un worker muerto rompe la barrera en lugar de colgarla
+    return os.getpid()
+
+# --- Memoria compartida vs privada ---
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+def memory_report(pid):
+    """Campos de /proc/<pid>/smaps_rollup en bytes (o {} si no existe)"""
+    totals = dict.fromkeys(SMAPS_FIELDS, 0)
+    for path in (f"/proc/{pid}/smaps_rollup", f"/proc/{pid}/smaps"):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in totals:
+                        totals[key] += int(value.split()[0]) * 1024
+            return totals
+        except OSError:
+            continue
+    return {}
+
+class WarmPool:
+    """
+    ProcessPoolExecutor con workers de larga vida creados por fork.
+    
+    1. `initializer(*initargs)` corre una vez en el padre: imports y estado.
+    2. gc.freeze() mueve todo lo existente a la generación permanente, así
+       el GC de los hijos no escribe en esos objetos (ni rompe el
+       copy-on-write de sus páginas).
+    3. Todos los workers se crean de inmediato y se reutilizan en cada lote.
+    
+    `context` decide el método de arranque; por defecto el de la
+    plataforma. Con spawn o forkserver (Windows, macOS) el initializer
+    corre en cada worker y no hay nada que congelar.
+    """
+    
+    def __init__(self, workers=None, initializer=None, initargs=(), freeze=True, context=None,
+                 warmup_timeout=60.0):
+        self.workers = workers or os.cpu_count() or 1
+        context = context or multiprocessing.get_context()
+        self.forked = context.get_start_method() == "fork"
+        self.frozen = False
+        self.warmup_timeout = warmup_timeout
+        
+        if self.forked:
+            if initializer is not None:
+                initializer(*initargs)
+                initializer, initargs = None, ()
+            if freeze and hasattr(gc, "freeze"):
+                gc.collect()
+                gc.freeze()
+                self.frozen = True
+        
+        barrier = context.Barrier(self.workers, timeout=warmup_timeout)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=context,
+            initializer=_init_worker, initargs=(barrier, initializer, initargs))
+        self.pids = self.each_worker(collect=False)
+    
+    def each_worker(self, collect=False):
+        """Ejecutar una tarea en cada worker (con fork esto también los crea todos)"""
+        futures = [self.executor.submit(_at_barrier, collect) for _ in range(self.workers)]
+        return sorted(future.result(timeout=self.warmup_timeout) for future in futures)
+    
+    def map(self, func, *iterables):
+        return list(self.executor.map(func, *iterables))
+    
+    def memory(self, collect=True):
+        """Memoria de cada worker tras (opcionalmente) forzar una colección completa"""
+        self.each_worker(collect=collect)
+        return {pid: memory_report(pid) for pid in self.pids}
+    
+    def shutdown(self):
+        self.executor.shutdown()
+        if self.frozen:
+            gc.unfreeze()
+            self.frozen = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+def show_memory(title, reports):
+    mb = 1024 ** 2
+    reports = [r for r in reports.values() if r]
+    if not reports:
+        print(f"  {title}: /proc/<pid>/smaps_rollup no disponible")
+        return
+    shared = sum(r["Shared_Clean"] + r["Shared_Dirty"] for r in reports) / len(reports)
+    private = sum(r["Private_Clean"] + r["Private_Dirty"] for r in reports) / len(reports)
+    pss = sum(r["Pss"] for r in reports)
+    print(f"  {title}: por worker {shared / mb:6.1f} MB compartidos, {private / mb:6.1f} MB privados; "
+          f"PSS total {pss / mb:6.1f} MB")
+
+def demonstrate_benchmark(size, workers, batches):
+    """Pool en frío por lote contra WarmPool con y sin gc.freeze()"""
+    print(f"=== Benchmark: estado de {size:,} entradas, {workers} workers, {batches} lotes ===")
+    
+    starts = list(range(0, size - 1000, size // (workers * 4)))
+    
+    # 1. Un pool nuevo por lote: cada worker reconstruye el estado
+    start = time.perf_counter()
+    for _ in range(batches):
+        with ProcessPoolExecutor(max_workers=workers, initializer=build_state,
+                                 initargs=(size,)) as executor:
+            cold = list(executor.map(lookup_task, starts))
+    cold_time = time.perf_counter() - start
+    print(f"{'pool nuevo por lote':>24}: {cold_time / batches:.3f}s por lote")
+    
+    # fork solo donde es seguro; en macOS los frameworks del sistema no lo toleran
+    context = multiprocessing.get_context("fork") if sys.platform.startswith("linux") else None
+    forked = (context or multiprocessing.get_context()).get_start_method() == "fork"
+    if not forked:
+        print("Sin fork no hay estado heredado: WarmPool solo reutiliza los workers")
+    
+    # 2 y 3. Estado construido una vez en el padre, workers reutilizados
+    started = time.perf_counter()
+    build_state(size)
+    build_time = time.perf_counter() - started
+    reports = {}
+    for freeze in (False, True):
+        title = "WarmPool + gc.freeze()" if freeze else "WarmPool sin freeze"
+        start = time.perf_counter()
+        with WarmPool(workers, initializer=None if forked else build_state, initargs=(size,),
+                      freeze=freeze, context=context) as pool:
+            ready = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(batches):
+                warm = pool.map(lookup_task, starts)
+            elapsed = time.perf_counter() - start
+            reports[title] = pool.memory(collect=True)
+        assert warm == cold
+        print(f"{title:>24}: {elapsed / batches:.3f}s por lote "
+              f"(arranque {ready:.3f}s + estado en el padre {build_time:.3f}s, una sola vez)")
+    
+    print("\nMemoria de los workers tras una colección completa del GC:")
+    for title, report in reports.items():
+        show_memory(f"{title:>22}", report)
+    print()
+
+if __name__ == "__main__":
+    print("=== Pools de Procesos Precalentados ===")
+    print("Workers en frío repiten imports y estado; el GC rompe el copy-on-write\n")
+    
+    demonstrate_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000,
+                          min(4, max(2, os.cpu_count() or 1)), batches=3)
+    
+    print("=== Consejos ===")
+    print("1. Construye el estado en el padre antes de crear el pool (con fork)")
+    print("2. gc.freeze() justo antes del fork evita que el GC de los hijos toque esos objetos")
+    print("3. Reutiliza el pool entre lotes en lugar de crearlo cada vez")
+    print("4. Mide Shared vs Private en /proc/<pid>/smaps_rollup, no solo el RSS")
+    print("5. Los refcounts también escriben: lo que los workers tocan deja de compartirse")
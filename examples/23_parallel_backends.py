@@ -0,0 +1,156 @@
+"""
+Backends de paralelismo: threads sin GIL, subintérpretes y procesos
+Detectar qué ofrece el intérprete y medir el speedup de cpu_intensive_task en cada uno
+"""
+
+import os
+import sys
+import sysconfig
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor  # Python 3.14+
+except ImportError:
+    InterpreterPoolExecutor = None
+
+SEQUENTIAL, THREADS, FREE_THREADS, SUBINTERPRETERS, PROCESSES = (
+    "secuencial", "threads (con GIL)", "threads sin GIL", "subintérpretes", "procesos")
+
+# --- Detección ---
+
+def gil_disabled_build():
+    """Binario compilado con --disable-gil (python3.13t, python3.14t...)"""
+    return bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+
+def gil_enabled_at_runtime():
+    """Un build sin GIL puede reactivarlo (PYTHON_GIL=1 o extensiones no compatibles)"""
+    is_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_enabled is None else is_enabled()
+
+def detect_backends():
+    """{backend: (disponible, motivo)} para este intérprete"""
+    backends = {SEQUENTIAL: (True, "referencia"),
+                THREADS: (True, "siempre; el GIL serializa el código Python")}
+    
+    if not gil_disabled_build():
+        backends[FREE_THREADS] = (False, "build con GIL")
+    elif gil_enabled_at_runtime():
+        backends[FREE_THREADS] = (False, "build sin GIL, pero el GIL se reactivó")
+    else:
+        backends[FREE_THREADS] = (True, "build free-threaded con el GIL desactivado")
+    
+    if InterpreterPoolExecutor is not None:
+        backends[SUBINTERPRETERS] = (True, "InterpreterPoolExecutor: un GIL por intérprete")
+    elif sys.version_info >= (3, 12):
+        backends[SUBINTERPRETERS] = (False, "GIL por intérprete existe, sin API pública hasta 3.14")
+    else:
+        backends[SUBINTERPRETERS] = (False, f"Python {sys.version_info[0]}.{sys.version_info[1]} "
+                                            f"no tiene GIL por intérprete")
+    
+    backends[PROCESSES] = (True, "siempre; cuesta pickle y memoria por proceso")
+    return backends
+
+def best_backend(backends=None):
+    """Preferir lo que evita pickle y procesos: sin GIL > subintérpretes > procesos"""
+    backends = backends or detect_backends()
+    for name in (FREE_THREADS, SUBINTERPRETERS, PROCESSES):
+        if backends[name][0]:
+            return name
+    return SEQUENTIAL
+
+# --- Ejecución ---
+
+def make_executor(backend, workers):
+    if backend in (THREADS, FREE_THREADS):
+        return ThreadPoolExecutor(max_workers=workers)
+    if backend == SUBINTERPRETERS:
+        return InterpreterPoolExecutor(max_workers=workers)
+    if backend == PROCESSES:
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"backend desconocido: {backend}")
+
+def parallel_map(func, tasks, backend="auto", workers=None):
+    """
+    map() paralelo sobre el mejor backend disponible.
+    Si el backend elegido falla al arrancar (p. ej. la función no se puede
+    compartir con un subintérprete), se recurre a procesos.
+    """
+    workers = workers or os.cpu_count() or 1
+    if backend == "auto":
+        backend = best_backend()
+    if backend == SEQUENTIAL:
+        return [func(task) for task in tasks], backend
+    try:
+        with make_executor(backend, workers) as executor:
+            return list(executor.map(func, tasks)), backend
+    except Exception as e:
+        if backend == PROCESSES:
+            raise
+        print(f"⚠️  {backend} falló ({type(e).__name__}: {e}); usando procesos")
+        return parallel_map(func, tasks, PROCESSES, workers)
+
+# --- Tareas (cpu_intensive_task de 08_interoperability.py) ---
+
+def cpu_intensive_task(n):
+    """Tarea que usa mucho CPU para demostrar multiprocessing"""
+    total = 0
+    for i in range(n * 1000000):
+        total += i ** 2
+    return total
+
+def fine_grained_task(n):
+    """La misma tarea, cien veces más chica: aquí pesa el coste por tarea"""
+    total = 0
+    for i in range(n * 10000):
+        total += i ** 2
+    return total
+
+def demonstrate_detection():
+    """Qué backends ofrece este intérprete"""
+    print("=== Backends Disponibles ===")
+    
+    print(f"Python {sys.version.split()[0]}, build sin GIL: {gil_disabled_build()}, "
+          f"GIL activo: {gil_enabled_at_runtime()}")
+    backends = detect_backends()
+    for name, (available, reason) in backends.items():
+        print(f"  {'✅' if available else '❌'} {name:<16} {reason}")
+    print(f"Elegido por parallel_map(backend='auto'): {best_backend(backends)}")
+    print()
+
+def demonstrate_benchmark(func, tasks, workers):
+    """Speedup de cada backend disponible respecto a la ejecución secuencial"""
+    print(f"=== Benchmark: {func.__name__} x {len(tasks)}, {workers} workers ===")
+    
+    reference = None
+    baseline = None
+    for name, (available, _) in detect_backends().items():
+        if not available:
+            continue
+        start = time.perf_counter()
+        results, used = parallel_map(func, tasks, name, workers)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference, baseline = results, elapsed
+        assert results == reference, f"{name} dio resultados distintos"
+        label = name if used == name else f"{name} -> {used}"
+        print(f"{label:>22}: {elapsed:6.3f}s  speedup {baseline / elapsed:5.2f}x")
+    print()
+
+if __name__ == "__main__":
+    print("=== Backends de Paralelismo ===")
+    print("Con GIL, cpu_intensive_task solo escala con procesos\n")
+    
+    workers = os.cpu_count() or 1
+    demonstrate_detection()
+    demonstrate_benchmark(cpu_intensive_task, [1] * (2 * workers), workers)
+    demonstrate_benchmark(fine_grained_task, [1] * 400, workers)
+    if workers == 1:
+        print("(Con 1 CPU ningún backend puede acelerar: solo se ve el overhead)\n")
+    
+    print("=== Consejos ===")
+    print("1. sysconfig Py_GIL_DISABLED dice cómo se compiló; sys._is_gil_enabled() si sigue activo")
+    print("2. Sin GIL, los threads paralelizan Python puro sin pickle ni memoria extra")
+    print("3. Los subintérpretes aíslan el estado pero comparten el proceso")
+    print("4. Procesos: el único backend portable, pero cada tarea paga pickle")
+    print("5. Cuanto más chica la tarea, más importa el coste fijo del backend")
@@ -0,0 +1,270 @@
+"""
+Kernels de cómputo con variantes aceleradas
+Implementación de referencia en Python, variantes algebraica, vectorizada y en C, verificadas y elegidas por velocidad
+"""
+
+import ctypes
+import importlib.util
+import operator
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class KernelUnavailable(Exception):
+    """La variante no se puede usar aquí (falta numpy, compilador...)"""
+
+class Variant:
+    """Una implementación alternativa; `supports(*args)` acota su dominio"""
+    
+    def __init__(self, name, factory, supports=None):
+        self.name = name
+        self.factory = factory
+        self.supports = supports or (lambda *args: True)
+        self.func = None
+        self.error = None
+        self.verified = False
+        self.timing = None
+    
+    def load(self):
+        """Construir la función una sola vez (importar, compilar...)"""
+        if self.func is None and self.error is None:
+            try:
+                self.func = self.factory()
+            except KernelUnavailable as e:
+                self.error = str(e)
+            except Exception as e:
+                # Un fallo al construir (mkdir, CDLL, compilador...) deja la referencia
+                self.error = f"{type(e).__name__}: {e}"
+        return self.func
+
+class Kernel:
+    """
+    Un cálculo con una referencia en Python puro y variantes opcionales.
+        
+        @kernel.variant("algebraica")
+        def build():
+            return lambda m: ...
+    
+    verify() compara cada variante con la referencia; select() cronometra
+    las verificadas y las ordena. Al llamar al kernel se usa la más rápida
+    cuyo dominio (`supports`) admite los argumentos; si ninguna, la referencia.
+    """
+    
+    def __init__(self, name, reference, verify_args, bench_args):
+        self.name = name
+        self.reference = reference
+        self.verify_args = verify_args
+        self.bench_args = bench_args
+        self.variants = []
+        self.ranking = None
+    
+    def variant(self, name, supports=None):
+        def register(factory):
+            self.variants.append(Variant(name, factory, supports))
+            return factory
+        return register
+    
+    def verify(self):
+        for variant in self.variants:
+            func = variant.load()
+            if func is None:
+                continue
+            for args in self.verify_args:
+                if not variant.supports(*args):
+                    continue
+                expected = self.reference(*args)
+                try:
+                    got = func(*args)
+                except Exception as e:
+                    variant.error = f"{self.name}{args}: {type(e).__name__}: {e}"
+                    break
+                if got != expected:
+                    variant.error = f"{self.name}{args} = {got!r}, se esperaba {expected!r}"
+                    break
+            else:
+                variant.verified = True
+        return [v for v in self.variants if v.verified]
+    
+    def select(self, repeat=3):
+        """Cronometrar las variantes verificadas con bench_args y ordenarlas"""
+        timed = []
+        for variant in self.verify():
+            if not variant.supports(*self.bench_args):
+                continue
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                variant.func(*self.bench_args)
+                best = min(best, time.perf_counter() - start)
+            variant.timing = best
+            timed.append(variant)
+        self.ranking = sorted(timed, key=lambda v: v.timing)
+        return self.ranking
+    
+    @property
+    def fastest(self):
+        if self.ranking is None:
+            self.select()
+        return self.ranking[0].name if self.ranking else "referencia"
+    
+    def __call__(self, *args):
+        if self.ranking is None:
+            self.select()
+        for variant in self.ranking:
+            if variant.supports(*args):
+                return variant.func(*args)
+        return self.reference(*args)
+
+# --- Compilación local (compartida con 16_ctypes_batched_math.py) ---
+
+def _batched_math():
+    """El módulo 16, que compila y cachea los .so en un directorio privado del usuario"""
+    path = Path(__file__).with_name("16_ctypes_batched_math.py")
+    spec = importlib.util.spec_from_file_location("ctypes_batched_math", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def build_library(source, name):
+    """Compilar una vez y cachear el .so por hash del código"""
+    batched_math = _batched_math()
+    compiler = batched_math.find_compiler()
+    if compiler is None:
+        raise KernelUnavailable("no hay compilador de C")
+    try:
+        return batched_math.compile_library(compiler, source, name)
+    except subprocess.CalledProcessError as e:
+        raise KernelUnavailable(f"no compila: {e.stderr.decode(errors='replace').strip()[:80]}")
+
+# --- Kernel: suma de cuadrados (el cuerpo de cpu_intensive_task) ---
+
+def sum_of_squares_reference(m):
+    """Exactamente el bucle de cpu_intensive_task: sum(i**2 for i in range(m))"""
+    total = 0
+    for i in range(m):
+        total += i ** 2
+    return total
+
+sum_of_squares = Kernel(
+    "sum_of_squares", sum_of_squares_reference,
+    verify_args=[(0,), (1,), (2,), (10,), (12_345,), (1_000_000,)],
+    bench_args=(3_000_000,),
+)
+
+@sum_of_squares.variant("sum(map(mul))")
+def _builtin_map():
+    # El mismo bucle, pero en C dentro de sum() y map()
+    return lambda m: sum(map(operator.mul, range(m), range(m)))
+
+@sum_of_squares.variant("algebraica")
+def _closed_form():
+    # 0² + 1² + ... + (m-1)² = (m-1)·m·(2m-1)/6, exacto con enteros de Python
+    return lambda m: (m - 1) * m * (2 * m - 1) // 6 if m > 0 else 0
+
+def _numpy_supports(m):
+    # Bloques cuya suma cabe en int64: bloque · m² < 2**63
+    return m * m < 2 ** 63 // 1024
+
+@sum_of_squares.variant("numpy por bloques", supports=_numpy_supports)
+def _numpy_blocks():
+    if numpy is None:
+        raise KernelUnavailable("numpy no está instalado")
+    
+    def kernel(m):
+        if m <= 0:
+            return 0
+        block = min(m, 1 << 20, (2 ** 63 - 1) // (m * m))
+        total = 0
+        for start in range(0, m, block):
+            values = numpy.arange(start, min(start + block, m), dtype=numpy.int64)
+            total += int(numpy.dot(values, values))
+        return total
+    return kernel
+
+SUM_OF_SQUARES_C = """
+#include <stdint.h>
+
+/* Acumulador de 128 bits: exacto mientras m^3/3 < 2^127 */
+void sum_of_squares(uint64_t m, uint64_t *high, uint64_t *low) {
+    unsigned __int128 total = 0;
+    for (uint64_t i = 0; i < m; i++) {
+        total += (unsigned __int128)i * i;
+    }
+    *high = (uint64_t)(total >> 64);
+    *low = (uint64_t)total;
+}
+"""
+
+@sum_of_squares.variant("C vía ctypes", supports=lambda m: 0 <= m < 2 ** 40)
+def _compiled():
+    library = build_library(SUM_OF_SQUARES_C, "sum_of_squares")
+    func = library.sum_of_squares
+    func.argtypes = [ctypes.c_uint64, ctypes.POINTER(ctypes.c_uint64), ctypes.POINTER(ctypes.c_uint64)]
+    func.restype = None
+    
+    def kernel(m):
+        high, low = ctypes.c_uint64(), ctypes.c_uint64()  # Por llamada: seguro entre threads
+        func(m, ctypes.byref(high), ctypes.byref(low))
+        return (high.value << 64) | low.value
+    return kernel
+
+def cpu_intensive_task(n):
+    """La tarea de 08_interoperability.py, resuelta con el kernel más rápido"""
+    return sum_of_squares(n * 1000000)
+
+def demonstrate_variants():
+    """Verificación y ranking de cada variante"""
+    print("=== Variantes de sum_of_squares ===")
+    
+    ranking = sum_of_squares.select()
+    start = time.perf_counter()
+    sum_of_squares_reference(*sum_of_squares.bench_args)
+    reference_time = time.perf_counter() - start
+    print(f"{'referencia':>20}: {reference_time * 1000:10.3f} ms")
+    for variant in sum_of_squares.variants:
+        if variant.timing is not None:
+            print(f"{variant.name:>20}: {variant.timing * 1000:10.3f} ms  "
+                  f"{reference_time / variant.timing:12,.0f}x  ✅ verificada")
+        else:
+            print(f"{variant.name:>20}: {'—':>10}     no disponible ({variant.error or 'fuera de dominio'})")
+    print(f"Elegida: {sum_of_squares.fastest} (orden: {', '.join(v.name for v in ranking)})")
+    print()
+
+def demonstrate_benchmark(sizes):
+    """cpu_intensive_task(n) del demo: bucle original contra el kernel elegido"""
+    print("=== Benchmark: cpu_intensive_task(n) ===")
+    
+    for n in sizes:
+        start = time.perf_counter()
+        fast = cpu_intensive_task(n)
+        fast_time = time.perf_counter() - start
+        if n <= 3:
+            start = time.perf_counter()
+            slow = sum_of_squares_reference(n * 1000000)
+            slow_time = time.perf_counter() - start
+            assert fast == slow
+            original = f"{slow_time:8.3f}s"
+        else:
+            original = f"{'(omitido)':>9}"
+        print(f"n={n:<6} bucle original {original}, kernel {fast_time * 1e6:10.1f} µs  = {fast}")
+    print()
+
+if __name__ == "__main__":
+    print("=== Kernels de Cómputo ===")
+    print("cpu_intensive_task suma cuadrados: hay fórmula cerrada\n")
+    
+    demonstrate_variants()
+    demonstrate_benchmark([int(arg) for arg in sys.argv[1:]] or [1, 3, 100, 10_000])
+    
+    print("=== Consejos ===")
+    print("1. Conserva la versión de referencia: es la especificación y el test")
+    print("2. Verifica cada variante contra la referencia antes de usarla")
+    print("3. Acota el dominio de cada variante (overflow de int64, __int128)")
+    print("4. Antes de compilar o vectorizar, busca la forma cerrada")
+    print("5. Elige por medición en esta máquina, no por intuición")
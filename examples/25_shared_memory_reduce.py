@@ -0,0 +1,230 @@
+"""
+Reducción de resultados parciales en memoria compartida
+Los workers escriben sumas, histogramas o arrays en slots preasignados; el padre combina sin pickle
+"""
+
+import math
+import os
+import pickle
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_NUMPY_TYPES = {"d": "f8", "f": "f4", "q": "i8", "i": "i4"}
+
+def attach_shared_memory(name):
+    """Abrir un segmento existente sin registrarlo otra vez (ver 17_shared_structured_arrays.py)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+class SlotWriter:
+    """Vista de un worker sobre su slot: un memoryview tipado de `length` elementos"""
+    
+    def __init__(self, handle, slot):
+        name, slots, length, typecode = handle
+        if not 0 <= slot < slots:
+            raise IndexError(f"slot {slot} fuera de rango (hay {slots})")
+        self.shm = attach_shared_memory(name)
+        itemsize = array(typecode).itemsize
+        start = slot * length * itemsize
+        self.view = self.shm.buf[start:start + length * itemsize].cast(typecode)
+    
+    def __enter__(self):
+        return self.view
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.view.release()
+        self.shm.close()
+
+class SharedReducer:
+    """
+    `slots` agregados parciales de `length` elementos en un solo SharedMemory.
+    
+    A cada tarea se le envía handle() y un número de slot (unos bytes); el
+    worker escribe su parcial con `SlotWriter(handle, slot)`. reduce()
+    combina los slots en el padre (numpy si está, si no zip/map sobre
+    memoryviews) sin serializar nada.
+    """
+    
+    OPERATIONS = {"sum": sum, "max": max, "min": min}
+    
+    def __init__(self, slots, length=1, typecode="d"):
+        self.slots = slots
+        self.length = length
+        self.typecode = typecode
+        self.itemsize = array(typecode).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, slots * length * self.itemsize))
+        self._views = []
+    
+    def handle(self):
+        return self.shm.name, self.slots, self.length, self.typecode
+    
+    def _view(self, index):
+        start = index * self.length * self.itemsize
+        return self.shm.buf[start:start + self.length * self.itemsize].cast(self.typecode)
+    
+    def slot(self, index):
+        """Vista de un slot desde el padre (p. ej. para inicializarlo); se libera en close()"""
+        view = self._view(index)
+        self._views.append(view)
+        return view
+    
+    def reduce(self, op="sum"):
+        """Combinar los slots elemento a elemento; devuelve array(typecode)"""
+        if op not in self.OPERATIONS:
+            raise ValueError(f"operación desconocida {op!r}: usa {', '.join(self.OPERATIONS)}")
+        if numpy is not None:
+            matrix = numpy.frombuffer(self.shm.buf, dtype=_NUMPY_TYPES[self.typecode],
+                                      count=self.slots * self.length).reshape(self.slots, self.length)
+            # sum() promueve int32 a int64: se vuelve al tipo del slot
+            combined = getattr(matrix, op)(axis=0).astype(matrix.dtype, copy=False)
+            return array(self.typecode, combined.tobytes())
+        # Vistas locales: reduce() se llama muchas veces y no debe acumularlas
+        views = [self._view(i) for i in range(self.slots)]
+        try:
+            return array(self.typecode, map(self.OPERATIONS[op], zip(*views)))
+        finally:
+            for view in views:
+                view.release()
+    
+    def reduce_scalar(self, op="sum"):
+        """Para slots de un solo elemento: el valor combinado"""
+        return self.reduce(op)[0]
+    
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self.shm.close()
+        self.shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+# --- Tareas de ejemplo: cada una escribe su parcial en su slot ---
+
+def sum_task(handle, slot, start, stop):
+    with SlotWriter(handle, slot) as out:
+        out[0] = math.fsum(math.sqrt(i) for i in range(start, stop))
+
+def histogram_task(handle, slot, seed, count):
+    rng = random.Random(seed)
+    with SlotWriter(handle, slot) as out:
+        bins = len(out)
+        counts = [0] * bins
+        for _ in range(count):
+            counts[min(bins - 1, int(rng.gauss(bins / 2, bins / 6)) % bins)] += 1
+        out[:] = array("q", counts)
+
+def make_vector(seed, length):
+    """Un parcial grande: `length` doubles (un patrón repetido, barato de generar)"""
+    pattern = array("d", [(seed * 31 + i) % 1000 * 0.5 for i in range(min(length, 1000))])
+    return (pattern * -(-length // len(pattern)))[:length] if length else array("d")
+
+def vector_task(handle, slot, seed, length):
+    with SlotWriter(handle, slot) as out:
+        out[:] = make_vector(seed, length)
+
+def vector_task_pickled(seed, length):
+    """Alternativa con futures: el array vuelve serializado"""
+    return make_vector(seed, length)
+
+def combine_arrays(partials):
+    """Suma elemento a elemento de los parciales recibidos por futures"""
+    if numpy is not None:
+        return array("d", numpy.sum([numpy.frombuffer(p, dtype="f8") for p in partials], axis=0).tobytes())
+    return array("d", map(sum, zip(*partials)))
+
+def demonstrate_reductions(workers):
+    """Suma escalar, histograma y array por slots"""
+    print("=== Reducciones en Memoria Compartida ===")
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # 1. Suma escalar: un double por tarea
+        tasks = 8
+        with SharedReducer(tasks) as reducer:
+            step = 1_000_000 // tasks
+            futures = [executor.submit(sum_task, reducer.handle(), slot, slot * step, (slot + 1) * step)
+                       for slot in range(tasks)]
+            for future in futures:
+                future.result()  # Solo para propagar errores: el resultado es None
+            print(f"Σ sqrt(i) para i < 1M: {reducer.reduce_scalar():.3f}")
+        
+        # 2. Histograma: 20 contadores int64 por tarea
+        with SharedReducer(tasks, length=20, typecode="q") as reducer:
+            for future in [executor.submit(histogram_task, reducer.handle(), slot, slot, 50_000)
+                           for slot in range(tasks)]:
+                future.result()
+            histogram = reducer.reduce()
+            peak = max(histogram)
+            print(f"Histograma de {sum(histogram):,} muestras:")
+            for i in range(0, len(histogram), 2):
+                print(f"  {i:2} {'#' * (40 * histogram[i] // peak)}")
+        
+        # 3. Máximo elemento a elemento de arrays
+        with SharedReducer(tasks, length=5) as reducer:
+            for future in [executor.submit(vector_task, reducer.handle(), slot, slot, 5)
+                           for slot in range(tasks)]:
+                future.result()
+            print(f"Máximo por posición: {list(reducer.reduce('max'))}")
+    print()
+
+def demonstrate_benchmark(tasks, length, workers):
+    """Arrays grandes: futures con pickle contra slots en memoria compartida"""
+    print(f"=== Benchmark: {tasks} parciales de {length:,} doubles, {workers} workers ===")
+    
+    payload = len(pickle.dumps(make_vector(0, length), protocol=pickle.HIGHEST_PROTOCOL))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        executor.submit(os.getpid).result()  # Arrancar los workers fuera del tiempo medido
+        
+        start = time.perf_counter()
+        partials = [f.result() for f in [executor.submit(vector_task_pickled, seed, length)
+                                         for seed in range(tasks)]]
+        gathered = time.perf_counter() - start
+        pickled = combine_arrays(partials)
+        pickled_total = time.perf_counter() - start
+        del partials
+        
+        with SharedReducer(tasks, length) as reducer:
+            start = time.perf_counter()
+            for future in [executor.submit(vector_task, reducer.handle(), slot, slot, length)
+                           for slot in range(tasks)]:
+                future.result()
+            written = time.perf_counter() - start
+            shared = reducer.reduce()
+            shared_total = time.perf_counter() - start
+    
+    assert shared == pickled
+    print(f"{'futures (pickle)':>20}: {pickled_total:.3f}s (recoger {gathered:.3f}s, "
+          f"{tasks * payload / 1024**2:.0f} MB serializados)")
+    print(f"{'memoria compartida':>20}: {shared_total:.3f}s (escribir {written:.3f}s, 0 MB serializados)")
+    print(f"Combinación con {'numpy' if numpy is not None else 'zip/map (sin numpy)'}")
+    print()
+
+if __name__ == "__main__":
+    print("=== Reducción en Memoria Compartida ===")
+    print("[future.result() for future in futures] serializa cada resultado parcial\n")
+    
+    workers = min(4, os.cpu_count() or 1)
+    demonstrate_reductions(workers)
+    demonstrate_benchmark(8, int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000, workers)
+    
+    print("=== Consejos ===")
+    print("1. Preasigna un slot por tarea: sin locks, cada worker escribe el suyo")
+    print("2. Solo viajan el nombre del segmento y el número de slot")
+    print("3. Asocia (+, max, min) permite combinar en cualquier orden")
+    print("4. Histogramas y contadores: tipo entero ('q') para que la suma sea exacta")
+    print("5. future.result() sigue sirviendo para propagar excepciones")
@@ -0,0 +1,798 @@
+"""
+Router compilado para el APIRouter estilo FastAPI
+Trie por método, parámetros tipados, caché de rutas estáticas y un servidor HTTP/1.1 asyncio
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import email.utils
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import typing
+import uuid
+from collections import deque, namedtuple
+from dataclasses import dataclass
+from typing import Optional
+
+# Conversión de segmentos según la anotación del parámetro del handler
+CONVERTERS = {
+    int: int,
+    float: float,
+    str: str,
+    uuid.UUID: uuid.UUID,
+}
+
+class RoutingError(Exception):
+    status = 500
+
+class NotFound(RoutingError):
+    status = 404
+
+class MethodNotAllowed(RoutingError):
+    status = 405
+    
+    def __init__(self, allowed):
+        super().__init__(f"métodos permitidos: {', '.join(sorted(allowed))}")
+        self.allowed = allowed
+
+@dataclass
+class Route:
+    method: str
+    path: str
+    func: typing.Callable
+    params: tuple = ()
+
+class _Node:
+    """Nodo del trie: hijos estáticos por segmento y, como mucho, un hijo parámetro"""
+    __slots__ = ("static", "param", "param_name", "converter", "route")
+    
+    def __init__(self):
+        self.static = {}
+        self.param = None
+        self.param_name = None
+        self.converter = None
+        self.route = None
+
+def split_path(path):
+    """'/users/42/' -> ['users', '42']; la query string se ignora"""
+    path = path.split("?", 1)[0]
+    return [segment for segment in path.split("/") if segment]
+
+def _converter_for(func, name):
+    hints = typing.get_type_hints(func)
+    annotation = hints.get(name, str)
+    if typing.get_origin(annotation) is typing.Union:  # Optional[int] -> int
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+    try:
+        return CONVERTERS[annotation]
+    except KeyError:
+        raise TypeError(f"{func.__name__}: no hay conversor para {name}: {annotation!r}") from None
+
+class APIRouter:
+    """
+    El APIRouter de 09_community_innovations.py con un matcher compilado.
+    
+    - Un trie por método HTTP: cada nivel es un dict segmento -> nodo,
+      así que el coste depende de la profundidad de la ruta, no del número
+      de rutas. Los segmentos estáticos tienen prioridad sobre `{param}`.
+    - Los parámetros se convierten con la anotación del handler
+      (`user_id: int`); si la conversión falla, esa rama no coincide.
+    - Las rutas sin parámetros van a un dict (método, path) -> ruta.
+    """
+    
+    def __init__(self):
+        self.routes = []
+        self._tries = None
+        self._static = None
+    
+    # --- Registro (misma API que el demo) ---
+    
+    def route(self, method, path):
+        def decorator(func):
+            self.add_route(method, path, func)
+            return func
+        return decorator
+    
+    def get(self, path: str):
+        return self.route("GET", path)
+    
+    def post(self, path: str):
+        return self.route("POST", path)
+    
+    def put(self, path: str):
+        return self.route("PUT", path)
+    
+    def delete(self, path: str):
+        return self.route("DELETE", path)
+    
+    def add_route(self, method, path, func):
+        params = tuple(segment[1:-1] for segment in split_path(path)
+                       if segment.startswith("{") and segment.endswith("}"))
+        self.routes.append(Route(method.upper(), path, func, params))
+        self._tries = None  # Recompilar en la próxima búsqueda
+    
+    # --- Compilación ---
+    
+    def compile(self):
+        tries, static = {}, {}
+        for route in self.routes:
+            segments = split_path(route.path)
+            if not route.params:
+                static.setdefault(route.method, {})["/" + "/".join(segments)] = route
+            node = tries.setdefault(route.method, _Node())
+            for segment in segments:
+                if segment.startswith("{") and segment.endswith("}"):
+                    name = segment[1:-1]
+                    converter = _converter_for(route.func, name)
+                    if node.param is None:
+                        node.param = _Node()
+                        node.param_name = name
+                        node.converter = converter
+                    elif node.param_name != name:
+                        raise ValueError(f"{route.path}: '{{{name}}}' choca con "
+                                         f"'{{{node.param_name}}}' en la misma posición")
+                    elif node.converter is not converter:
+                        # El nodo se comparte: un solo conversor por posición
+                        raise ValueError(f"{route.path}: '{{{name}}}' tiene otro tipo que en "
+                                         f"otra ruta con el mismo prefijo")
+                    node = node.param
+                else:
+                    node = node.static.setdefault(segment, _Node())
+            if node.route is not None:
+                raise ValueError(f"ruta duplicada: {route.method} {route.path}")
+            node.route = route
+        self._tries, self._static = tries, static
+        return self
+    
+    @staticmethod
+    def _walk(node, segments, index, params):
+        """Búsqueda en profundidad: primero el hijo estático, luego el parámetro"""
+        if index == len(segments):
+            return node.route
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            route = APIRouter._walk(child, segments, index + 1, params)
+            if route is not None:
+                return route
+        if node.param is not None:
+            try:
+                value = node.converter(segment)
+            except ValueError:
+                return None
+            params[node.param_name] = value
+            route = APIRouter._walk(node.param, segments, index + 1, params)
+            if route is not None:
+                return route
+            del params[node.param_name]
+        return None
+    
+    def match(self, method, path):
+        """(ruta, params) o (None, None); no distingue 404 de 405"""
+        if self._tries is None:
+            self.compile()
+        static = self._static.get(method)
+        if static is not None:
+            route = static.get(path)
+            if route is not None:
+                return route, {}
+        root = self._tries.get(method)
+        if root is None:
+            return None, None
+        segments = split_path(path)
+        params = {}
+        # Camino rápido sin recursión; solo si llega a un callejón sin salida
+        # se repite la búsqueda con backtracking
+        node = root
+        try:
+            for segment in segments:
+                child = node.static.get(segment)
+                if child is None:
+                    params[node.param_name] = node.converter(segment)
+                    child = node.param
+                node = child
+        except (TypeError, ValueError):
+            node = None
+        if node is not None and node.route is not None:
+            return node.route, params
+        params = {}
+        route = self._walk(root, segments, 0, params)
+        return (route, params) if route is not None else (None, None)
+    
+    def resolve(self, method, path):
+        """Como match(), pero lanza NotFound o MethodNotAllowed"""
+        route, params = self.match(method, path)
+        if route is not None:
+            return route, params
+        allowed = {other for other in self._tries if other != method
+                   and self.match(other, path)[0] is not None}
+        if allowed:
+            raise MethodNotAllowed(allowed)
+        raise NotFound(path)
+
+class LinearRouter:
+    """Referencia: una regex por ruta y búsqueda lineal sobre la lista"""
+    
+    def __init__(self, routes):
+        self.patterns = []
+        for route in routes:
+            regex = "/" + "/".join(
+                f"(?P<{s[1:-1]}>[^/]+)" if s.startswith("{") else re.escape(s)
+                for s in split_path(route.path))
+            converters = {name: _converter_for(route.func, name) for name in route.params}
+            self.patterns.append((route.method, re.compile(regex + "/?$"), converters, route))
+    
+    def match(self, method, path):
+        path = path.split("?", 1)[0]
+        for route_method, pattern, converters, route in self.patterns:
+            if route_method != method:
+                continue
+            found = pattern.match(path)
+            if found is None:
+                continue
+            try:
+                return route, {name: converters[name](value) for name, value in found.groupdict().items()}
+            except ValueError:
+                continue
+        return None, None
+
+# --- Servidor HTTP/1.1 asyncio ---
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error", 501: "Not Implemented"}
+STATUS_LINES = {status: f"HTTP/1.1 {status} {reason}\r\n".encode() for status, reason in REASONS.items()}
+MAX_HEAD_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+# Peticiones de un pipeline encoladas por conexión: por encima se deja de leer
+MAX_PENDING = 64
+# Respuestas acumuladas que fuerzan un write aunque el pipeline siga lleno
+FLUSH_SIZE = 64 * 1024
+
+Request = namedtuple("Request", "method target version headers body keep_alive")
+
+class BadRequest(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def parse_request_head(head):
+    """Línea de petición y headers (nombres en minúsculas) de un head sin el \\r\\n\\r\\n"""
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise BadRequest(f"línea de petición inválida: {lines[0]!r}")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if not sep or not name or name != name.strip():
+            raise BadRequest(f"header inválido: {line!r}")
+        name = name.lower()
+        if name == "content-length" and name in headers:
+            raise BadRequest("Content-Length duplicado")
+        headers[name] = value.strip()
+    return parts[0], parts[1], parts[2], headers
+
+_FIELDS = {}
+
+def to_jsonable(value):
+    """Dataclasses (anidadas), dicts y listas a tipos JSON; campos cacheados por clase"""
+    cls = type(value)
+    if cls is str or cls is int or cls is float or cls is bool or value is None:
+        return value
+    names = _FIELDS.get(cls)
+    if names is None:
+        if dataclasses.is_dataclass(value):
+            names = _FIELDS[cls] = tuple(f.name for f in dataclasses.fields(cls))
+        elif isinstance(value, dict):
+            return {str(k): to_jsonable(v) for k, v in value.items()}
+        elif isinstance(value, (list, tuple)):
+            return [to_jsonable(v) for v in value]
+        else:
+            return str(value)
+    return {name: to_jsonable(getattr(value, name)) for name in names}
+
+# Tipos JSON aceptados por anotación; un bool de JSON no vale como int
+_SCALARS = {str: (str,), int: (int,), float: (int, float), bool: (bool,)}
+
+def from_jsonable(cls, data):
+    """
+    Construir una dataclass (con dataclasses anidadas) desde un dict JSON.
+    Los campos str/int/float/bool (y Optional de ellos) se validan: un tipo
+    equivocado es BadRequest (400). Otras anotaciones no se comprueban.
+    """
+    if typing.get_origin(cls) is typing.Union:
+        args = typing.get_args(cls)
+        if data is None and type(None) in args:
+            return None
+        candidates = [arg for arg in args if arg is not type(None)]
+        return from_jsonable(candidates[0], data) if len(candidates) == 1 else data
+    if cls in _SCALARS:
+        if not isinstance(data, _SCALARS[cls]) or (isinstance(data, bool) and cls is not bool):
+            raise BadRequest(f"se esperaba {cls.__name__}, no {type(data).__name__}")
+        return float(data) if cls is float else data
+    if not dataclasses.is_dataclass(cls):
+        return data
+    if not isinstance(data, dict):
+        raise ValueError(f"{cls.__name__}: se esperaba un objeto")
+    hints = typing.get_type_hints(cls)
+    kwargs = {}
+    for f in dataclasses.fields(cls):
+        if f.name in data:
+            try:
+                kwargs[f.name] = from_jsonable(hints[f.name], data[f.name])
+            except BadRequest as e:
+                raise BadRequest(f"{cls.__name__}.{f.name}: {e}") from None
+        elif f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+            raise ValueError(f"{cls.__name__}: falta el campo {f.name!r}")
+    return cls(**kwargs)
+
+class HTTPApplication:
+    """
+    Convierte una petición en bytes de respuesta usando un APIRouter.
+    
+    Por ruta se calcula una sola vez qué parámetros vienen del cuerpo JSON
+    (los anotados con una dataclass y que no están en el path).
+    """
+    
+    def __init__(self, router):
+        self.router = router.compile()
+        self._body_params = {}
+        self._date = b""
+        self._date_second = None
+    
+    def _date_header(self):
+        now = int(time.time())
+        if now != self._date_second:
+            self._date_second = now
+            self._date = f"date: {email.utils.formatdate(now, usegmt=True)}\r\n".encode()
+        return self._date
+    
+    def _body_binding(self, route):
+        binding = self._body_params.get(id(route))
+        if binding is None:
+            hints = typing.get_type_hints(route.func)
+            binding = self._body_params[id(route)] = tuple(
+                (name, annotation) for name, annotation in hints.items()
+                if name != "return" and name not in route.params and dataclasses.is_dataclass(annotation))
+        return binding
+    
+    async def handle(self, request, out):
+        """Escribir la respuesta en `out` (bytearray); devuelve el status"""
+        status = 200
+        try:
+            route, params = self.router.resolve(request.method, request.target)
+            binding = self._body_binding(route)
+            if binding:
+                try:
+                    data = json.loads(request.body or b"null")
+                    for name, cls in binding:
+                        params[name] = from_jsonable(cls, data)
+                except BadRequest as e:
+                    status, result = e.status, {"detail": str(e)}
+                except (ValueError, TypeError) as e:
+                    status, result = 422, {"detail": str(e)}
+            if status == 200:
+                result = await route.func(**params)
+        except RoutingError as e:
+            status, result = e.status, {"detail": str(e)}
+        except Exception as e:
+            status, result = 500, {"detail": f"{type(e).__name__}: {e}"}
+        self.write_response(out, status, json.dumps(to_jsonable(result), separators=(",", ":")).encode(),
+                            request.keep_alive, request.version)
+        return status
+    
+    def write_response(self, out, status, body, keep_alive=True, version="HTTP/1.1"):
+        out += STATUS_LINES[status]
+        out += self._date_header()
+        out += b"content-type: application/json\r\ncontent-length: %d\r\n" % len(body)
+        if not keep_alive:
+            out += b"connection: close\r\n"
+        elif version != "HTTP/1.1":
+            out += b"connection: keep-alive\r\n"  # HTTP/1.0 cierra salvo que se confirme
+        out += b"\r\n"
+        out += body
+
+class HTTPProtocol(asyncio.Protocol):
+    """
+    Una conexión HTTP/1.1 con keep-alive y pipelining.
+    
+    data_received solo parsea y encola; una tarea por conexión atiende la
+    cola en orden (las respuestas de un pipeline no se pueden reordenar).
+    Las respuestas se acumulan en un bytearray reutilizado y se envían con
+    una sola escritura cuando la cola se vacía. Con MAX_PENDING peticiones
+    encoladas se pausa la lectura del socket hasta que la cola baja a la mitad.
+    """
+    
+    def __init__(self, app, keepalive_timeout=15.0):
+        self.app = app
+        self.keepalive_timeout = keepalive_timeout
+        self.buffer = bytearray()
+        self.out = bytearray()
+        self.pending = deque()
+        self.transport = None
+        self.worker = None
+        self.closing = False
+        self.idle_handle = None
+        self.can_write = None
+        self.reading_paused = False
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        self._reset_idle()
+    
+    def connection_lost(self, exc):
+        self.closing = True
+        if self.idle_handle is not None:
+            self.idle_handle.cancel()
+        if self.worker is not None:
+            self.worker.cancel()
+        if self.can_write is not None and not self.can_write.done():
+            self.can_write.set_result(None)
+    
+    def pause_writing(self):
+        self.can_write = asyncio.get_running_loop().create_future()
+    
+    def resume_writing(self):
+        if self.can_write is not None and not self.can_write.done():
+            self.can_write.set_result(None)
+        self.can_write = None
+    
+    def _reset_idle(self):
+        if self.idle_handle is not None:
+            self.idle_handle.cancel()
+        self.idle_handle = asyncio.get_running_loop().call_later(
+            self.keepalive_timeout, self.transport.close)
+    
+    def data_received(self, data):
+        if self.closing:
+            return
+        self.buffer += data
+        self._reset_idle()
+        self._parse()
+    
+    def _parse(self):
+        """Encolar las peticiones completas del buffer (hasta MAX_PENDING)"""
+        try:
+            while True:
+                if len(self.pending) >= MAX_PENDING:
+                    # El resto queda en el buffer: se parsea al reanudar
+                    if not self.reading_paused:
+                        self.reading_paused = True
+                        self.transport.pause_reading()
+                    break
+                end = self.buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    if len(self.buffer) > MAX_HEAD_SIZE:
+                        raise BadRequest("head demasiado grande", 431)
+                    break
+                method, target, version, headers = parse_request_head(bytes(self.buffer[:end]))
+                # Un cuerpo mal delimitado desincroniza el pipeline (request smuggling)
+                if "transfer-encoding" in headers:
+                    raise BadRequest("Transfer-Encoding no soportado", 501)
+                length = headers.get("content-length", "0")
+                if not (length.isascii() and length.isdigit()):
+                    raise BadRequest(f"Content-Length inválido: {length!r}")
+                length = int(length)
+                if length > MAX_BODY_SIZE:
+                    raise BadRequest("cuerpo demasiado grande", 413)
+                total = end + 4 + length
+                if len(self.buffer) < total:
+                    break  # Falta parte del cuerpo
+                body = bytes(self.buffer[end + 4:total])
+                del self.buffer[:total]
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                request = Request(method, target, version, headers, body, keep_alive)
+                self.pending.append(request)
+                if not keep_alive:
+                    self.closing = True
+                    break
+        except (BadRequest, ValueError) as e:
+            self.closing = True
+            self.pending.append(e if isinstance(e, BadRequest) else BadRequest(str(e)))
+        if self.pending and self.worker is None:
+            self.worker = asyncio.get_running_loop().create_task(self._process())
+    
+    async def _process(self):
+        out, pending, transport = self.out, self.pending, self.transport
+        try:
+            while pending:
+                item = pending.popleft()
+                if self.reading_paused and len(pending) <= MAX_PENDING // 2 and not self.closing:
+                    self.reading_paused = False
+                    self.transport.resume_reading()
+                    self._parse()
+                if isinstance(item, BadRequest):
+                    self.app.write_response(out, item.status, json.dumps({"detail": str(item)}).encode(), False)
+                    keep_alive = False
+                else:
+                    await self.app.handle(item, out)
+                    keep_alive = item.keep_alive
+                if not pending or not keep_alive or len(out) >= FLUSH_SIZE:
+                    # Un write por ráfaga del pipeline; bytes() porque `out` se reutiliza
+                    transport.write(bytes(out))
+                    out.clear()
+                    if self.can_write is not None:
+                        await self.can_write
+                if not keep_alive:
+                    transport.close()
+                    return
+        finally:
+            self.worker = None
+
+# --- La aplicación del demo ---
+
+@dataclass
+class User:
+    name: str
+    age: int
+    email: Optional[str] = None
+
+@dataclass
+class UserResponse:
+    id: int
+    user: User
+    created_at: str
+
+app = APIRouter()
+
+@app.get("/")
+async def root():
+    return {"message": "Hello World"}
+
+@app.get("/users/{user_id}")
+async def get_user(user_id: int):
+    return UserResponse(
+        id=user_id,
+        user=User(name="Alice", age=30, email="alice@example.com"),
+        created_at="2024-01-01T00:00:00"
+    )
+
+@app.post("/users/")
+async def create_user(user: User):
+    return UserResponse(
+        id=123,
+        user=user,
+        created_at="2024-01-01T00:00:00"
+    )
+
+@app.get("/users/me")
+async def current_user():
+    return {"user": "me"}
+
+def demonstrate_router():
+    """Resolver peticiones contra las rutas del demo"""
+    print("=== Router Compilado ===")
+    
+    for method, path in [("GET", "/"), ("GET", "/users/42"), ("GET", "/users/me"),
+                         ("POST", "/users/"), ("GET", "/users/abc"), ("DELETE", "/users/42")]:
+        try:
+            route, params = app.resolve(method, path)
+            result = asyncio.run(route.func(**params)) if route.func is not create_user else "(cuerpo JSON)"
+            print(f"  {method:6} {path:12} -> {route.func.__name__}({params}) = {result}")
+        except RoutingError as e:
+            print(f"  {method:6} {path:12} -> {e.status} {type(e).__name__} {e}")
+    print()
+
+def build_routes(count, seed=7):
+    """Mezcla de rutas estáticas y con parámetros, con prefijos compartidos"""
+    async def item(item_id: int):
+        return item_id
+    
+    async def listing():
+        return []
+    
+    rng = random.Random(seed)
+    router, probes = APIRouter(), []
+    for i in range(count):
+        version, resource = rng.randint(1, 3), f"recurso{i}"
+        if i % 2:
+            router.add_route("GET", f"/api/v{version}/{resource}/{{item_id}}/detalle", item)
+            probes.append(f"/api/v{version}/{resource}/{rng.randint(1, 10**6)}/detalle")
+        else:
+            router.add_route("GET", f"/api/v{version}/{resource}", listing)
+            probes.append(f"/api/v{version}/{resource}")
+    return router, probes
+
+def demonstrate_benchmark(sizes, lookups=2000):
+    """Búsqueda lineal con regex contra el trie compilado"""
+    print("=== Benchmark: búsquedas por segundo ===")
+    
+    for count in sizes:
+        router, probes = build_routes(count)
+        router.compile()
+        linear = LinearRouter(router.routes)
+        rng = random.Random(count)
+        sample = [rng.choice(probes) for _ in range(lookups)]
+        for path in sample[:50]:
+            assert router.match("GET", path)[0] is linear.match("GET", path)[0]
+        
+        results = []
+        for name, matcher, n in [("lineal + regex", linear.match, max(20, lookups * 10 // count)),
+                                 ("trie compilado", router.match, lookups)]:
+            start = time.perf_counter()
+            for path in sample[:n]:
+                matcher("GET", path)
+            elapsed = (time.perf_counter() - start) / n
+            results.append(elapsed)
+            print(f"  {count:>6} rutas, {name:>15}: {elapsed * 1e6:9.2f} µs/búsqueda "
+                  f"({1 / elapsed:12,.0f}/s)")
+        print(f"  {'':>6}        speedup: {results[0] / results[1]:,.1f}x")
+    print()
+
+# --- Servidor y generador de carga en loopback ---
+
+async def serve_async(router, host="127.0.0.1", port=8000, ready=None):
+    application = HTTPApplication(router)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: HTTPProtocol(application), host, port, backlog=1024)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+def serve(host, port):
+    def ready(bound_port):
+        print(f"APIRouter en http://{host}:{bound_port}/ ({len(app.routes)} rutas)", flush=True)
+    asyncio.run(serve_async(app, host, port, ready))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def sample_requests():
+    """Las tres rutas del demo: GET /, GET /users/{id} y POST /users/ con JSON"""
+    body = json.dumps({"name": "Bob", "age": 25, "email": "bob@example.com"}).encode()
+    requests = [b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n"]
+    requests += [b"GET /users/%d HTTP/1.1\r\nHost: localhost\r\n\r\n" % i for i in range(1, 9)]
+    requests.append(b"POST /users/ HTTP/1.1\r\nHost: localhost\r\ncontent-type: application/json\r\n"
+                    b"content-length: %d\r\n\r\n%s" % (len(body), body))
+    return requests
+
+async def _client(port, requests, count, depth, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    sent = 0
+    while sent < count:
+        batch = [requests[(sent + i) % len(requests)] for i in range(min(depth, count - sent))]
+        start = time.perf_counter()
+        writer.write(b"".join(batch))  # depth > 1: pipelining
+        for _ in batch:
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head[9:12])
+            statuses[status] = statuses.get(status, 0) + 1
+            length = int(head.lower().split(b"content-length:", 1)[1].split(b"\r\n", 1)[0])
+            await reader.readexactly(length)
+        elapsed = time.perf_counter() - start
+        latencies.extend([elapsed] * len(batch))
+        sent += len(batch)
+    writer.close()
+
+def load_test(port, clients=32, requests_per_client=300, depth=1):
+    """req/s y percentiles de latencia con conexiones persistentes"""
+    async def run():
+        latencies, statuses = [], {}
+        requests = sample_requests()
+        start = time.perf_counter()
+        await asyncio.gather(*[_client(port, requests, requests_per_client, depth, latencies, statuses)
+                               for _ in range(clients)])
+        return time.perf_counter() - start, latencies, statuses
+    
+    elapsed, latencies, statuses = asyncio.run(run())
+    latencies.sort()
+    
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    
+    return {"requests": len(latencies), "req_s": len(latencies) / elapsed, "statuses": statuses,
+            "p50_ms": percentile(0.50), "p90_ms": percentile(0.90), "p99_ms": percentile(0.99)}
+
+def run_load_benchmark(clients=32, requests_per_client=300, depths=(1, 16)):
+    """Servidor en otro proceso (un core) y el generador de carga en este"""
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", "--port", str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(port):
+            print("El servidor no arrancó")
+            return
+        print(f"{clients} clientes x {requests_per_client} peticiones (GET /, GET /users/{{id}}, POST /users/)")
+        print(f"{'pipeline':>10} | {'req/s':>9} | {'p50 ms':>7} | {'p90 ms':>7} | {'p99 ms':>7} | status")
+        for depth in depths:
+            stats = load_test(port, clients, requests_per_client, depth)
+            print(f"{depth:>10} | {stats['req_s']:>9,.0f} | {stats['p50_ms']:>7.2f} | "
+                  f"{stats['p90_ms']:>7.2f} | {stats['p99_ms']:>7.2f} | {stats['statuses']}")
+    finally:
+        proc.terminate()
+        proc.wait()
+    if (os.cpu_count() or 1) == 1:
+        print("(1 CPU: el generador de carga compite con el servidor)")
+
+def demonstrate_http():
+    """Las rutas del demo servidas por HTTP: respuestas reales"""
+    print("=== Servidor HTTP asyncio ===")
+    
+    async def run():
+        ready = asyncio.get_running_loop().create_future()
+        server = asyncio.ensure_future(serve_async(app, port=0, ready=ready.set_result))
+        port = await ready
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        # Tres peticiones en un solo write: pipelining sobre una conexión keep-alive
+        writer.write(b"".join(sample_requests()[i] for i in (0, 1, -1)) +
+                     b"GET /users/abc HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        for _ in range(4):
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.lower().split(b"content-length:", 1)[1].split(b"\r\n", 1)[0])
+            body = await reader.readexactly(length)
+            status_line = head.split(b"\r\n", 1)[0].decode()
+            print(f"  {status_line} {body.decode()}")
+        writer.close()
+        server.cancel()
+    
+    asyncio.run(run())
+    print()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command")
+    
+    serve_parser = sub.add_parser("serve", help="Servir las rutas del demo")
+    serve_parser.add_argument("--bind", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    
+    bench_parser = sub.add_parser("bench", help="Carga en loopback contra el servidor")
+    bench_parser.add_argument("--clients", type=int, default=64)
+    bench_parser.add_argument("--requests", type=int, default=500)
+    bench_parser.add_argument("--pipeline", type=int, nargs="+", default=[1, 16])
+    
+    routes_parser = sub.add_parser("routes", help="Benchmark del matcher")
+    routes_parser.add_argument("sizes", type=int, nargs="*", default=[10, 1_000, 10_000])
+    
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        try:
+            serve(args.bind, args.port)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "bench":
+        run_load_benchmark(args.clients, args.requests, args.pipeline)
+    elif args.command == "routes":
+        demonstrate_benchmark(args.sizes)
+    else:
+        print("=== Router Compilado ===")
+        print("Recorrer self.routes en cada petición es O(rutas)\n")
+        
+        demonstrate_router()
+        demonstrate_benchmark([10, 1_000, 10_000])
+        demonstrate_http()
+        print("=== Benchmark HTTP en loopback ===")
+        run_load_benchmark(clients=16, requests_per_client=200)
+        print()
+        
+        print("=== Consejos ===")
+        print("1. Un dict por nivel de la ruta: el coste depende de la profundidad, no del total")
+        print("2. Las anotaciones del handler definen la conversión de cada parámetro")
+        print("3. Segmentos estáticos antes que parámetros (/users/me antes que /users/{id})")
+        print("4. Con pipelining, acumula las respuestas y escribe una vez por ráfaga")
+        print("5. Uso: python examples/26_compiled_router.py serve --port 8000 | bench | routes")
+
+if __name__ == "__main__":
+    main()
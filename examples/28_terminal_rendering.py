@@ -0,0 +1,529 @@
+"""
+Renderizado de terminal sin que la E/S domine el trabajo
+Barras de progreso con refresco limitado por reloj monótono y tablas en streaming con memoria acotada
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from itertools import chain
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- Progress ---
+
+def format_count(value):
+    """1234567 -> 1.2M"""
+    for unit, size in (("G", 1e9), ("M", 1e6), ("k", 1e3)):
+        if abs(value) >= size:
+            return f"{value / size:.1f}{unit}"
+    return f"{value:.0f}" if isinstance(value, float) else str(value)
+
+def format_duration(seconds):
+    if seconds is None or seconds != seconds or seconds == float("inf"):
+        return "-:--:--"
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+
+class Task:
+    """
+    Una barra. `completed` es un atributo normal: quien itera lo escribe y
+    el hilo de render solo lo lee, así que no hace falta lock mientras cada
+    barra tenga un solo productor. Para compartirla entre threads, advance().
+    """
+    
+    __slots__ = ("description", "total", "completed", "started", "finished", "samples", "_lock")
+    
+    def __init__(self, description, total=None):
+        self.description = description
+        self.total = total
+        self.completed = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.samples = deque(maxlen=32)  # (instante, completed) de cada refresco
+        self._lock = threading.Lock()
+    
+    def advance(self, amount=1):
+        with self._lock:
+            self.completed += amount
+    
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.monotonic()
+    
+    def speed(self, now, window=5.0):
+        """Elementos por segundo en los últimos `window` segundos"""
+        if self.finished is not None:
+            elapsed = self.finished - self.started
+            return self.completed / elapsed if elapsed > 0 else None
+        samples = self.samples
+        while len(samples) > 2 and now - samples[0][0] > window:
+            samples.popleft()
+        if len(samples) < 2:
+            elapsed = now - self.started
+            return self.completed / elapsed if elapsed > 0 and self.completed else None
+        (t0, c0), (t1, c1) = samples[0], samples[-1]
+        return (c1 - c0) / (t1 - t0) if t1 > t0 else None
+
+class Progress:
+    """
+    Barras de progreso con refresco limitado.
+    
+    Un hilo de render se despierta `refresh_per_second` veces por segundo,
+    lee los contadores de todas las barras y las redibuja con una sola
+    escritura. Iterar con track() no hace E/S ni consulta el reloj: solo
+    guarda el contador. Funciona con varias barras a la vez, actualizadas
+    desde threads o desde tareas asyncio (atrack).
+    
+    Si la salida no es una terminal, no se redibuja en vivo: cada barra se
+    escribe una vez, al terminar.
+    """
+    
+    def __init__(self, stream=None, refresh_per_second=10, width=30, live=None):
+        self.stream = stream or sys.stdout
+        self.interval = 1 / refresh_per_second
+        self.width = width
+        self.live = self.stream.isatty() if live is None else live
+        self.tasks = []
+        self._drawn = 0  # Líneas del último redibujado (para subir el cursor)
+        self._lock = threading.Lock()
+        self._stop = None  # Event propio de cada hilo de render
+        self._thread = None
+        self._users = 0
+    
+    def add_task(self, description, total=None):
+        task = Task(description, total)
+        with self._lock:
+            self.tasks.append(task)
+        return task
+    
+    def start(self):
+        with self._lock:
+            self._users += 1
+            if self._thread is None:
+                # Un Event nuevo: el del hilo anterior puede estar marcado todavía
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                                name="progress", daemon=True)
+                self._thread.start()
+    
+    def stop(self):
+        with self._lock:
+            self._users -= 1
+            thread = self._thread if self._users <= 0 else None
+            if thread is not None:
+                self._stop.set()  # Bajo el lock: un start() posterior ya usa otro Event
+                self._thread = self._stop = None
+                self._users = 0
+        if thread is not None:
+            thread.join()
+            self.refresh(final=True)
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def track(self, iterable, description="Processing", total=None):
+        if total is None and hasattr(iterable, "__len__"):
+            total = len(iterable)
+        task = self.add_task(description, total)
+        self.start()
+        try:
+            # enumerate cuenta en C: por elemento solo se guarda el contador
+            for task.completed, item in enumerate(iterable, 1):
+                yield item
+        finally:
+            task.finish()
+            self.stop()
+    
+    async def atrack(self, aiterable, description="Processing", total=None):
+        task = self.add_task(description, total)
+        self.start()
+        try:
+            async for item in aiterable:
+                task.completed += 1
+                yield item
+        finally:
+            task.finish()
+            self.stop()
+    
+    def _run(self, stop):
+        while not stop.wait(self.interval):
+            self.refresh()
+    
+    def render(self, task, now):
+        completed, total = task.completed, task.total
+        speed = task.speed(now)
+        elapsed = (task.finished or now) - task.started
+        if total:
+            fraction = min(1.0, completed / total)
+            filled = int(self.width * fraction)
+            bar = "█" * filled + "▒" * (self.width - filled)
+            if task.finished is not None:
+                eta = f"en {format_duration(elapsed)}"
+            else:
+                eta = f"ETA {format_duration((total - completed) / speed if speed else None)}"
+            return (f"{task.description}: [{bar}] {fraction * 100:5.1f}% "
+                    f"{format_count(completed)}/{format_count(total)} "
+                    f"{format_count(speed or 0)} it/s {eta}")
+        return (f"{task.description}: {format_count(completed)} "
+                f"{format_count(speed or 0)} it/s {format_duration(elapsed)}")
+    
+    def refresh(self, final=False):
+        now = time.monotonic()
+        with self._lock:
+            tasks = list(self.tasks)
+            for task in tasks:
+                task.samples.append((now, task.completed))
+            if self.live:
+                lines = [self.render(task, now) for task in tasks]
+                # Subir al inicio del bloque anterior y reescribirlo en una sola escritura
+                prefix = f"\x1b[{self._drawn}F" if self._drawn else ""
+                self.stream.write(prefix + "".join(f"\x1b[2K{line}\n" for line in lines))
+                self._drawn = len(lines)
+                if final:
+                    # El bloque queda en pantalla; la próxima sesión empieza debajo
+                    self.tasks = [task for task in tasks if task.finished is None]
+                    self._drawn = 0
+            else:
+                done = [task for task in tasks if task.finished is not None or final]
+                if done:
+                    self.stream.write("".join(f"{self.render(task, now)}\n" for task in done))
+                    self.tasks = [task for task in tasks if task not in done]
+            self.stream.flush()
+
+# --- Table (sobre el TableRenderer de 13_table_rendering.py) ---
+
+def _table_rendering():
+    """El módulo 13: anchos, recorte, format_row generada y escritura por bloques"""
+    path = Path(__file__).with_name("13_table_rendering.py")
+    spec = importlib.util.spec_from_file_location("table_rendering", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+_tables = _table_rendering()
+Column, TableRenderer, truncate = _tables.Column, _tables.TableRenderer, _tables.truncate
+
+JUSTIFY = {"left": "<", "right": ">", "center": "^"}
+
+def terminal_width(out):
+    """Columnas de la terminal a la que escribe `out`, o None si no es una terminal"""
+    try:
+        if not out.isatty():
+            return None
+        return os.get_terminal_size(out.fileno()).columns
+    except (AttributeError, OSError, ValueError):
+        return None
+
+class Table(TableRenderer):
+    """
+    Tabla que se escribe en streaming, sin guardar las filas.
+    
+    Es el TableRenderer de 13 con la API del Table de 09 (add_column,
+    add_row, show), bordes, título y el ancho de la terminal de `out`.
+    Los anchos salen de:
+      - "sample": las primeras `sample_size` filas (se guardan solo esas);
+        el resto se escribe con esos anchos y lo que no cabe se recorta.
+      - "two-pass": una primera pasada completa que solo mide; necesita
+        un iterable que se pueda recorrer dos veces (lista, range, o una
+        función que devuelva un iterador nuevo).
+      - anchos fijos: si todas las columnas tienen `width`, no se mide nada.
+    
+    Si el texto no cabe: "ellipsis" (…), "crop" o "fold" (la fila ocupa
+    varias líneas).
+    """
+    
+    def __init__(self, title=None, mode="sample", sample_size=1000, max_width=None, batch_size=1024):
+        if mode not in ("sample", "two-pass"):
+            raise ValueError("mode debe ser 'sample' o 'two-pass'")
+        super().__init__([], separator=" │ ", chunk_size=batch_size, prefix="│ ", suffix=" │")
+        self.title = title
+        self.mode = mode
+        self.sample_size = sample_size
+        self.max_width = max_width
+        self.rows = []
+    
+    def add_column(self, header, style=None, justify="left", format_spec=None, width=None,
+                   min_width=1, max_width=None, overflow="ellipsis"):
+        """`style` se acepta por compatibilidad con el Table de 09 y se ignora"""
+        if justify not in JUSTIFY:
+            raise ValueError(f"justify debe ser uno de {sorted(JUSTIFY)}")
+        if overflow not in _tables.OVERFLOWS:
+            raise ValueError(f"overflow debe ser uno de {_tables.OVERFLOWS}")
+        if width is not None:
+            min_width = max_width = width
+        self.columns.append(Column(str(header), JUSTIFY[justify], format_spec or "",
+                                   max(1, min_width), max_width, overflow))
+        self.reset_widths()
+    
+    def add_row(self, *cells):
+        """Para tablas chicas: se guarda y se escribe en show()"""
+        self.rows.append(cells)
+    
+    def show(self, out=None):
+        return self.render(self.rows, out)
+    
+    def _measured(self, rows, out):
+        """Calcular los anchos; devuelve el iterador de filas a escribir"""
+        self.reset_widths()
+        if all(c.max_width is not None and c.min_width >= c.max_width for c in self.columns):
+            rows = iter(rows)
+        elif self.mode == "two-pass":
+            if callable(rows):
+                self.measure(rows())
+                rows = iter(rows())
+            elif iter(rows) is rows:
+                raise TypeError("two-pass necesita un iterable que se pueda recorrer dos veces "
+                                "(o una función que devuelva un iterador nuevo)")
+            else:
+                self.measure(rows)
+                rows = iter(rows)
+        else:
+            rows = self.measure_sample(rows, self.sample_size)
+        budget = self.max_width or terminal_width(out)
+        if budget:
+            self.fit(budget)
+        return rows
+    
+    def header(self):
+        widths = self.widths
+        head = [f"\n📊 {self.title}"] if self.title else []
+        head.append("│ " + " │ ".join(f"{truncate(column.header, width, 'crop'):^{width}}"
+                                      for column, width in zip(self.columns, widths)) + " │")
+        head.append(f"├{'─' * (sum(widths) + 3 * len(widths) - 1)}┤")
+        return "\n".join(head) + "\n"
+    
+    def render(self, rows, out=None):
+        """Escribir la tabla en `out` (por defecto stdout); devuelve cuántas filas escribió"""
+        out = out or sys.stdout
+        return self.write(self._measured(rows, out), out)
+
+class ReferenceTable:
+    """El Table de 09_community_innovations.py: guarda todo y escribe fila a fila"""
+    
+    def __init__(self, title=None):
+        self.title = title
+        self.columns = []
+        self.rows = []
+    
+    def add_column(self, header, style=None):
+        self.columns.append((header, style))
+    
+    def add_row(self, *cells):
+        self.rows.append(cells)
+    
+    def show(self):
+        if self.title:
+            print(f"\n📊 {self.title}")
+        headers = [col[0] for col in self.columns]
+        print(f"│ {' │ '.join(f'{h:^15}' for h in headers)} │")
+        print(f"├{'─' * (17 * len(headers) - 1)}┤")
+        for row in self.rows:
+            formatted_row = []
+            for i, cell in enumerate(row):
+                formatted_row.append(f'{str(cell):^15}')
+            print(f"│ {' │ '.join(formatted_row)} │")
+
+# --- Referencia: el Progress.track de 09_community_innovations.py ---
+
+def track_reference(iterable, description="Processing"):
+    total = len(iterable) if hasattr(iterable, '__len__') else 100
+    for i, item in enumerate(iterable):
+        progress = (i + 1) / total * 100
+        bar_length = 30
+        filled_length = int(bar_length * progress // 100)
+        bar = '█' * filled_length + '▒' * (bar_length - filled_length)
+        print(f"\r{description}: [{bar}] {progress:.1f}%", end='', flush=True)
+        yield item
+    print()
+
+def track_clock_per_item(iterable, task, interval=0.1):
+    """Limitar por reloj consultándolo en cada elemento (para comparar)"""
+    next_draw = time.monotonic()
+    for task.completed, item in enumerate(iterable, 1):
+        now = time.monotonic()
+        if now >= next_draw:
+            next_draw = now + interval
+        yield item
+
+def demonstrate_bars():
+    """Varias barras a la vez: threads y tareas asyncio"""
+    print("=== Varias Barras a la Vez ===")
+    
+    def worker(progress, name, count, delay):
+        for _ in progress.track(range(count), name):
+            time.sleep(delay)
+    
+    with Progress() as progress:
+        threads = [threading.Thread(target=worker, args=(progress, f"thread-{i}", 40, 0.005 * (i + 1)))
+                   for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    async def ticks(count, delay):
+        for i in range(count):
+            await asyncio.sleep(delay)
+            yield i
+    
+    async def consume(progress, name, count, delay):
+        async for _ in progress.atrack(ticks(count, delay), name, total=count):
+            pass
+    
+    async def main():
+        with Progress() as progress:
+            await asyncio.gather(*[consume(progress, f"async-{i}", 30, 0.004 * (i + 1)) for i in range(3)])
+    
+    asyncio.run(main())
+    print()
+
+def demonstrate_overhead(items, reference_items):
+    """Coste por elemento: bucle vacío, track de 09, reloj por elemento y contador"""
+    print(f"=== Benchmark: coste por elemento ({format_count(items)} elementos) ===")
+    
+    def run(loop, count):
+        start = time.perf_counter()
+        for _ in loop(count):
+            pass
+        return time.perf_counter() - start
+    
+    bare = run(range, items) / items
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            reference = run(lambda n: track_reference(range(n)), reference_items) / reference_items
+        progress = Progress(stream=devnull, live=True)
+        rate_limited = run(lambda n: progress.track(range(n), "track"), items) / items
+        clocked = run(lambda n: track_clock_per_item(range(n), Task("reloj", n)), items) / items
+    
+    print(f"{'bucle vacío':>30}: {bare * 1e9:9.1f} ns/elemento")
+    for label, per_item in [("track de 09 (print + flush)", reference),
+                            ("reloj consultado por elemento", clocked),
+                            ("Progress.track (contador)", rate_limited)]:
+        print(f"{label:>30}: {per_item * 1e9:9.1f} ns/elemento, sobrecoste {(per_item - bare) * 1e9:8.1f} ns "
+              f"-> {(per_item - bare) * items:7.2f}s en {format_count(items)}")
+    print(f"(track de 09 medido con {format_count(reference_items)} elementos hacia {os.devnull}: "
+          f"en una terminal real es más lento)")
+    print()
+
+def benchmark_rows(count):
+    """Filas de ejemplo: id, nombre, importe y una nota de largo variable"""
+    for i in range(count):
+        yield i, f"cliente-{i % 9973}", i * 0.37, "x" * (i % 45)
+
+def make_table(mode="sample", max_width=None, overflow="ellipsis", id_width=1):
+    table = Table(title="Movimientos", mode=mode, max_width=max_width)
+    # Con muestra, los anchos salen de las primeras filas: reservar los dígitos de los IDs
+    table.add_column("ID", justify="right", min_width=id_width)
+    table.add_column("Cliente")
+    table.add_column("Importe", justify="right", format_spec=",.2f")
+    table.add_column("Nota", max_width=20, overflow=overflow)
+    return table
+
+def demonstrate_tables():
+    """Muestra, dos pasadas y políticas de desborde"""
+    print("=== Tabla en Streaming ===")
+    
+    rows = [(1, "Quicksort", 1.2, "rápido en promedio"),
+            (2, "Mergesort", 1.8, "estable, O(n) de memoria extra"),
+            (3, "Heapsort", 2.1, "in situ")]
+    for overflow in ("ellipsis", "fold"):
+        table = make_table("two-pass", overflow=overflow)
+        table.title = f"two-pass, overflow={overflow}"
+        table.render(rows)
+    
+    # Con muestra: las filas posteriores que no caben se recortan
+    table = Table(title="sample_size=2, max_width=40", sample_size=2, max_width=40)
+    table.add_column("Algoritmo")
+    table.add_column("Nota", overflow="ellipsis")
+    table.render(chain([("Heapsort", "in situ"), ("Timsort", "adaptativo")],
+                       [("Introsort", "quicksort + heapsort cuando la recursión es profunda")]))
+    print()
+
+def max_rss_mb():
+    if resource is None:
+        return float("nan")
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 1024**2 if sys.platform == "darwin" else usage / 1024
+
+def render_reference(count, out):
+    reference = ReferenceTable()
+    for header in ("ID", "Cliente", "Importe", "Nota"):
+        reference.add_column(header)
+    for row in benchmark_rows(count):
+        reference.add_row(*row)
+    with contextlib.redirect_stdout(out):
+        reference.show()
+
+def demonstrate_table_benchmark(rows, reference_rows):
+    """Filas por segundo y memoria: Table de 09 contra Table en streaming"""
+    print(f"=== Benchmark: tabla de {format_count(rows)} filas desde un generador ===")
+    
+    with open(os.devnull, "w", buffering=1 << 20) as devnull:
+        # Primero el streaming completo: el RSS máximo todavía no lo subió nadie
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        written = make_table(id_width=len(str(rows))).render(benchmark_rows(rows), devnull)
+        stream_time = time.perf_counter() - start
+        rss_after = max_rss_mb()
+        
+        start = time.perf_counter()
+        render_reference(reference_rows, devnull)
+        reference_time = time.perf_counter() - start
+        
+        # Memoria con el mismo número de filas, en una pasada aparte (tracemalloc frena)
+        tracemalloc.start()
+        render_reference(reference_rows, devnull)
+        reference_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()  # Reiniciar en lugar de reset_peak() (3.9+)
+        tracemalloc.start()
+        make_table(id_width=len(str(reference_rows))).render(benchmark_rows(reference_rows), devnull)
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    print(f"{'Table de 09':>20}: {reference_rows / reference_time:>10,.0f} filas/s, pico "
+          f"{reference_peak / 1024**2:7.1f} MB con {format_count(reference_rows)} filas (todas en self.rows)")
+    print(f"{'Table en streaming':>20}: {written / stream_time:>10,.0f} filas/s, pico "
+          f"{stream_peak / 1024**2:7.1f} MB con {format_count(reference_rows)} filas")
+    print(f"{format_count(written)} filas en streaming en {stream_time:.1f}s; RSS máximo del proceso "
+          f"{rss_before:.0f} MB -> {rss_after:.0f} MB")
+    print()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000_000, help="elementos del benchmark de progreso")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="filas del benchmark de tablas")
+    args = parser.parse_args(argv)
+    
+    print("=== Renderizado de Terminal ===")
+    print("Progress.track hace flush por elemento; Table guarda todas las filas\n")
+    
+    demonstrate_bars()
+    demonstrate_overhead(args.items, min(args.items, 200_000))
+    demonstrate_tables()
+    demonstrate_table_benchmark(args.rows, min(args.rows, 500_000))
+    
+    print("=== Consejos ===")
+    print("1. Redibuja por tiempo (10 Hz basta), nunca por elemento")
+    print("2. En el bucle caliente, solo un contador: el render lo lee desde otro hilo")
+    print("3. time.monotonic para velocidad y ETA: no salta con cambios de hora")
+    print("4. Una sola escritura por refresco o por bloque de filas, nunca por línea")
+    print("5. Tablas grandes: anchos por muestra o dos pasadas, y escribir en bloques")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,607 @@
+"""
+CLI estilo Typer con imports diferidos
+Comandos registrados por ruta de import, índice de firmas en disco invalidado por mtime y arranque medido con -X importtime
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+
+# Solo lo imprescindible a nivel de módulo: esta biblioteca se carga en cada
+# arranque de la CLI. ast, inspect, subprocess... se importan donde se usan.
+
+INDEX_VERSION = 3
+
+class UsageError(Exception):
+    """Argumentos inválidos: se muestra el mensaje y la ayuda del comando"""
+
+def _convert(param, value):
+    kind = param["type"]
+    try:
+        if kind == "bool":
+            lowered = value.lower()
+            if lowered not in ("true", "false", "1", "0", "yes", "no"):
+                raise ValueError(value)
+            return lowered in ("true", "1", "yes")
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        if kind == "Path":
+            from pathlib import Path
+            return Path(value)
+    except ValueError:
+        raise UsageError(f"{param['name']}: se esperaba {kind}, no {value!r}") from None
+    return value
+
+def parse_args(params, args):
+    """
+    Reglas de Typer: parámetros sin default son posicionales; con default,
+    --opcion valor (o --opcion=valor); los bool con default son --flag/--no-flag.
+    """
+    positional = [p for p in params if p["required"]]
+    options = {"--" + p["name"].replace("_", "-"): p for p in params if not p["required"]}
+    # Un default que no cabe en JSON (Path, set...) lo pone la propia función
+    values = {p["name"]: p["default"] for p in params
+              if not p["required"] and not p.get("default_repr")}
+    given = []
+    rest = iter(args)
+    for arg in rest:
+        if not arg.startswith("--"):
+            given.append(arg)
+            continue
+        key, has_value, inline = arg.partition("=")
+        negated = options.get("--" + key[5:]) if key.startswith("--no-") else None
+        if negated is not None and negated["type"] == "bool":
+            values[negated["name"]] = False
+        elif key in options:
+            param = options[key]
+            if param["type"] == "bool" and not has_value:
+                values[param["name"]] = True
+            else:
+                value = inline if has_value else next(rest, None)
+                if value is None:
+                    raise UsageError(f"{key} necesita un valor")
+                values[param["name"]] = _convert(param, value)
+        else:
+            raise UsageError(f"opción desconocida: {key}")
+    if len(given) != len(positional):
+        names = " ".join(p["name"].upper() for p in positional)
+        raise UsageError(f"se esperaban {len(positional)} argumentos ({names}), llegaron {len(given)}")
+    for param, value in zip(positional, given):
+        values[param["name"]] = _convert(param, value)
+    return values
+
+def usage_line(prog, name, params):
+    parts = [prog, name]
+    for param in params:
+        flag = "--" + param["name"].replace("_", "-")
+        if param["required"]:
+            parts.append(param["name"].upper())
+        elif param["type"] == "bool":
+            parts.append(f"[{flag}/--no-{flag[2:]}]")
+        else:
+            parts.append(f"[{flag} {param['type'].upper()}]")
+    return " ".join(parts)
+
+# --- Firmas: con ast (sin importar) o con inspect (importando) ---
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+def _param(name, type_name, required, default=None):
+    """
+    Parámetro del índice. Solo los defaults escalares se guardan tal cual:
+    JSON no admite Path ni set y convierte las tuplas en listas. El resto se
+    guarda como repr (para la ayuda) y no se pasa al llamar a la función.
+    """
+    param = {"name": name, "type": type_name, "required": required, "default": default}
+    if not isinstance(default, _JSON_SCALARS):
+        param.update(default=repr(default), default_repr=True)
+    return param
+
+def _annotation_name(source, node):
+    import ast
+    if node is None:
+        return "str"
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    text = ast.get_source_segment(source, node) or "str"
+    return text.rsplit(".", 1)[-1]  # pathlib.Path -> Path
+
+def signature_from_source(path, func_name):
+    """
+    Parámetros y docstring leyendo el archivo con ast, sin ejecutarlo.
+    Devuelve None si la función no está definida a nivel de módulo, si
+    tiene decoradores (el wrapper puede cambiar la firma) o si algún
+    default no es un literal: entonces hay que importar.
+    """
+    import ast  # Solo al reconstruir el índice
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source, path)
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == func_name:
+            break
+    else:
+        return None
+    if node.decorator_list:
+        return None
+    args = node.args
+    if args.vararg or args.kwarg:
+        return None
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    pairs = list(zip(positional, defaults)) + list(zip(args.kwonlyargs, args.kw_defaults))
+    params = []
+    for arg, default in pairs:
+        value = None
+        if default is not None:
+            try:
+                value = ast.literal_eval(default)
+            except ValueError:
+                return None
+        params.append(_param(arg.arg, _annotation_name(source, arg.annotation), default is None, value))
+    return {"doc": (ast.get_docstring(node) or "").strip(), "params": params}
+
+def signature_from_function(func):
+    """Lo mismo con inspect.signature sobre la función ya importada"""
+    import inspect
+    params = []
+    for param in inspect.signature(func).parameters.values():
+        annotation = param.annotation
+        if annotation is param.empty:
+            type_name = "str"
+        elif isinstance(annotation, str):
+            type_name = annotation
+        else:
+            type_name = getattr(annotation, "__name__", str(annotation))
+        required = param.default is param.empty
+        params.append(_param(param.name, type_name, required, None if required else param.default))
+    return {"doc": (inspect.getdoc(func) or "").strip(), "params": params}
+
+def split_target(target):
+    """"paquete.modulo:funcion" o "paquete.modulo.funcion" -> (módulo, función)"""
+    module, sep, attr = target.partition(":")
+    if not sep:
+        module, _, attr = target.rpartition(".")
+    return module, attr
+
+# --- CLI ---
+
+class LazyTyper:
+    """
+    CLI estilo Typer que no importa los comandos para listarlos.
+        
+        app = LazyTyper("demo", index_path="~/.cache/demo-cli.json")
+        app.add_command("hello", "commands.greet:hello")
+        sys.exit(app.main())
+    
+    La ayuda sale de un índice JSON con la firma y el docstring de cada
+    comando, extraídos con ast la primera vez. Cada entrada guarda el
+    archivo fuente con su mtime y tamaño: si cambian, solo esa entrada se
+    recalcula. Al ejecutar, se importa únicamente el módulo del comando
+    elegido.
+    """
+    
+    def __init__(self, name, index_path=None):
+        self.name = name
+        if index_path is None:
+            cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            index_path = os.path.join(cache, f"{name}-cli-index.json")
+        self.index_path = os.path.expanduser(index_path)
+        self.targets = {}
+        self._entries = None
+        self.stats = {"reused": 0, "rebuilt": 0, "imported": 0}
+    
+    def add_command(self, name, target):
+        """`target` es "modulo:funcion", o la función misma si ya está importada"""
+        if isinstance(target, str) and "<locals>" in target:
+            raise ValueError(f"{target!r} no se puede importar: define el comando a nivel de módulo")
+        self.targets[name] = target
+        self._entries = None
+    
+    def command(self, name=None):
+        """Decorador como el de Typer, para comandos definidos en el propio script"""
+        def decorator(func):
+            target = f"{func.__module__}:{func.__qualname__}"
+            if func.__module__ == "__main__":
+                target = func  # El script no se puede reimportar por nombre
+            self.add_command(name or func.__name__.replace("_", "-"), target)
+            return func
+        return decorator
+    
+    # Índice
+    
+    def _origin(self, module_name):
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            return None
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            return None
+        return spec.origin
+    
+    def _build_entry(self, target):
+        module_name, attr = split_target(target)
+        origin = self._origin(module_name)
+        signature = signature_from_source(origin, attr) if origin else None
+        static = signature is not None
+        if not static:
+            # Firma no estática (decoradores, defaults calculados...): importar
+            signature = signature_from_function(self._import(module_name, attr))
+            self.stats["imported"] += 1
+        entry = {"target": target, "origin": origin, "static": static, **signature}
+        if origin:
+            stat = os.stat(origin)
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        return entry
+    
+    @staticmethod
+    def _fresh(entry, target):
+        # Una firma obtenida importando depende también de otros archivos
+        # (el decorador, los defaults): se recalcula en cada arranque
+        if entry is None or entry.get("target") != target or not entry.get("origin") or not entry.get("static"):
+            return False
+        try:
+            stat = os.stat(entry["origin"])
+        except OSError:
+            return False
+        return stat.st_mtime_ns == entry.get("mtime_ns") and stat.st_size == entry.get("size")
+    
+    def load_index(self):
+        """{comando: entrada}; recalcula las entradas viejas y reescribe el índice si cambió"""
+        if self._entries is not None:
+            return self._entries
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") != INDEX_VERSION:
+                stored = {}
+        except (OSError, ValueError):
+            stored = {}
+        cached = stored.get("commands", {})
+        entries = {}
+        indexed = {name for name, target in self.targets.items() if isinstance(target, str)}
+        changed = set(cached) != indexed
+        for name, target in self.targets.items():
+            if not isinstance(target, str):
+                # Definido en el script: ya importado, no pasa por el índice
+                entries[name] = {"target": None, "origin": None, **signature_from_function(target)}
+                continue
+            entry = cached.get(name)
+            if self._fresh(entry, target):
+                self.stats["reused"] += 1
+            else:
+                entry = self._build_entry(target)
+                self.stats["rebuilt"] += 1
+                changed = changed or entry != cached.get(name)
+            entries[name] = entry
+        if changed:
+            self._write_index({name: entries[name] for name in indexed})
+        self._entries = entries
+        return entries
+    
+    def _write_index(self, entries):
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        partial = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "commands": entries}, f)
+            os.replace(partial, self.index_path)
+        except (OSError, TypeError, ValueError):
+            pass  # Sin caché escribible la CLI funciona igual, solo más lenta
+        finally:
+            try:
+                os.unlink(partial)  # Tras un fallo a medias; tras replace ya no existe
+            except OSError:
+                pass
+    
+    # Ejecución
+    
+    def help(self):
+        entries = self.load_index()
+        width = max(map(len, entries), default=0)
+        lines = [f"Uso: {self.name} COMANDO [ARGUMENTOS]", "", "Comandos:"]
+        for name, entry in entries.items():
+            lines.append(f"  {name:<{width}}  {entry['doc'].splitlines()[0] if entry['doc'] else ''}")
+        return "\n".join(lines)
+    
+    def command_help(self, name):
+        entry = self.load_index()[name]
+        lines = [f"Uso: {usage_line(self.name, name, entry['params'])}", ""]
+        if entry["doc"]:
+            lines += [entry["doc"], ""]
+        for param in entry["params"]:
+            if param["required"]:
+                detail = "obligatorio"
+            elif param.get("default_repr"):
+                detail = f"default: {param['default']}"
+            else:
+                detail = f"default: {param['default']!r}"
+            lines.append(f"  {param['name']:<16} {param['type']:<6} {detail}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _import(module_name, attr):
+        func = importlib.import_module(module_name)
+        for part in attr.split("."):
+            func = getattr(func, part)
+        return func
+    
+    def resolve(self, name):
+        """Importar solo ahora el módulo del comando"""
+        target = self.targets[name]
+        if not isinstance(target, str):
+            return target
+        return self._import(*split_target(target))
+    
+    def main(self, argv=None):
+        argv = sys.argv[1:] if argv is None else argv
+        if not argv or argv[0] in ("-h", "--help"):
+            print(self.help())
+            return 0
+        name, args = argv[0], argv[1:]
+        if name not in self.targets:
+            print(f"Comando desconocido: {name}\n\n{self.help()}", file=sys.stderr)
+            return 2
+        if "--help" in args or "-h" in args:
+            print(self.command_help(name))
+            return 0
+        try:
+            kwargs = parse_args(self.load_index()[name]["params"], args)
+        except UsageError as e:
+            print(f"Error: {e}\n\n{self.command_help(name)}", file=sys.stderr)
+            return 2
+        result = self.resolve(name)(**kwargs)
+        if result is not None:
+            print(result)
+        return 0
+
+class EagerTyper:
+    """Como el Typer de 09_community_innovations.py: funciones importadas e inspect en cada arranque"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.commands = {}
+    
+    def command(self, name=None):
+        def decorator(func):
+            self.commands[name or func.__name__] = func
+            return func
+        return decorator
+    
+    def main(self, argv=None):
+        argv = sys.argv[1:] if argv is None else argv
+        signatures = {name: signature_from_function(func) for name, func in self.commands.items()}
+        if not argv or argv[0] in ("-h", "--help"):
+            width = max(map(len, signatures), default=0)
+            print(f"Uso: {self.name} COMANDO [ARGUMENTOS]\n\nComandos:")
+            for name, signature in signatures.items():
+                print(f"  {name:<{width}}  {signature['doc'].splitlines()[0] if signature['doc'] else ''}")
+            return 0
+        name, args = argv[0], argv[1:]
+        result = self.commands[name](**parse_args(signatures[name]["params"], args))
+        if result is not None:
+            print(result)
+        return 0
+
+# --- Demo: un paquete con cientos de comandos generados ---
+
+HEAVY_IMPORTS = ["decimal", "email.parser", "xml.etree.ElementTree", "http.client", "sqlite3", "csv",
+                 "difflib", "statistics", "fractions", "ipaddress", "uuid", "zipfile", "tarfile", "smtplib"]
+
+COMMAND_MODULE = '''"""Comando generado {index}"""
+import {heavy}
+
+# Inicialización a nivel de módulo, como tablas o clientes que se crean al importar
+_TABLE = {{i: str(i) * 3 for i in range({work})}}
+
+def run(name: str, count: int = 1, verbose: bool = False):
+    """Comando {index}: repetir `name` `count` veces."""
+    if verbose:
+        print(f"cmd-{index} usando {heavy}")
+    return f"cmd-{index}: " + " ".join([name] * count)
+'''
+
+GREET_MODULE = '''"""Los comandos del demo de Typer en 09_community_innovations.py"""
+
+def hello(name: str, age: int = 25, formal: bool = False):
+    """Saludar a alguien de manera personalizada."""
+    greeting = "Buenos días" if formal else "Hola"
+    print(f"{greeting} {name}, tienes {age} años")
+    return f"Comando ejecutado: hello {name}"
+
+def process_data(input_file: str, output_file: str = "output.txt", verbose: bool = False):
+    """Procesar archivo de datos."""
+    if verbose:
+        print(f"Procesando {input_file} -> {output_file}")
+    return f"Archivo procesado: {input_file} -> {output_file}"
+'''
+
+SCRIPT_HEADER = '''import importlib.util
+import sys
+
+spec = importlib.util.spec_from_file_location("lazy_cli", {library!r})
+lazy_cli = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(lazy_cli)
+'''
+
+def write_demo_package(root, commands, work=2000):
+    """Paquete `democmds` con `commands` módulos, y los scripts lazy.py y eager.py"""
+    package = os.path.join(root, "democmds")
+    os.makedirs(package, exist_ok=True)
+    with open(os.path.join(package, "__init__.py"), "w") as f:
+        f.write("")
+    with open(os.path.join(package, "greet.py"), "w") as f:
+        f.write(GREET_MODULE)
+    for i in range(commands):
+        with open(os.path.join(package, f"cmd_{i}.py"), "w") as f:
+            f.write(COMMAND_MODULE.format(index=i, heavy=HEAVY_IMPORTS[i % len(HEAVY_IMPORTS)], work=work))
+    
+    header = SCRIPT_HEADER.format(library=os.path.abspath(__file__))
+    registrations = [("hello", "democmds.greet:hello"), ("process-data", "democmds.greet:process_data")]
+    registrations += [(f"cmd-{i}", f"democmds.cmd_{i}:run") for i in range(commands)]
+    
+    lazy = [header, f"app = lazy_cli.LazyTyper('demo', index_path={os.path.join(root, 'index.json')!r})"]
+    lazy += [f"app.add_command({name!r}, {target!r})" for name, target in registrations]
+    lazy.append("sys.exit(app.main())")
+    eager = [header, "app = lazy_cli.EagerTyper('demo')"]
+    for name, target in registrations:
+        module, attr = split_target(target)
+        alias = name.replace("-", "_")
+        eager.append(f"from {module} import {attr} as {alias}")
+        eager.append(f"app.command({name!r})({alias})")
+    eager.append("sys.exit(app.main())")
+    for script, lines in (("lazy.py", lazy), ("eager.py", eager)):
+        with open(os.path.join(root, script), "w") as f:
+            f.write("\n".join(lines) + "\n")
+    return registrations
+
+def run_cli(root, args, importtime=False):
+    """(segundos de pared, stdout, stderr) de un arranque en un proceso nuevo"""
+    import subprocess
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + args
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=root, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} falló:\n{completed.stderr[-2000:]}")
+    return elapsed, completed.stdout, completed.stderr
+
+def parse_importtime(stderr):
+    """Módulos importados, microsegundos totales y los más caros (acumulado, primer nivel)"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((int(self_us), int(cumulative_us), name.rstrip()))
+    top = sorted((m for m in modules if not m[2].startswith("  ")), key=lambda m: -m[1])[:4]
+    return len(modules), sum(m[0] for m in modules), top
+
+def demonstrate_cli(root):
+    """El CLI perezoso en el propio proceso: ayuda desde el índice y un comando"""
+    print("=== CLI Perezoso ===")
+    
+    sys.path.insert(0, root)
+    try:
+        app = LazyTyper("demo", index_path=os.path.join(root, "inproc-index.json"))
+        app.add_command("hello", "democmds.greet:hello")
+        app.add_command("process-data", "democmds.greet:process_data")
+        app.main(["--help"])
+        print()
+        app.main(["hello", "--help"])
+        print()
+        app.main(["hello", "Juan", "--age", "30", "--formal"])
+        app.main(["process-data", "datos.csv", "--verbose"])
+        print(f"Índice: {app.stats['rebuilt']} entradas calculadas con ast, {app.stats['imported']} importadas")
+        print(f"Módulos de comandos cargados: {sorted(m for m in sys.modules if m.startswith('democmds.'))}")
+    finally:
+        sys.path.remove(root)
+    print()
+
+def demonstrate_index(root, commands):
+    """Índice frío, caliente e invalidación por mtime de un solo comando"""
+    print(f"=== Índice en Disco ({commands} comandos) ===")
+    
+    sys.path.insert(0, root)
+    try:
+        def load():
+            app = LazyTyper("demo", index_path=os.path.join(root, "inproc-index.json"))
+            for i in range(commands):
+                app.add_command(f"cmd-{i}", f"democmds.cmd_{i}:run")
+            start = time.perf_counter()
+            app.load_index()
+            return time.perf_counter() - start, app.stats
+        
+        for label in ("sin índice", "índice al día"):
+            elapsed, stats = load()
+            print(f"{label:>22}: {elapsed * 1000:7.1f} ms, {stats['rebuilt']} recalculadas, "
+                  f"{stats['reused']} reutilizadas")
+        
+        path = os.path.join(root, "democmds", "cmd_7.py")
+        with open(path) as f:
+            source = f.read()
+        with open(path, "w") as f:
+            f.write(source.replace("repetir `name`", "repetir el nombre"))
+        elapsed, stats = load()
+        print(f"{'cmd_7.py modificado':>22}: {elapsed * 1000:7.1f} ms, {stats['rebuilt']} recalculadas, "
+              f"{stats['reused']} reutilizadas")
+        print(f"Módulos de comandos importados para la ayuda: "
+              f"{sum(1 for m in sys.modules if m.startswith('democmds.cmd_'))}")
+    finally:
+        sys.path.remove(root)
+    print()
+
+def demonstrate_startup(root, commands, repeat=3):
+    """Arranque en procesos nuevos, con -X importtime"""
+    print("=== Benchmark: arranque de la CLI ===")
+    
+    chosen = f"cmd-{commands // 7}"
+    cases = [
+        ("python -c pass", ["-c", "pass"]),
+        ("eager --help", ["eager.py", "--help"]),
+        ("lazy --help (sin índice)", ["lazy.py", "--help"]),
+        ("lazy --help", ["lazy.py", "--help"]),
+        (f"eager {chosen} Ana", ["eager.py", chosen, "Ana", "--count", "2"]),
+        (f"lazy {chosen} Ana", ["lazy.py", chosen, "Ana", "--count", "2"]),
+    ]
+    run_cli(root, ["eager.py", "--help"])  # Compilar los .pyc fuera de la medición
+    index = os.path.join(root, "index.json")
+    outputs = {}
+    for label, args in cases:
+        cold = "sin índice" in label
+        timings = []
+        for _ in range(1 if cold else repeat):
+            if cold and os.path.exists(index):
+                os.remove(index)
+            timings.append(run_cli(root, args)[0])
+        if cold and os.path.exists(index):
+            os.remove(index)
+        _, stdout, stderr = run_cli(root, args, importtime=True)
+        outputs[label] = stdout
+        count, total_us, top = parse_importtime(stderr)
+        print(f"{label:>25}: {min(timings) * 1000:7.1f} ms, {count:4} módulos importados "
+              f"({total_us / 1000:6.1f} ms en imports)")
+        if label in ("eager --help", "lazy --help"):
+            print(f"{'':>27}más caros: " + ", ".join(f"{name.strip()} {cumulative / 1000:.1f} ms"
+                                                     for _, cumulative, name in top))
+    assert outputs["eager --help"] == outputs["lazy --help"]
+    assert outputs[f"eager {chosen} Ana"] == outputs[f"lazy {chosen} Ana"]
+    print()
+
+def main(argv=None):
+    import argparse
+    import shutil
+    import tempfile
+    
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commands", type=int, default=300, help="comandos generados")
+    args = parser.parse_args(argv)
+    
+    print("=== CLI con Imports Diferidos ===")
+    print("Typer.run llama a inspect.signature y todos los comandos se importan al arrancar\n")
+    
+    root = tempfile.mkdtemp(prefix="lazy-cli-")
+    try:
+        write_demo_package(root, args.commands)
+        demonstrate_cli(root)
+        demonstrate_index(root, args.commands)
+        demonstrate_startup(root, args.commands)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    
+    print("=== Consejos ===")
+    print("1. Registra comandos por ruta de import; importa solo el que se ejecuta")
+    print("2. --help no necesita ejecutar código: ast lee firmas y docstrings")
+    print("3. Cachea lo derivado del código en disco, validado por mtime y tamaño")
+    print("4. python -X importtime muestra qué import se come el arranque")
+    print("5. La biblioteca de la CLI también cuenta: imports pesados, dentro de funciones")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Pipeline asíncrono por etapas con concurrencia acotada
+Colas limitadas entre etapas, salida ordenada o no, timeouts y reintentos por elemento y métricas por etapa
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+
+_DONE = object()
+
+class StageError(Exception):
+    """Un elemento agotó sus intentos en una etapa"""
+    
+    def __init__(self, stage, index, item, error):
+        super().__init__(f"etapa {stage!r}, elemento {index} ({item!r}): {type(error).__name__}: {error}")
+        self.stage = stage
+        self.index = index
+        self.item = item
+        self.error = error
+
+@dataclass
+class StageMetrics:
+    name: str
+    concurrency: int
+    processed: int = 0
+    failed: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    busy: float = 0.0  # Segundos sumados dentro de la función de la etapa
+    max_queue: int = 0  # Cola de entrada más larga observada
+    
+    def show(self, elapsed):
+        utilization = self.busy / (elapsed * self.concurrency) if elapsed else 0.0
+        print(f"  {self.name:>12} x{self.concurrency:<3} {self.processed:>6} ok {self.failed:>4} fallidos "
+              f"{self.retries:>4} reintentos {self.timeouts:>4} timeouts  ocupación {utilization:6.1%}  "
+              f"cola máx {self.max_queue}")
+
+class Stage:
+    def __init__(self, func, name, concurrency, timeout, retries, backoff):
+        if concurrency < 1:
+            raise ValueError("concurrency debe ser >= 1")
+        self.func = func
+        self.name = name
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+    
+    async def call(self, item, metrics):
+        """Un intento con timeout; si falla, reintentar con espera exponencial"""
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                if self.timeout is None:
+                    result = await self.func(item)
+                else:
+                    result = await asyncio.wait_for(self.func(item), self.timeout)
+                metrics.busy += time.perf_counter() - start
+                return result
+            except asyncio.TimeoutError as e:
+                metrics.timeouts += 1
+                error = e
+            except Exception as e:
+                error = e
+            metrics.busy += time.perf_counter() - start
+            if attempt >= self.retries:
+                raise error
+            attempt += 1
+            metrics.retries += 1
+            if self.backoff:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+class AsyncPipeline:
+    """
+    Etapas async encadenadas por colas acotadas.
+        
+        pipeline = (AsyncPipeline(ordered=True)
+                    .stage(fetch, concurrency=50, timeout=2.0, retries=2)
+                    .stage(process, concurrency=8))
+        async for result in pipeline.stream(items):
+            ...
+    
+    Cada etapa corre `concurrency` workers que leen de su cola de entrada
+    (de `queue_size` elementos) y escriben en la de la siguiente: si una
+    etapa se atrasa, las anteriores esperan (back-pressure) en lugar de
+    acumular elementos. Un semáforo limita además los elementos en vuelo,
+    incluido el búfer de reordenamiento del modo `ordered`.
+    
+    Con on_error="raise" el primer elemento que agota sus reintentos
+    detiene el pipeline con StageError; con "skip" se descarta y queda en
+    `errors`. Las métricas de cada etapa quedan en `metrics`.
+    """
+    
+    def __init__(self, ordered=True, queue_size=64, on_error="raise", max_in_flight=None):
+        if on_error not in ("raise", "skip"):
+            raise ValueError("on_error debe ser 'raise' o 'skip'")
+        self.ordered = ordered
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.max_in_flight = max_in_flight
+        self.stages = []
+        self.metrics = []
+        self.errors = []
+    
+    def stage(self, func, concurrency=1, timeout=None, retries=0, backoff=0.0, name=None):
+        self.stages.append(Stage(func, name or func.__name__, concurrency, timeout, retries, backoff))
+        return self
+    
+    async def _feed(self, items, inbox, window, workers):
+        cancelled = False
+        try:
+            index = 0
+            if hasattr(items, "__aiter__"):
+                async for item in items:
+                    await window.acquire()
+                    await inbox.put((index, item))
+                    index += 1
+            else:
+                for item in items:
+                    await window.acquire()
+                    await inbox.put((index, item))
+                    index += 1
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Cancelado por stream(): los workers también lo están y nadie
+            # vaciaría una cola llena, así que no se envía _DONE
+            if not cancelled:
+                for _ in range(workers):
+                    await inbox.put(_DONE)
+    
+    async def _work(self, stage, metrics, inbox, outbox, output, remaining, downstream_workers):
+        while True:
+            if inbox.qsize() > metrics.max_queue:
+                metrics.max_queue = inbox.qsize()
+            entry = await inbox.get()
+            if entry is _DONE:
+                # El último worker de la etapa avisa a los de la siguiente
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    for _ in range(downstream_workers):
+                        await outbox.put(_DONE)
+                return
+            index, item = entry
+            try:
+                result = await stage.call(item, metrics)
+            except Exception as e:
+                metrics.failed += 1
+                error = StageError(stage.name, index, item, e)
+                if self.on_error == "skip":
+                    self.errors.append(error)
+                await output.put((index, False, error))  # Directo a la salida: libera su lugar
+                continue
+            metrics.processed += 1
+            await outbox.put((index, True, result) if outbox is output else (index, result))
+    
+    async def stream(self, items):
+        if not self.stages:
+            raise ValueError("el pipeline no tiene etapas")
+        stages = self.stages
+        self.metrics = [StageMetrics(stage.name, stage.concurrency) for stage in stages]
+        self.errors = []
+        queues = [asyncio.Queue(self.queue_size) for _ in stages]
+        output = asyncio.Queue()  # Acotada por el semáforo de elementos en vuelo
+        in_flight = self.max_in_flight or self.queue_size * (len(stages) + 1) + sum(s.concurrency for s in stages)
+        window = asyncio.Semaphore(in_flight)
+        
+        feeder = asyncio.ensure_future(self._feed(items, queues[0], window, stages[0].concurrency))
+        tasks = [feeder]
+        for k, stage in enumerate(stages):
+            outbox = queues[k + 1] if k + 1 < len(stages) else output
+            downstream = stages[k + 1].concurrency if k + 1 < len(stages) else 1
+            remaining = [stage.concurrency]
+            tasks += [asyncio.ensure_future(self._work(stage, self.metrics[k], queues[k], outbox, output,
+                                                       remaining, downstream))
+                      for _ in range(stage.concurrency)]
+        try:
+            pending = {}
+            next_index = 0
+            while True:
+                entry = await output.get()
+                if entry is _DONE:
+                    break
+                index, ok, value = entry
+                if not ok and self.on_error == "raise":
+                    raise value
+                if not self.ordered:
+                    window.release()
+                    if ok:
+                        yield value
+                    continue
+                pending[index] = (ok, value)
+                while next_index in pending:
+                    ok, value = pending.pop(next_index)
+                    next_index += 1
+                    window.release()
+                    if ok:
+                        yield value
+            await feeder  # Propagar errores al recorrer `items`
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks, timeout=5.0)
+    
+    async def run(self, items):
+        return [result async for result in self.stream(items)]
+    
+    def report(self, elapsed):
+        for metrics in self.metrics:
+            metrics.show(elapsed)
+
+# --- Servicios simulados (fetch_data/process_data de 09_community_innovations.py) ---
+
+class FakeService:
+    """Latencia con jitter y registro del pico de llamadas simultáneas"""
+    
+    def __init__(self, delay, seed=0, fail_every=0, hang_every=0):
+        self.delay = delay
+        self.rng = random.Random(seed)
+        self.fail_every = fail_every
+        self.hang_every = hang_every
+        self.attempts = {}
+        self.in_flight = 0
+        self.peak = 0
+    
+    async def __call__(self, item):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            key = item if isinstance(item, int) else hash(item)
+            first = self.attempts.setdefault(key, 0) == 0
+            self.attempts[key] += 1
+            if first and self.hang_every and key % self.hang_every == self.hang_every - 1:
+                await asyncio.sleep(60)  # Se cuelga: solo el timeout lo corta
+            await asyncio.sleep(self.delay * (0.5 + self.rng.random()))
+            if first and self.fail_every and key % self.fail_every == self.fail_every - 1:
+                raise ConnectionError("conexión reiniciada")
+            return item
+        finally:
+            self.in_flight -= 1
+
+def make_services(fetch_delay, process_delay, **flaky):
+    fetch = FakeService(fetch_delay, seed=1, **flaky)
+    process = FakeService(process_delay, seed=2)
+    
+    async def fetch_data(item):
+        return await fetch(item)
+    
+    async def process_data(item):
+        return await process(item) * 2
+    
+    return fetch, process, fetch_data, process_data
+
+async def async_pipeline(items, fetch_data, process_data):
+    """El async_pipeline de 09: un elemento detrás de otro"""
+    results = []
+    for item in items:
+        data = await fetch_data(item)
+        processed = await process_data(data)
+        results.append(processed)
+    return results
+
+async def gather_pipeline(items, fetch_data, process_data):
+    """Todo a la vez con gather: sin límite de concurrencia"""
+    async def one(item):
+        return await process_data(await fetch_data(item))
+    return await asyncio.gather(*[one(item) for item in items])
+
+async def demonstrate_pipeline():
+    """Ordenado y sin orden, y un servicio que falla o se cuelga"""
+    print("=== Pipeline por Etapas ===")
+    
+    _, _, fetch_data, process_data = make_services(0.03, 0.01)
+    for ordered in (True, False):
+        pipeline = (AsyncPipeline(ordered=ordered)
+                    .stage(fetch_data, concurrency=4)
+                    .stage(process_data, concurrency=2))
+        results = await pipeline.run(range(12))
+        print(f"ordered={ordered!s:<5}: {results}")
+    
+    fetch, _, fetch_data, process_data = make_services(0.002, 0.001, fail_every=50, hang_every=120)
+    pipeline = (AsyncPipeline(ordered=True, on_error="skip")
+                .stage(fetch_data, concurrency=16, timeout=0.1, retries=2, backoff=0.01)
+                .stage(process_data, concurrency=4))
+    start = time.perf_counter()
+    results = await pipeline.run(range(1000))
+    elapsed = time.perf_counter() - start
+    print(f"\nServicio inestable: {len(results)} de 1000 resultados en {elapsed:.2f}s, "
+          f"{len(pipeline.errors)} descartados, orden conservado: {results == sorted(results)}")
+    pipeline.report(elapsed)
+    
+    async def parse(text):
+        return int(text)
+    
+    for on_error in ("skip", "raise"):
+        pipeline = AsyncPipeline(on_error=on_error).stage(parse, concurrency=2).stage(process_data)
+        try:
+            results = await pipeline.run(["1", "2", "x", "4"])
+            print(f"on_error={on_error!r}: {results}, errores: {[str(e) for e in pipeline.errors]}")
+        except StageError as e:
+            print(f"on_error={on_error!r}: StageError: {e}")
+    print()
+
+async def demonstrate_benchmark(items, sequential_items, fetch_delay=0.002, process_delay=0.001):
+    """Secuencial (09) contra gather y contra el pipeline acotado"""
+    print(f"=== Benchmark: {items:,} elementos (fetch ~{fetch_delay * 1000:.0f} ms, "
+          f"process ~{process_delay * 1000:.0f} ms) ===")
+    
+    _, _, fetch_data, process_data = make_services(fetch_delay, process_delay)
+    start = time.perf_counter()
+    expected = await async_pipeline(range(sequential_items), fetch_data, process_data)
+    sequential = (time.perf_counter() - start) / sequential_items * items
+    assert expected == [2 * i for i in range(sequential_items)]
+    print(f"{'secuencial (09)':>26}: {sequential:7.2f}s (estimado con {sequential_items} elementos), "
+          f"{items / sequential:>8,.0f} elem/s, concurrencia 1")
+    
+    fetch, process, fetch_data, process_data = make_services(fetch_delay, process_delay)
+    start = time.perf_counter()
+    results = await gather_pipeline(range(items), fetch_data, process_data)
+    elapsed = time.perf_counter() - start
+    assert results == [2 * i for i in range(items)]
+    print(f"{'gather':>26}: {elapsed:7.2f}s, {items / elapsed:>8,.0f} elem/s, "
+          f"pico {fetch.peak:,} fetch y {process.peak:,} process simultáneos")
+    
+    for ordered in (True, False):
+        fetch, process, fetch_data, process_data = make_services(fetch_delay, process_delay)
+        pipeline = (AsyncPipeline(ordered=ordered, queue_size=128)
+                    .stage(fetch_data, concurrency=64)
+                    .stage(process_data, concurrency=32))
+        start = time.perf_counter()
+        results = await pipeline.run(range(items))
+        elapsed = time.perf_counter() - start
+        if ordered:
+            assert results == [2 * i for i in range(items)]
+        else:
+            assert sorted(results) == [2 * i for i in range(items)]
+        label = f"pipeline ({'ordenado' if ordered else 'sin orden'})"
+        print(f"{label:>26}: {elapsed:7.2f}s, {items / elapsed:>8,.0f} elem/s, "
+              f"pico {fetch.peak} fetch y {process.peak} process simultáneos")
+        pipeline.report(elapsed)
+    print()
+
+async def main_async(items):
+    await demonstrate_pipeline()
+    await demonstrate_benchmark(items, min(items, 300))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000, help="elementos del benchmark")
+    args = parser.parse_args(argv)
+    
+    print("=== Pipeline Asíncrono ===")
+    print("async_pipeline hace await de cada elemento dentro del for: nada se solapa\n")
+    
+    asyncio.run(main_async(args.items))
+    
+    print("=== Consejos ===")
+    print("1. Un await dentro de un for es secuencial aunque uses asyncio")
+    print("2. gather sin límite abre todo a la vez: acota la concurrencia por etapa")
+    print("3. Colas acotadas entre etapas: la etapa lenta frena a las rápidas")
+    print("4. Timeout por intento y reintentos con espera exponencial, por etapa")
+    print("5. Mide ocupación y colas por etapa: la más llena es el cuello de botella")
+
+if __name__ == "__main__":
+    main()